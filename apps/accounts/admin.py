@@ -3,6 +3,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
+from tourism_backend.images import admin_preview_url
 from .models import User, Profile
 
 @admin.register(User)
@@ -58,7 +59,7 @@ class ProfileAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="width:50px; height:50px; object-fit:cover;" />',
-                obj.image.url
+                admin_preview_url(obj)
             )
         return "No Image"
     image_preview.short_description = "Profile Image"
@@ -0,0 +1,70 @@
+# accounts/authentication.py
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from . import user_cache
+
+User = get_user_model()
+
+# User fields carried in the tokens (see tokens.RefreshToken)
+USER_CLAIMS = ('username', 'is_superuser', 'is_staff', 'is_verified')
+
+
+def set_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+def token_user(user_id, token):
+    """
+    A User built from the token claims, without a query. Other fields are
+    deferred: reading one (e.g. first_name) loads it from the database.
+    """
+    values = {'id': user_id, 'is_active': True, **{claim: token[claim] for claim in USER_CLAIMS}}
+    return User.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the signed claims instead of loading the
+    user row on every request. Falls back to the (cached) row for tokens
+    without claims and for tokens that may predate the user's last change,
+    so a deactivation or a permission change applies at once. Without a
+    shared cache every request reads the row (see user_cache.py).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        payload = validated_token.payload
+        if all(claim in payload for claim in USER_CLAIMS) and not user_cache.changed_since(
+            user_id, payload.get('iat', 0)
+        ):
+            return token_user(user_id, validated_token)
+
+        try:
+            user = user_cache.get_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found", code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code='user_inactive')
+        return user
+
+
+def load_full_user(request, fresh=False):
+    """
+    Replace request.user with the complete User, from the user cache, or
+    from the database when fresh (before modifying it).
+    """
+    if fresh:
+        user = User.objects.get(pk=request.user.pk)
+    else:
+        user = user_cache.get_user(request.user.pk)
+    request.user = user
+    return user
@@ -0,0 +1,111 @@
+# accounts/blacklist.py
+
+import threading
+import time
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .user_cache import is_shared
+
+# Blacklisted refresh tokens (by jti), mirrored in memory in every process so
+# that a refresh answers "not blacklisted" without a query.
+#
+# Processes learn about new entries through a version in the shared cache,
+# bumped whenever a token is blacklisted (signals.py): when it moves, only
+# the rows added since the last load are read. reset() moves the generation
+# instead, which reloads everything; it is only needed after removing
+# entries of tokens that have not expired yet. Everything is also reloaded
+# every FULL_RELOAD_INTERVAL, which catches rows an incremental load
+# skipped (an id allocated early but committed late). Entries are dropped
+# from memory once their token expires, as the token is then rejected on
+# its exp claim anyway.
+#
+# With a cache private to each process the version cannot reach the other
+# workers, so every check queries the database instead.
+
+VERSION_KEY = 'accounts:blacklist:version'
+GENERATION_KEY = 'accounts:blacklist:generation'
+# Rows are read from a little below the highest id loaded, to pick up
+# entries whose transaction committed after one with a higher id
+ID_OVERLAP = 100
+FULL_RELOAD_INTERVAL = 60
+PURGE_INTERVAL = 10 * 60
+
+
+def _new_version():
+    return int(time.time() * 1000)
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+
+
+def _current_state():
+    state = cache.get_many([GENERATION_KEY, VERSION_KEY])
+    for key in (GENERATION_KEY, VERSION_KEY):
+        if key not in state:
+            cache.add(key, _new_version(), timeout=None)
+            state[key] = cache.get(key)
+    return state[GENERATION_KEY], state[VERSION_KEY]
+
+
+class TokenBlacklist:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._expires_at = {}
+        self._last_id = 0
+        self._state = None
+        self._reload_at = 0
+        self._purge_at = 0
+
+    def contains(self, jti):
+        if not is_shared():
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+        self._sync()
+        return jti in self._expires_at
+
+    def _sync(self):
+        state = _current_state()
+        if state == self._state and time.monotonic() < self._reload_at:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if state == self._state and now < self._reload_at:
+                return
+            rows = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            if self._state is not None and state[0] == self._state[0] and now < self._reload_at:
+                rows = rows.filter(pk__gt=self._last_id - ID_OVERLAP)
+            else:
+                self._expires_at, self._last_id = {}, 0
+                self._reload_at = now + FULL_RELOAD_INTERVAL
+            for pk, jti, expires_at in rows.values_list('pk', 'token__jti', 'token__expires_at'):
+                self._expires_at[jti] = expires_at.timestamp()
+                self._last_id = max(self._last_id, pk)
+            self._state = state
+            self._purge()
+
+    def _purge(self):
+        now = time.time()
+        if now < self._purge_at:
+            return
+        self._expires_at = {jti: at for jti, at in self._expires_at.items() if at > now}
+        self._purge_at = now + PURGE_INTERVAL
+
+
+token_blacklist = TokenBlacklist()
+
+
+def is_blacklisted(jti):
+    return token_blacklist.contains(jti)
+
+
+def added():
+    _bump(VERSION_KEY)
+
+
+def reset():
+    _bump(GENERATION_KEY)
@@ -0,0 +1,42 @@
+# apps/accounts/management/commands/prune_tokens.py
+
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding refresh tokens (and their blacklist entries) in "
+        "small batches, so the token tables stop growing without long-running deletes. "
+        "Meant to be run periodically, e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0,
+                            help="Seconds to pause between batches.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only count the expired tokens.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lte=now)
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} expired token(s) would be deleted.")
+            return
+
+        deleted = 0
+        while True:
+            # Tokens expire roughly in id order, so walking the primary key
+            # finds them without an index on expires_at
+            ids = list(expired.order_by('pk').values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(pk__in=ids).delete()
+            deleted += len(ids)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired token(s)."))
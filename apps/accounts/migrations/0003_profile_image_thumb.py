@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_remove_user_phone_number_profile_phone_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='image_thumb',
+            field=models.ImageField(blank=True, editable=False, max_length=255, null=True, upload_to='profiles/'),
+        ),
+    ]
@@ -26,6 +26,8 @@ class Profile(models.Model):
 
     date_of_birth = models.DateField(blank=True, null=True)
     image = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    # WebP thumbnail of image, generated in the background (tourism_backend/images.py)
+    image_thumb = models.ImageField(upload_to='profiles/', max_length=255, editable=False, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
     biography = models.TextField(blank=True, null=True)
     website = models.URLField(blank=True, null=True)
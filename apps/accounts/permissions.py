@@ -13,4 +13,4 @@ class IsProfileOwnerOrSuperuser(permissions.BasePermission):
             return True
 
         # Otherwise, ensure the object's user is the requesting user
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
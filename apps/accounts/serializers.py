@@ -3,7 +3,15 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import check_password
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from tourism_backend.images import ThumbnailField
+from .authentication import set_user_claims
 from .models import Profile
+from .tasks import create_profile
+from .tokens import RefreshToken
+from . import user_cache
 
 User = get_user_model()
 
@@ -37,11 +45,11 @@ class RegisterSerializer(serializers.ModelSerializer):
         user = User(**validated_data)
         user.set_password(password1)
         user.save()
-        # create or update profile
         if image:
+            # The upload only exists for the duration of this request
             Profile.objects.create(user=user, image=image)
         else:
-            Profile.objects.create(user=user)
+            create_profile.enqueue(user_id=user.pk)
         return user
 
 
@@ -64,11 +72,13 @@ class ProfileSerializer(serializers.ModelSerializer):
     """
     For reading/updating profile fields, including phone_number.
     """
+    image_thumb = ThumbnailField()
+
     class Meta:
         model = Profile
         fields = [
             'user_id', 'email', 'phone_number', 'date_of_birth',
-            'image', 'address', 'biography', 'website'
+            'image', 'image_thumb', 'address', 'biography', 'website'
         ]
         read_only_fields = ['user_id']
 
@@ -92,3 +102,41 @@ class ChangePasswordSerializer(serializers.Serializer):
         if not check_password(value, user.password):
             raise serializers.ValidationError("Old password is incorrect.")
         return value
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """
+    Login: tokens carry the user claims (see authentication.py).
+    """
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refresh: the new access token gets up-to-date claims; the user is read
+    through the user cache rather than queried on every refresh.
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        try:
+            user = user_cache.get_user(refresh[jwt_settings.USER_ID_CLAIM])
+        except (KeyError, User.DoesNotExist):
+            user = None
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        access = refresh.access_token
+        set_user_claims(access, user)
+        data = {'access': str(access)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            set_user_claims(refresh, user)
+            data['refresh'] = str(refresh)
+        return data
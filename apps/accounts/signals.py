@@ -0,0 +1,30 @@
+# accounts/signals.py
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from tourism_backend import images
+from . import blacklist, user_cache
+from .models import Profile
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def publish_blacklisted_token(sender, instance, created, **kwargs):
+    # Once committed, so that other processes find the row when they reload
+    if created:
+        transaction.on_commit(blacklist.added)
+
+
+@receiver(post_save, sender=Profile)
+def update_profile_image_thumbnail(sender, instance, raw=False, **kwargs):
+    if not raw:
+        images.schedule_thumbnail(instance)
@@ -0,0 +1,10 @@
+# accounts/tasks.py
+
+from tasks.registry import task
+from .models import Profile
+
+
+@task(name='accounts.create_profile')
+def create_profile(user_id):
+    # get_or_create: the profile view may have created it first
+    Profile.objects.get_or_create(user_id=user_id)
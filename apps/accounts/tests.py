@@ -1,3 +1,120 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import time
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from .authentication import StatelessJWTAuthentication
+from .blacklist import TokenBlacklist, token_blacklist
+from .models import User
+from .tokens import RefreshToken
+from . import user_cache
 
-# Create your tests here.
+
+def shared_cache(test):
+    """
+    A file-based cache (shared between processes) for the test.
+    """
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory)
+    return override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory,
+    }})
+
+
+class StatelessAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser(username='admin', password='pass')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def authenticate(self):
+        authentication = StatelessJWTAuthentication()
+        with CaptureQueriesContext(connection) as queries:
+            user = authentication.get_user(authentication.get_validated_token(self.token))
+        return user, len(queries)
+
+    def test_local_cache_reads_the_row(self):
+        # Changes made in another worker would never reach a per-process cache
+        self.assertFalse(user_cache.is_shared())
+        user, queries = self.authenticate()
+        self.assertEqual((user.is_superuser, queries), (True, 1))
+
+        User.objects.filter(pk=self.user.pk).update(is_superuser=False)
+        user, _ = self.authenticate()
+        self.assertFalse(user.is_superuser)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_shared_cache(self):
+        with shared_cache(self):
+            self.assertTrue(user_cache.is_shared())
+            # Claims of a token issued after the last change are trusted
+            cache.set(user_cache._changed_key(self.user.pk), time.time() - 60)
+            user, queries = self.authenticate()
+            self.assertEqual((user.is_superuser, queries), (True, 0))
+
+            # A lost change record fails closed: the row is read, then cached
+            cache.delete(user_cache._changed_key(self.user.pk))
+            user, queries = self.authenticate()
+            self.assertEqual(queries, 1)
+            self.assertNotIn('password', cache.get(user_cache._user_key(self.user.pk)))
+            user, queries = self.authenticate()
+            self.assertEqual((user.is_superuser, queries), (True, 0))
+
+            self.user.is_superuser = False
+            self.user.save()
+            user, _ = self.authenticate()
+            self.assertFalse(user.is_superuser)
+
+
+class TokenBlacklistTests(TestCase):
+    """
+    A token blacklisted by one process (token_blacklist) must be rejected
+    by every other one (another TokenBlacklist).
+    """
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='reader', password='pass')
+        self.refresh = RefreshToken.for_user(user)
+        self.jti = self.refresh['jti']
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def logout(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/accounts/logout/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 205)
+
+    def assertRejectedElsewhere(self):
+        other = TokenBlacklist()
+        self.assertFalse(other.contains(self.jti))
+        self.assertFalse(token_blacklist.contains(self.jti))
+        self.logout()
+        self.assertTrue(token_blacklist.contains(self.jti))
+        self.assertTrue(other.contains(self.jti))
+
+    def test_local_cache(self):
+        self.assertRejectedElsewhere()
+
+    def test_shared_cache(self):
+        with shared_cache(self):
+            self.assertRejectedElsewhere()
+
+    def test_full_reload_catches_rows_committed_late(self):
+        with shared_cache(self):
+            other = TokenBlacklist()
+            other.contains(self.jti)
+            # As if rows with much higher ids had committed first
+            other._last_id += 1000
+            self.logout()
+            self.assertFalse(other.contains(self.jti))
+            other._reload_at = 0
+            self.assertTrue(other.contains(self.jti))
@@ -0,0 +1,26 @@
+# accounts/tokens.py
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .authentication import set_user_claims
+from . import blacklist
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh token carrying the user claims read by StatelessJWTAuthentication;
+    the access tokens made from it copy them. The blacklist is checked in
+    memory (blacklist.py) instead of with a query per refresh.
+    """
+
+    def check_blacklist(self):
+        if blacklist.is_blacklisted(self.payload[jwt_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
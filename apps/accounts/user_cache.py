@@ -0,0 +1,94 @@
+# accounts/user_cache.py
+
+import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+# Short-lived cache of User rows, for the requests that need more than the
+# token claims (see authentication.py). Entries are dropped whenever the
+# user is saved or deleted (signals.py), which also records the time of the
+# change so that tokens issued before it stop being trusted on their claims.
+#
+# Both fail closed. A cache private to each process (the local-memory
+# default) cannot carry a change made in another worker, so it is not used
+# at all: users are read from the database and no token is trusted on its
+# claims. A missing change record (never set, expired or evicted) counts as
+# a change made just now. Set CACHE_URL to a shared cache to benefit.
+
+USER_TIMEOUT = 5 * 60
+
+
+def _user_key(user_id):
+    return f"accounts:user:{user_id}"
+
+
+def _changed_key(user_id):
+    return f"accounts:user-changed:{user_id}"
+
+
+def _changed_timeout():
+    # Refreshed access tokens get fresh claims, so only access tokens
+    # issued before a change need to be caught
+    return jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+
+
+def is_shared():
+    """
+    Whether the cache is shared by every process serving the API.
+    """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def _cached_fields():
+    # Never the password hash
+    return [field.attname for field in get_user_model()._meta.concrete_fields if field.attname != 'password']
+
+
+def get_user(user_id):
+    """
+    The User with this id, from the cache or the database; the password is
+    deferred. Raises User.DoesNotExist.
+    """
+    User = get_user_model()
+    if not is_shared():
+        return User.objects.get(pk=user_id)
+    values = cache.get(_user_key(user_id))
+    if values is None:
+        user = User.objects.only(*_cached_fields()).get(pk=user_id)
+        cache.set(_user_key(user_id), {name: getattr(user, name) for name in _cached_fields()}, USER_TIMEOUT)
+        return user
+    return User.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+
+
+def changed_since(user_id, timestamp):
+    """
+    Whether the user may have been saved or deleted after this Unix timestamp.
+    """
+    if not is_shared():
+        return True
+    key = _changed_key(user_id)
+    changed_at = cache.get(key)
+    if changed_at is None:
+        cache.add(key, time.time(), _changed_timeout())
+        changed_at = cache.get(key) or time.time()
+    return changed_at >= timestamp
+
+
+def _invalidate(user_id):
+    cache.set(_changed_key(user_id), time.time(), _changed_timeout())
+    cache.delete(_user_key(user_id))
+
+
+def invalidate(user_id):
+    """
+    Drop the cached row and stop trusting the claims of tokens issued until
+    now. Done again on commit, so a row cached by a concurrent request
+    before the change was committed does not survive it.
+    """
+    _invalidate(user_id)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _invalidate(user_id))
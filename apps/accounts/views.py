@@ -9,7 +9,8 @@ from .serializers import (
 )
 from .models import Profile
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import load_full_user
+from .tokens import RefreshToken
 
 User = get_user_model()
 
@@ -25,7 +26,8 @@ class UserDetailUpdateView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user only has the token claims; updates start from the row
+        return load_full_user(self.request, fresh=self.request.method not in permissions.SAFE_METHODS)
 
 
 class ProfileDetailUpdateView(generics.RetrieveUpdateAPIView):
@@ -34,7 +36,8 @@ class ProfileDetailUpdateView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return Profile.objects.get(user=self.request.user)
+        # Created in the background after registration, which may not have happened yet
+        return Profile.objects.get_or_create(user_id=self.request.user.pk)[0]
 
 
 class ChangePasswordView(generics.UpdateAPIView):
@@ -43,7 +46,7 @@ class ChangePasswordView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        return load_full_user(self.request, fresh=True)
 
     def update(self, request, *args, **kwargs):
         user = self.get_object()
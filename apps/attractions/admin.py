@@ -2,6 +2,7 @@
 
 from django.contrib import admin
 from django.utils.html import format_html
+from tourism_backend.images import admin_preview_url
 from .models import Category, Attraction, Feedback, Favorite
 
 @admin.register(Category)
@@ -14,7 +15,7 @@ class CategoryAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="width:50px; height:50px; object-fit:cover;" />',
-                obj.image.url
+                admin_preview_url(obj)
             )
         return "No Image"
     image_preview.short_description = "Category Image"
@@ -29,12 +30,15 @@ class AttractionAdmin(admin.ModelAdmin):
     search_fields = ('name', 'address')
     list_filter = ('category',)
     ordering = ('id',)
+    # Counters kept up to date with atomic deltas (ratings.py, popularity.py):
+    # a form saving them would write back stale values over concurrent updates
+    readonly_fields = ('average_rating', 'rating_sum', 'rating_count', 'favorite_count')
 
     def image_preview(self, obj):
         if obj.image:
             return format_html(
                 '<img src="{}" style="width:50px; height:50px; object-fit:cover;" />',
-                obj.image.url
+                admin_preview_url(obj)
             )
         return "No Image"
     image_preview.short_description = "Attraction Image"
@@ -5,5 +5,5 @@ class AttractionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'attractions'
 
-def ready(self):
-    import attractions.signals  # This ensures the signals are registered
\ No newline at end of file
+    def ready(self):
+        import attractions.signals  # This ensures the signals are registered
@@ -0,0 +1,141 @@
+# apps/attractions/category_stats.py
+
+from collections import defaultdict
+from decimal import Decimal
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from tourism_backend import response_cache
+from .models import Attraction, Category, CategoryStats
+
+# Per-category aggregates (CategoryStats), maintained with deltas:
+# - attraction saves and deletes, from signals (signals.py), using the
+#   values the attraction was loaded with (Attraction.stats_snapshot);
+# - rating updates, by ratings.py itself, which knows the old average.
+# Writes that bypass both (bulk_create, queryset.update) leave drift behind
+# that reconcile_category_stats() finds and fixes, as the other counters.
+
+
+def apply_category_delta(category_id, attractions=0, price=0, average_rating=0.0, reviews=0):
+    """
+    Adjust a category's stats with a single atomic UPDATE. A category without
+    a stats row is left alone: reconcile_category_stats() creates it.
+    """
+    updated = CategoryStats.objects.filter(pk=category_id).update(
+        attraction_count=F('attraction_count') + attractions,
+        price_sum=F('price_sum') + price,
+        average_rating_sum=F('average_rating_sum') + average_rating,
+        review_count=F('review_count') + reviews,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        response_cache.invalidate(CategoryStats)
+
+
+def _apply_snapshot(snapshot, sign):
+    category_id, price, average_rating, rating_count = snapshot
+    apply_category_delta(
+        category_id, attractions=sign, price=sign * price,
+        average_rating=sign * average_rating, reviews=sign * rating_count,
+    )
+
+
+def apply_attraction_change(old, new):
+    """
+    Move the stats from an attraction's old snapshot to its new one; either
+    is None for a created or deleted attraction.
+    """
+    if old is not None and new is not None and old[0] == new[0]:
+        if old != new:
+            apply_category_delta(
+                new[0], price=new[1] - old[1], average_rating=new[2] - old[2], reviews=new[3] - old[3],
+            )
+        return
+    if old is not None:
+        _apply_snapshot(old, -1)
+    if new is not None:
+        _apply_snapshot(new, 1)
+
+
+def create_category_stats(category_ids):
+    CategoryStats.objects.bulk_create(
+        [CategoryStats(category_id=category_id) for category_id in category_ids], ignore_conflicts=True
+    )
+
+
+def reconcile_category_stats(category_ids=None, batch_size=1000, dry_run=False):
+    """
+    Recompute category stats from scratch from the Attraction table and fix
+    any drift, creating missing rows. Works through categories in
+    primary-key batches with one grouped aggregate query each. Returns the
+    number of categories that had drifted.
+    """
+    categories = Category.objects.order_by('pk').values_list('pk', flat=True)
+    if category_ids is not None:
+        categories = categories.filter(pk__in=list(category_ids))
+
+    drifted_total = 0
+    last_pk = 0
+    while True:
+        batch = list(categories.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return drifted_total
+        last_pk = batch[-1]
+
+        totals = {
+            row['category']: row
+            for row in Attraction.objects.filter(category__in=batch)
+            .values('category')
+            .annotate(
+                count=Count('id'), price=Sum('price'),
+                rating=Sum('average_rating'), reviews=Sum('rating_count'),
+            )
+            .order_by()
+        }
+        existing = CategoryStats.objects.in_bulk(batch)
+        now = timezone.now()
+        missing, drifted = [], []
+        for category_id in batch:
+            row = totals.get(category_id, {})
+            stats = existing.get(category_id)
+            expected = (
+                row.get('count', 0), row.get('price') or Decimal('0.00'),
+                row.get('rating') or 0.0, row.get('reviews') or 0,
+            )
+            if stats is None:
+                stats = CategoryStats(category_id=category_id)
+                missing.append(stats)
+            elif (
+                (stats.attraction_count, stats.price_sum, stats.review_count)
+                == (expected[0], expected[1], expected[3])
+                # Float sums of deltas and of the column differ in the last bits
+                and abs(stats.average_rating_sum - expected[2]) <= 1e-6 * max(1, expected[0])
+            ):
+                continue
+            else:
+                drifted.append(stats)
+            (stats.attraction_count, stats.price_sum,
+             stats.average_rating_sum, stats.review_count) = expected
+            stats.updated_at = now
+
+        if (missing or drifted) and not dry_run:
+            CategoryStats.objects.bulk_create(missing, ignore_conflicts=True)
+            CategoryStats.objects.bulk_update(
+                drifted, ['attraction_count', 'price_sum', 'average_rating_sum', 'review_count', 'updated_at']
+            )
+            # bulk writes send no signals
+            response_cache.invalidate(CategoryStats)
+        drifted_total += len(missing) + len(drifted)
+
+
+def apply_rating_drift(changes):
+    """
+    Apply to the category stats the rating changes (category_id,
+    average_rating_delta, rating_count_delta) of attractions updated in
+    bulk, one UPDATE per category.
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+    for category_id, average_rating, reviews in changes:
+        deltas[category_id][0] += average_rating
+        deltas[category_id][1] += reviews
+    for category_id, (average_rating, reviews) in deltas.items():
+        apply_category_delta(category_id, average_rating=average_rating, reviews=reviews)
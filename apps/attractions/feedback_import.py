@@ -0,0 +1,82 @@
+# apps/attractions/feedback_import.py
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework import serializers
+from tourism_backend import response_cache
+from .models import Attraction, Feedback
+from .ratings import recompute_ratings
+
+# Feedback arriving in bulk (the feedback/bulk/ endpoint and the
+# import_feedback command) skips the per-row path: rows are validated a
+# chunk at a time with one existence query per foreign key, inserted with
+# bulk_create (which sends no signals), and the ratings of the attractions
+# they touch are recomputed once afterwards.
+
+INSERT_BATCH_SIZE = 500
+
+
+class FeedbackImportSerializer(serializers.ModelSerializer):
+    # Plain ids, checked once per chunk in validate_feedback rather than
+    # with a query per row
+    attraction = serializers.IntegerField(source='attraction_id')
+
+    class Meta:
+        model = Feedback
+        fields = ['attraction', 'rating', 'comment']
+
+
+class FeedbackImportWithUserSerializer(FeedbackImportSerializer):
+    user = serializers.IntegerField(source='user_id')
+
+    class Meta(FeedbackImportSerializer.Meta):
+        fields = FeedbackImportSerializer.Meta.fields + ['user']
+
+
+def validate_feedback(rows, serializer_class=FeedbackImportSerializer):
+    """
+    Validate a chunk of rows. Returns the validated data of the good rows
+    and the errors of the others, both keyed by position in rows.
+    """
+    validated, errors = {}, {}
+    for index, row in enumerate(rows):
+        serializer = serializer_class(data=row)
+        if serializer.is_valid():
+            validated[index] = serializer.validated_data
+        else:
+            errors[index] = serializer.errors
+
+    does_not_exist = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+    for field, model in (('attraction', Attraction), ('user', get_user_model())):
+        source = f'{field}_id'
+        ids = {data[source] for data in validated.values() if source in data}
+        if not ids:
+            continue
+        existing = set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        for index, data in list(validated.items()):
+            if source in data and data[source] not in existing:
+                errors[index] = {field: [does_not_exist.format(pk_value=data[source])]}
+                del validated[index]
+    return validated, errors
+
+
+def insert_feedback(validated_data, **extra):
+    """
+    bulk_create Feedback rows; returns the ids of the attractions touched.
+    Ratings are left to recompute_ratings.
+    """
+    feedbacks = [Feedback(**data, **extra) for data in validated_data]
+    Feedback.objects.bulk_create(feedbacks, batch_size=INSERT_BATCH_SIZE)
+    # bulk_create sends no post_save
+    response_cache.invalidate(Feedback)
+    return {feedback.attraction_id for feedback in feedbacks}
+
+
+def create_feedback(validated_data, **extra):
+    """
+    Insert the rows and update the ratings they affect, in one transaction.
+    """
+    with transaction.atomic():
+        touched = insert_feedback(validated_data, **extra)
+        recompute_ratings(touched)
+    return len(validated_data)
@@ -0,0 +1,127 @@
+# apps/attractions/filters.py
+
+from django.db.models import QuerySet
+from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+from rest_framework.settings import api_settings
+from tourism_backend.instrumentation import set_view_variant
+from . import geo, search
+from .models import Attraction
+
+
+class AttractionFilterSet(filters.FilterSet):
+    """
+    ?category=, ?favorite_count__gte=, ?feedback_count__gte=,
+    ?average_rating__gte=, ?price__gte= and ?price__lte=. feedback_count is
+    the public name of rating_count, as in the serializer and ?ordering=.
+    """
+    feedback_count__gte = filters.NumberFilter(field_name='rating_count', lookup_expr='gte')
+
+    class Meta:
+        model = Attraction
+        fields = {
+            'category': ['exact'],
+            'favorite_count': ['gte'],
+            'average_rating': ['gte'],
+            'price': ['gte', 'lte'],
+        }
+
+
+class NearbyFilter(BaseFilterBackend):
+    """
+    "Near me" queries for attractions:
+      - ?lat=..&lng=..                 -> within DEFAULT_RADIUS_KM, nearest first
+      - ?lat=..&lng=..&radius=5        -> within 5 km, nearest first
+      - ?lat=..&lng=..&nearest=20      -> the 20 closest (optionally capped by radius)
+    Matching rows are annotated with distance_km. ?nearest= returns the
+    rows as a list (see geo.nearest), so it cannot be combined with ?ordering=.
+    """
+    lat_param = 'lat'
+    lng_param = 'lng'
+    radius_param = 'radius'
+    nearest_param = 'nearest'
+
+    DEFAULT_RADIUS_KM = 10.0
+    MAX_NEAREST = 100
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        if self.lat_param not in params and self.lng_param not in params:
+            return queryset
+        if self.nearest_param in params and params.get(api_settings.ORDERING_PARAM):
+            # Rejected before any geo query runs
+            raise ValidationError({api_settings.ORDERING_PARAM: "Cannot be combined with nearest."})
+
+        lat = self._number(params, self.lat_param, -90, 90, required=True)
+        lng = self._number(params, self.lng_param, -180, 180, required=True)
+        radius = self._number(params, self.radius_param, 0, geo.MAX_RADIUS_KM)
+        nearest = params.get(self.nearest_param)
+
+        if nearest is None:
+            return geo.within_radius(queryset, lat, lng, radius or self.DEFAULT_RADIUS_KM)
+
+        try:
+            k = int(nearest)
+        except ValueError:
+            k = 0
+        if not 1 <= k <= self.MAX_NEAREST:
+            raise ValidationError({
+                self.nearest_param: f"Must be an integer between 1 and {self.MAX_NEAREST}."
+            })
+        # One query per widening step: budgeted apart from plain lists
+        set_view_variant(request, self.nearest_param)
+        return geo.nearest(queryset, lat, lng, k, max_radius_km=radius or geo.MAX_RADIUS_KM)
+
+    def _number(self, params, name, low, high, required=False):
+        value = params.get(name)
+        if value is None:
+            if required:
+                raise ValidationError({name: "This parameter is required for nearby search."})
+            return None
+        try:
+            number = float(value)
+        except ValueError:
+            number = None
+        if number is None or not low <= number <= high:
+            raise ValidationError({name: f"Must be a number between {low:g} and {high:g}."})
+        return number
+
+
+class AttractionSearchFilter(SearchFilter):
+    """
+    ?search=... backed by the attraction inverted index (see search.py)
+    instead of icontains scans over name/address/description.
+    Each word prefix-matches ("muse" finds "museum"), all words must match,
+    and results come back most relevant first.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search.search(queryset, ' '.join(terms))
+
+
+class AttractionOrderingFilter(OrderingFilter):
+    """
+    ?ordering=-favorite_count, feedback_count, average_rating, price, ...
+    (the view's ordering_fields; "-" for descending). Each is served by an
+    index ending with id, which is appended as a tie-breaker so pages do not
+    shift between requests. field_map maps public names to model fields.
+    """
+    field_map = {'feedback_count': 'rating_count'}
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        if not isinstance(queryset, QuerySet) or queryset.query.is_sliced:
+            raise ValidationError({self.ordering_param: "Cannot be combined with nearest."})
+        fields = []
+        for term in ordering:
+            descending = term.startswith('-')
+            field = self.field_map.get(term.lstrip('-'), term.lstrip('-'))
+            fields.append(f"-{field}" if descending else field)
+        fields.append('-pk' if fields[0].startswith('-') else 'pk')
+        return queryset.order_by(*fields)
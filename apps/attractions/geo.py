@@ -0,0 +1,83 @@
+# apps/attractions/geo.py
+
+import math
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+
+# Nearest-k searches start from this radius and double it until enough
+# candidates fall inside the circle (or the whole globe is covered).
+NEAREST_START_RADIUS_KM = 5.0
+MAX_RADIUS_KM = math.pi * EARTH_RADIUS_KM
+
+
+def bounding_box_q(lat, lng, radius_km):
+    """
+    Q object selecting rows whose (latitude, longitude) lies inside the box
+    enclosing a circle of radius_km around (lat, lng). It only uses plain
+    range lookups so the composite (latitude, longitude) index can serve it.
+    Boxes crossing the antimeridian are split in two longitude ranges.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        # The circle reaches a pole: every longitude is a candidate.
+        return Q(latitude__gte=max(min_lat, -90), latitude__lte=min(max_lat, 90))
+
+    lat_q = Q(latitude__gte=min_lat, latitude__lte=max_lat)
+    ratio = math.sin(min(radius_km, MAX_RADIUS_KM) / EARTH_RADIUS_KM) / math.cos(math.radians(lat))
+    if ratio >= 1:
+        return lat_q
+    dlng = math.degrees(math.asin(ratio))
+    min_lng, max_lng = lng - dlng, lng + dlng
+    if min_lng < -180:
+        return lat_q & (Q(longitude__gte=min_lng + 360) | Q(longitude__lte=max_lng))
+    if max_lng > 180:
+        return lat_q & (Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360))
+    return lat_q & Q(longitude__gte=min_lng, longitude__lte=max_lng)
+
+
+def distance_expression(lat, lng):
+    """
+    Haversine distance (km) from (lat, lng) to each row, as an ORM expression.
+    """
+    row_lat = Radians(Cast(F('latitude'), FloatField()))
+    row_lng = Radians(Cast(F('longitude'), FloatField()))
+    origin_lat = math.radians(lat)
+    origin_lng = math.radians(lng)
+    a = (
+        Power(Sin((row_lat - origin_lat) / 2), 2)
+        + Cos(row_lat) * math.cos(origin_lat) * Power(Sin((row_lng - origin_lng) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def within_radius(queryset, lat, lng, radius_km):
+    """
+    Restrict queryset to rows within radius_km of (lat, lng), annotated with
+    distance_km and ordered nearest first. The bounding box is applied first,
+    so the exact distance is only evaluated for candidate rows.
+    """
+    return (
+        queryset.filter(bounding_box_q(lat, lng, radius_km))
+        .annotate(distance_km=distance_expression(lat, lng))
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km', 'pk')
+    )
+
+
+def nearest(queryset, lat, lng, k, max_radius_km=MAX_RADIUS_KM):
+    """
+    List of the k rows closest to (lat, lng), no further than max_radius_km
+    away. The search radius grows geometrically, so dense areas only ever
+    touch a small box of the index; each step is a single query that
+    fetches the candidates, rather than a COUNT followed by the fetch.
+    """
+    radius = min(NEAREST_START_RADIUS_KM, max_radius_km)
+    while True:
+        rows = list(within_radius(queryset, lat, lng, radius)[:k])
+        if radius >= max_radius_km or len(rows) >= k:
+            return rows
+        radius = min(radius * 2, max_radius_km)
@@ -0,0 +1,173 @@
+# apps/attractions/management/commands/benchmark_api.py
+
+import json
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from rest_framework.test import APIClient
+from accounts.models import User
+from accounts.tokens import RefreshToken
+from attractions.models import Attraction, Category
+from notifications.models import Notification
+from tourism_backend.benchmark import percentile, rolled_back
+from .seed_benchmark_data import ADJECTIVES, CITIES
+
+
+class _QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the main API endpoints in-process (no server or network) and report "
+        "throughput, p50/p99 latency and SQL queries per request for each. Run it against "
+        "a database filled by seed_benchmark_data, e.g. "
+        "DATABASE_URL=sqlite:////tmp/bench.sqlite3, and keep the --output of a run to "
+        "compare the next one against (--baseline). Rows written by the benchmark are rolled back. "
+        "Set a shared CACHE_URL (e.g. filecache:///tmp/bench-cache) to measure authentication "
+        "on token claims; with the local-memory cache every request reads the user row."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+        parser.add_argument('--warmup', type=int, default=10, help="Unmeasured requests per scenario.")
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help="Only run this scenario (repeatable); see the report for names.")
+        parser.add_argument('--username', default='bench0', help="Seeded user to act as.")
+        parser.add_argument('--password', default='benchmark')
+        parser.add_argument('--cached', action='store_true',
+                            help="Let the response cache serve repeated GETs.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Write the results to this JSON file.")
+        parser.add_argument('--baseline', help="JSON results of an earlier run to compare with.")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Slowdown of p50 against the baseline that fails the run.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user {options['username']}; run seed_benchmark_data first.")
+        attraction_ids = list(Attraction.objects.order_by('?').values_list('pk', flat=True)[:100])
+        category_ids = list(Category.objects.values_list('pk', flat=True))
+        notification_ids = list(
+            Notification.objects.filter(Q(user=user) | Q(user__isnull=True))
+            .order_by('-created_at').values_list('pk', flat=True)[:100]
+        )
+        if not attraction_ids or not notification_ids:
+            raise CommandError("No attractions or notifications; run seed_benchmark_data first.")
+
+        self.rng = random.Random(options['seed'])
+        self.cached = options['cached']
+        client = APIClient()
+        refresh = RefreshToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        rng = self.rng
+        credentials = {'username': options['username'], 'password': options['password']}
+
+        # name: (method, expected status, () -> (url, data))
+        scenarios = {
+            'attraction list': ('get', 200, lambda: (
+                '/api/attractions/attractions/', {'page': rng.randint(1, 50)})),
+            'attraction search': ('get', 200, lambda: (
+                '/api/attractions/attractions/',
+                {'search': f"{rng.choice(ADJECTIVES)} {rng.choice(CITIES)[0]}"})),
+            'attraction filter': ('get', 200, lambda: (
+                '/api/attractions/attractions/',
+                {'category': rng.choice(category_ids), 'price__lte': 20, 'ordering': '-favorite_count'})),
+            'attractions near me': ('get', 200, lambda: (
+                '/api/attractions/attractions/',
+                dict(zip(('lat', 'lng'), rng.choice(CITIES)[1:]), radius=5))),
+            'attraction detail': ('get', 200, lambda: (
+                f'/api/attractions/attractions/{rng.choice(attraction_ids)}/', {})),
+            'feedback create': ('post', 201, lambda: (
+                '/api/attractions/feedback/',
+                {'attraction': rng.choice(attraction_ids), 'rating': rng.randint(1, 5), 'comment': "Benchmark"})),
+            'notification list': ('get', 200, lambda: ('/api/notifications/', {})),
+            'notification detail': ('get', 200, lambda: (
+                f'/api/notifications/{rng.choice(notification_ids)}/', {})),
+            'login': ('post', 200, lambda: ('/api/accounts/login/', credentials)),
+            'token refresh': ('post', 200, lambda: ('/api/accounts/refresh/', {'refresh': str(refresh)})),
+        }
+        selected = options['scenarios'] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}.")
+
+        results = {}
+        self.stdout.write(f"{'scenario':<22} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8}")
+        with rolled_back():
+            for name in selected:
+                method, expected, request = scenarios[name]
+                for _ in range(options['warmup']):
+                    self._call(client, method, expected, request)
+                results[name] = self._run(client, method, expected, request, options['requests'])
+                stats = results[name]
+                self.stdout.write(
+                    f"{name:<22} {stats['rps']:9.1f} {stats['p50']:9.2f} {stats['p99']:9.2f}"
+                    f" {stats['queries']:8.1f}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+        if options['baseline']:
+            self._compare(results, options['baseline'], options['tolerance'])
+
+    def _call(self, client, method, expected, request):
+        url, data = request()
+        if method == 'get':
+            if not self.cached:
+                # An unused query parameter gives every request its own cache key
+                data = {**data, 'nocache': self.rng.random()}
+            response = client.get(url, data)
+        else:
+            response = client.post(url, data, format='json')
+        if response.status_code != expected:
+            raise CommandError(f"{method.upper()} {url}: {response.status_code} {response.content[:200]!r}")
+
+    def _run(self, client, method, expected, request, count):
+        samples = []
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            for _ in range(count):
+                start = time.perf_counter()
+                self._call(client, method, expected, request)
+                samples.append((time.perf_counter() - start) * 1000)
+            elapsed = time.perf_counter() - started
+        return {
+            'rps': count / elapsed,
+            'p50': percentile(samples, 50),
+            'p99': percentile(samples, 99),
+            'queries': counter.count / count,
+        }
+
+    def _compare(self, results, path, tolerance):
+        with open(path) as f:
+            baseline = json.load(f)
+        regressions = []
+        self.stdout.write(f"\nAgainst {path}:")
+        for name, stats in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            change = stats['p50'] / before['p50'] - 1 if before['p50'] else 0.0
+            self.stdout.write(
+                f"{name:<22} p50 {change:+7.1%}   queries {before['queries']:.1f} -> {stats['queries']:.1f}"
+            )
+            if change > tolerance:
+                regressions.append(f"{name}: p50 {before['p50']:.2f} -> {stats['p50']:.2f} ms")
+            if stats['queries'] > before['queries'] + 1e-9:
+                regressions.append(f"{name}: {before['queries']:.1f} -> {stats['queries']:.1f} queries/request")
+        if regressions:
+            raise CommandError("Regressions:\n" + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions."))
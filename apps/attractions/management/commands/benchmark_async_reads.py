@@ -0,0 +1,163 @@
+# apps/attractions/management/commands/benchmark_async_reads.py
+
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from urllib.parse import urlsplit
+from django.core.asgi import get_asgi_application
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from accounts.models import User
+from accounts.tokens import RefreshToken
+from attractions.models import Attraction, Category
+from tourism_backend.benchmark import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the attraction/category read endpoints at a given concurrency: the "
+        "sync viewsets under WSGI and ASGI against the async routes under ASGI. Requests "
+        "go straight to the WSGI/ASGI applications (no network or server in between), so "
+        "the numbers compare the request paths rather than a deployment. Uses a temporary "
+        "user (and --attractions temporary rows), deleted at the end. As with benchmark_api, "
+        "set a shared CACHE_URL to measure authentication on token claims."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per case.")
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--attractions', type=int, default=0,
+                            help="Temporary attractions to create before measuring.")
+        parser.add_argument('--cached', action='store_true',
+                            help="Let the response cache serve repeated requests.")
+
+    def handle(self, *args, **options):
+        user = User.objects.create(username=f"benchmark-{timezone.now().timestamp()}")
+        category = None
+        try:
+            if options['attractions']:
+                category = Category.objects.create(name=user.username)
+                Attraction.objects.bulk_create([
+                    Attraction(category=category, name=f"Benchmark {i}",
+                               latitude=Decimal('0'), longitude=Decimal('0'))
+                    for i in range(options['attractions'])
+                ], batch_size=1000)
+            attraction = Attraction.objects.order_by('-created_at').first()
+            if attraction is None:
+                raise CommandError("No attractions to read; pass --attractions N.")
+            headers = {'authorization': f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+            endpoints = (
+                ('attraction list', 'attractions/'),
+                ('attraction detail', f'attractions/{attraction.pk}/'),
+                ('category list', 'categories/'),
+            )
+            for name, path in endpoints:
+                self.stdout.write(
+                    f"\n{name}: {options['requests']:,} requests, concurrency {options['concurrency']}"
+                )
+                cases = (
+                    ('WSGI, sync view', self._run_wsgi, f'/api/attractions/{path}'),
+                    ('ASGI, sync view', self._run_asgi, f'/api/attractions/{path}'),
+                    ('ASGI, async view', self._run_asgi, f'/api/attractions/async/{path}'),
+                )
+                for label, run, url in cases:
+                    urls = self._urls(url, options['requests'], options['cached'])
+                    run(urls[:options['concurrency']], headers, options['concurrency'])  # warm up
+                    elapsed, samples = run(urls, headers, options['concurrency'])
+                    self.stdout.write(
+                        f"{label:<20} {len(samples) / elapsed:9.1f} req/s"
+                        f"   p50 {percentile(samples, 50):8.2f} ms   p99 {percentile(samples, 99):8.2f} ms"
+                    )
+        finally:
+            if category is not None:
+                category.delete()
+            user.delete()
+
+    def _urls(self, url, count, cached):
+        if cached:
+            return [url] * count
+        # An unused query parameter gives every request its own cache key
+        return [f"{url}?nocache={i}" for i in range(count)]
+
+    def _run_wsgi(self, urls, headers, concurrency):
+        """
+        A threaded WSGI server: `concurrency` threads calling the handler.
+        """
+        handler = WSGIHandler()
+        environ_headers = {f"HTTP_{name.upper()}": value for name, value in headers.items()}
+
+        def request(url):
+            parts = urlsplit(url)
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': parts.path, 'QUERY_STRING': parts.query,
+                'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+                'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(),
+                **environ_headers,
+            }
+            statuses = []
+            start = time.perf_counter()
+            response = handler(environ, lambda status, response_headers: statuses.append(status))
+            b''.join(response)
+            response.close()
+            elapsed = (time.perf_counter() - start) * 1000
+            if not statuses[0].startswith('200'):
+                raise CommandError(f"{url}: {statuses[0]}")
+            return elapsed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            samples = list(pool.map(request, urls))
+        return time.perf_counter() - start, samples
+
+    def _run_asgi(self, urls, headers, concurrency):
+        """
+        An ASGI server: one event loop with `concurrency` requests in flight.
+        """
+        application = get_asgi_application()
+        raw_headers = [(b'host', b'localhost')] + [
+            (name.encode(), value.encode()) for name, value in headers.items()
+        ]
+
+        async def request(url, semaphore):
+            parts = urlsplit(url)
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': parts.path,
+                'raw_path': parts.path.encode(), 'query_string': parts.query.encode(),
+                'headers': raw_headers, 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+            }
+            disconnected = asyncio.Event()
+            messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            statuses = []
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+
+            async with semaphore:
+                start = time.perf_counter()
+                await application(scope, receive, send)
+                elapsed = (time.perf_counter() - start) * 1000
+            disconnected.set()
+            if statuses[0] != 200:
+                raise CommandError(f"{url}: {statuses[0]}")
+            return elapsed
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+            start = time.perf_counter()
+            samples = await asyncio.gather(*(request(url, semaphore) for url in urls))
+            return time.perf_counter() - start, list(samples)
+
+        return asyncio.run(run())
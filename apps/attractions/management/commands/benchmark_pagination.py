@@ -0,0 +1,79 @@
+# apps/attractions/management/commands/benchmark_pagination.py
+
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from attractions.models import Attraction, Category, Feedback
+from notifications.models import Notification
+from tourism_backend.benchmark import format_stats, measure, rolled_back
+from tourism_backend.pagination import FeedPagination
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare page-number and keyset pagination latency of the feedback and "
+        "notification feeds at page 1 and a deep page. All generated rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page', type=int, default=10_000, help="Deep page to measure.")
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        page, page_size = options['page'], options['page_size']
+        rows = page * page_size
+        with rolled_back():
+            user = User.objects.create(username=f"benchmark-{timezone.now().timestamp()}")
+            self._seed(user, rows, options['batch_size'])
+
+            client = APIClient()
+            client.force_authenticate(user)
+            feeds = (
+                ('feedback', '/api/attractions/feedback/', Feedback.objects.filter(user=user)),
+                ('notifications', '/api/notifications/',
+                 Notification.objects.filter(Q(user=user) | Q(user__isnull=True))),
+            )
+            for name, url, feed in feeds:
+                self.stdout.write(f"\n{name}: {rows:,} rows, page size {page_size}")
+                deep_row = feed.order_by(*FeedPagination.keyset_ordering)[(page - 1) * page_size - 1]
+                deep_cursor = FeedPagination().encode_cursor((deep_row.created_at, deep_row.pk))
+                cases = (
+                    ('page number, page 1', {'page': 1}),
+                    (f'page number, page {page:,}', {'page': page}),
+                    ('keyset, page 1', {'cursor': ''}),
+                    (f'keyset, page {page:,}', {'cursor': deep_cursor}),
+                )
+                for label, params in cases:
+                    stats = measure(lambda: self._get(client, url, params), repeat=options['repeat'])
+                    self.stdout.write(format_stats(label, stats))
+
+    def _get(self, client, url, params):
+        response = client.get(url, params)
+        assert response.status_code == 200, response.content
+
+    def _seed(self, user, rows, batch_size):
+        category = Category.objects.create(name=f"benchmark-{user.username}")
+        attraction = Attraction.objects.create(
+            category=category, name="Benchmark", latitude=Decimal('0'), longitude=Decimal('0')
+        )
+        start = timezone.now() - timedelta(days=365)
+        for offset in range(0, rows, batch_size):
+            count = min(batch_size, rows - offset)
+            # bulk_create bypasses the rating signals, which are not what is measured here
+            Feedback.objects.bulk_create([
+                Feedback(user=user, attraction=attraction, rating=1 + i % 5,
+                         created_at=start + timedelta(seconds=offset + i))
+                for i in range(count)
+            ])
+            # Every third notification is a broadcast
+            Notification.objects.bulk_create([
+                Notification(user=None if i % 3 == 0 else user, title="Benchmark", message="...",
+                             created_at=start + timedelta(seconds=offset + i))
+                for i in range(count)
+            ])
@@ -0,0 +1,98 @@
+# apps/attractions/management/commands/benchmark_search.py
+
+import random
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Q
+from attractions.models import Attraction, Category
+from attractions.search import index_attractions, search
+from tourism_backend.benchmark import format_stats, measure, rolled_back
+
+PAGE_SIZE = 10
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'ne', 'to', 'sa', 'vi', 'du', 'pe', 'mar', 'tel', 'son', 'gra', 'bel']
+COMMON_WORDS = ['museum', 'park', 'garden', 'castle', 'tower', 'bridge', 'beach', 'lake',
+                'old', 'town', 'national', 'historic', 'art', 'gallery', 'river', 'view']
+
+
+def _vocabulary(rng, size=3000):
+    words = set(COMMON_WORDS)
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _legacy_search(queryset, text):
+    # What DRF's SearchFilter does with search_fields = ['name', 'address', 'description']
+    for term in text.split():
+        queryset = queryset.filter(
+            Q(name__icontains=term) | Q(address__icontains=term) | Q(description__icontains=term)
+        )
+    return queryset
+
+
+def _first_page(queryset):
+    # Mirrors PageNumberPagination: a COUNT(*) plus the first page of rows
+    queryset.count()
+    list(queryset[:PAGE_SIZE])
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the attraction search index against icontains SearchFilter scans "
+        "on synthetic data. All generated rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--queries', type=int, default=20, help="Queries timed per size.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = _vocabulary(rng)
+        with rolled_back():
+            category = Category.objects.create(name=f"benchmark-{rng.random()}")
+            created = 0
+            for size in sorted(options['sizes']):
+                self._grow(category, vocabulary, rng, size - created, options['batch_size'])
+                created = max(created, size)
+                self._run(size, vocabulary, rng, options['queries'])
+
+    def _grow(self, category, vocabulary, rng, count, batch_size):
+        while count > 0:
+            n = min(count, batch_size)
+            last_pk = Attraction.objects.aggregate(last=Max('pk'))['last'] or 0
+            Attraction.objects.bulk_create([
+                Attraction(
+                    category=category,
+                    name=' '.join(rng.choices(vocabulary, k=rng.randint(1, 3))).title(),
+                    address=f"{rng.randint(1, 999)} {rng.choice(vocabulary).title()} Street",
+                    description=' '.join(rng.choices(vocabulary, k=rng.randint(20, 60))),
+                    latitude=Decimal(f"{rng.uniform(-60, 70):.6f}"),
+                    longitude=Decimal(f"{rng.uniform(-180, 180):.6f}"),
+                )
+                for _ in range(n)
+            ], batch_size=batch_size)
+            # MySQL does not return primary keys from bulk_create, so read them back
+            index_attractions(
+                Attraction.objects.filter(pk__gt=last_pk).only('id', 'name', 'address', 'description'),
+                batch_size=batch_size,
+            )
+            count -= n
+
+    def _run(self, size, vocabulary, rng, queries):
+        texts = []
+        for _ in range(queries):
+            words = rng.sample(vocabulary, rng.randint(1, 2))
+            # Simulate a search box: the last word is often only partly typed
+            words[-1] = words[-1][:max(3, len(words[-1]) - rng.randint(0, 3))]
+            texts.append(' '.join(words))
+
+        self.stdout.write(f"\n{size:,} attractions, {queries} queries")
+        queryset = Attraction.objects.order_by('-created_at')
+        for label, strategy in (('SearchFilter (icontains)', _legacy_search), ('search index', search)):
+            remaining = iter(texts)
+            stats = measure(lambda: _first_page(strategy(queryset, next(remaining))),
+                            repeat=queries, warmup=0)
+            self.stdout.write(format_stats(label, stats))
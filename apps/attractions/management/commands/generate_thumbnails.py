@@ -0,0 +1,35 @@
+# apps/attractions/management/commands/generate_thumbnails.py
+
+from django.core.management.base import BaseCommand
+from accounts.models import Profile
+from attractions.models import Attraction, Category
+from tourism_backend.images import current_thumbnail, generate_thumbnail
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the missing or outdated image thumbnails of categories, attractions "
+        "and profiles, e.g. for images uploaded before thumbnails existed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only count the images without a current thumbnail.")
+
+    def handle(self, *args, **options):
+        for model in (Category, Attraction, Profile):
+            rows = (
+                model.objects.exclude(image='').exclude(image__isnull=True)
+                .only('pk', 'image', 'image_thumb').order_by('pk')
+            )
+            generated = 0
+            for instance in rows.iterator(chunk_size=options['batch_size']):
+                if current_thumbnail(instance) is not None:
+                    continue
+                if options['dry_run'] or generate_thumbnail(model, instance.pk, instance.image.name):
+                    generated += 1
+            verb = "missing" if options['dry_run'] else "generated"
+            self.stdout.write(self.style.SUCCESS(
+                f"{model.__name__}: {generated} thumbnail(s) {verb}."
+            ))
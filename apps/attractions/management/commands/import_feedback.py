@@ -0,0 +1,93 @@
+# apps/attractions/management/commands/import_feedback.py
+
+import csv
+import json
+import sys
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
+from attractions.feedback_import import (
+    FeedbackImportWithUserSerializer, insert_feedback, validate_feedback,
+)
+from attractions.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        "Import reviews from a JSONL or CSV file (or - for stdin) with the fields "
+        "user, attraction, rating and comment. The file is streamed and inserted a "
+        "chunk at a time; invalid rows are reported and skipped. Ratings of the "
+        "attractions touched are recomputed once at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['jsonl', 'csv'],
+                            help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Rows validated and inserted per transaction.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only validate the rows.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            imported, rejected = self._import(
+                self._read(stream, fmt), options['chunk_size'], options['dry_run']
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        verb = "would be imported" if options['dry_run'] else "imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{imported} review(s) {verb}, {rejected} rejected."
+        ))
+
+    def _read(self, stream, fmt):
+        """
+        (line number, row) pairs; rows that are not even parseable are
+        yielded as None.
+        """
+        if fmt == 'csv':
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+    def _import(self, rows, chunk_size, dry_run):
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be positive.")
+        imported = rejected = 0
+        touched = set()
+        try:
+            while chunk := list(islice(rows, chunk_size)):
+                parsed = [(line, row) for line, row in chunk if row is not None]
+                for line, row in chunk:
+                    if row is None:
+                        self.stderr.write(f"Line {line}: not a JSON object.")
+                rejected += len(chunk) - len(parsed)
+
+                validated, errors = validate_feedback(
+                    [row for _, row in parsed], FeedbackImportWithUserSerializer
+                )
+                for index, error in sorted(errors.items()):
+                    self.stderr.write(f"Line {parsed[index][0]}: {json.dumps(error)}")
+                rejected += len(errors)
+
+                if validated and not dry_run:
+                    touched |= insert_feedback(validated.values())
+                imported += len(validated)
+        finally:
+            # Also after a failure, for the chunks already committed
+            recompute_ratings(touched)
+        return imported, rejected
@@ -0,0 +1,35 @@
+# apps/attractions/management/commands/prune_tombstones.py
+
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from attractions.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the deletion records of the catalogue sync that are older than "
+        "SYNC_TOMBSTONE_RETENTION, in small batches. Clients that last synced before "
+        "then get the whole catalogue again. Meant to be run periodically, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only count the tombstones to delete.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=settings.SYNC_TOMBSTONE_RETENTION)
+        expired = Tombstone.objects.filter(deleted_at__lt=cutoff)
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} tombstone(s) would be deleted.")
+            return
+
+        deleted = 0
+        while True:
+            ids = list(expired.order_by('deleted_at', 'pk').values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += Tombstone.objects.filter(pk__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstone(s)."))
@@ -0,0 +1,15 @@
+# apps/attractions/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+from attractions.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the attraction search index from scratch (run once after migrating)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} attraction(s)."))
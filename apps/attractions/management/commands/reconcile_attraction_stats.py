@@ -0,0 +1,39 @@
+# apps/attractions/management/commands/reconcile_attraction_stats.py
+
+from django.core.management.base import BaseCommand
+from attractions.category_stats import reconcile_category_stats
+from attractions.popularity import reconcile_favorite_counts
+from attractions.ratings import reconcile_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute denormalized attraction counters (rating totals, favorite counts) and the "
+        "per-category stats from scratch, and fix any drift. With --dry-run, a consistency check."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Attractions processed per aggregate query.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report how many attractions have drifted.")
+
+    def handle(self, *args, **options):
+        drifted = reconcile_ratings(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        verb = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"Rating totals: {drifted} attraction(s) {verb}."))
+
+        drifted = reconcile_favorite_counts(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Favorite counts: {drifted} attraction(s) {verb}."))
+
+        drifted = reconcile_category_stats(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Category stats: {drifted} category(ies) {verb}."))
@@ -0,0 +1,223 @@
+# apps/attractions/management/commands/seed_benchmark_data.py
+
+import random
+import time
+from array import array
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from accounts.models import User
+from attractions.models import Attraction, Category, CategoryStats, Favorite, Feedback
+from attractions.category_stats import reconcile_category_stats
+from attractions.popularity import reconcile_favorite_counts
+from attractions.ratings import reconcile_ratings
+from attractions.search import index_attractions
+from notifications import counters
+from notifications.models import Notification
+from tourism_backend import response_cache
+
+# (city, latitude, longitude): attractions are scattered around these
+CITIES = (
+    ('Paris', 48.8566, 2.3522), ('London', 51.5074, -0.1278), ('Rome', 41.9028, 12.4964),
+    ('Barcelona', 41.3874, 2.1686), ('Istanbul', 41.0082, 28.9784), ('Cairo', 30.0444, 31.2357),
+    ('New York', 40.7128, -74.0060), ('Mexico City', 19.4326, -99.1332), ('Rio de Janeiro', -22.9068, -43.1729),
+    ('Cape Town', -33.9249, 18.4241), ('Dubai', 25.2048, 55.2708), ('Delhi', 28.6139, 77.2090),
+    ('Bangkok', 13.7563, 100.5018), ('Singapore', 1.3521, 103.8198), ('Tokyo', 35.6762, 139.6503),
+    ('Sydney', -33.8688, 151.2093), ('Marrakesh', 31.6295, -7.9811), ('Reykjavik', 64.1466, -21.9426),
+)
+CATEGORIES = (
+    'Museum', 'Park', 'Monument', 'Beach', 'Gallery', 'Castle', 'Cathedral', 'Market',
+    'Garden', 'Zoo', 'Aquarium', 'Viewpoint', 'Theatre', 'Palace', 'Temple', 'Harbour',
+)
+ADJECTIVES = (
+    'Old', 'Royal', 'Grand', 'Hidden', 'National', 'Little', 'Golden', 'Ancient',
+    'Modern', 'Botanical', 'Maritime', 'Imperial', 'Sunset', 'Riverside', 'Historic',
+)
+STREETS = ('Main Street', 'Harbour Road', 'Market Square', 'Castle Hill', 'Park Avenue', 'River Walk')
+WORDS = (
+    'guided', 'tours', 'daily', 'family', 'friendly', 'view', 'history', 'art', 'collection',
+    'open', 'late', 'summer', 'local', 'food', 'gardens', 'architecture', 'free', 'entry',
+    'children', 'sunset', 'photography', 'exhibition', 'music', 'festival', 'walking',
+)
+COMMENTS = (
+    "Loved it!", "Worth the visit.", "Too crowded in the afternoon.", "Great for kids.",
+    "A bit expensive.", "Stunning views.", "Would come back.", "Not what I expected.",
+)
+# Star ratings skew positive, as they do on real review sites
+RATING_WEIGHTS = (4, 6, 15, 35, 40)
+# Rows are spread over this period, oldest first
+HISTORY = timedelta(days=730)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a synthetic tourism dataset for load tests and benchmarks: "
+        "categories, attractions around world cities, users, feedback skewed towards popular "
+        "attractions, favorites and notifications. Rows are streamed in batches with "
+        "bulk_create, then the denormalized counters and the search index are brought up to "
+        "date. Meant for a dedicated database, e.g. DATABASE_URL=sqlite:////tmp/bench.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attractions', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--feedback', type=int, default=10_000_000)
+        parser.add_argument('--favorites', type=int, default=1_000_000)
+        parser.add_argument('--broadcasts', type=int, default=1_000,
+                            help="Notifications sent to every user.")
+        parser.add_argument('--notifications', type=int, default=1_000_000,
+                            help="Notifications sent to one user each.")
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help="Multiply every volume, e.g. 0.01 for a quick run.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for repeatable datasets.")
+        parser.add_argument('--prefix', default='bench',
+                            help="Username prefix of the generated users.")
+        parser.add_argument('--password', default='benchmark',
+                            help="Password of every generated user (see benchmark_api).")
+
+    def handle(self, *args, **options):
+        volumes = {
+            name: int(options[name] * options['scale'])
+            for name in ('attractions', 'users', 'feedback', 'favorites', 'broadcasts', 'notifications')
+        }
+        if volumes['favorites'] > volumes['users'] * volumes['attractions']:
+            raise CommandError("More favorites than (user, attraction) pairs.")
+        if User.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(f"Users named {options['prefix']}* exist already; pass another --prefix.")
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.start = timezone.now() - HISTORY
+
+        categories = [
+            Category.objects.get_or_create(name=name)[0].pk for name in CATEGORIES
+        ]
+        attraction_ids = self._seed(
+            Attraction, volumes['attractions'], self._attractions(volumes['attractions'], categories)
+        )
+        user_ids = self._seed(
+            User, volumes['users'],
+            self._users(volumes['users'], options['prefix'], make_password(options['password'])),
+        )
+        if attraction_ids and user_ids:
+            self._seed(Feedback, volumes['feedback'],
+                       self._feedback(volumes['feedback'], user_ids, attraction_ids))
+            self._seed(Favorite, volumes['favorites'],
+                       self._favorites(volumes['favorites'], user_ids, attraction_ids))
+        self._seed(Notification, volumes['broadcasts'], self._notifications(volumes['broadcasts'], None))
+        if user_ids:
+            self._seed(Notification, volumes['notifications'],
+                       self._notifications(volumes['notifications'], user_ids))
+
+        # bulk_create sends no signals: bring derived data up to date
+        self._step("search index", lambda: self._index(attraction_ids))
+        self._step("rating totals", lambda: reconcile_ratings(batch_size=self.batch_size))
+        self._step("favorite counts", lambda: reconcile_favorite_counts(batch_size=self.batch_size))
+        self._step("category stats", lambda: reconcile_category_stats(batch_size=self.batch_size))
+        counters.reset_all()
+        response_cache.invalidate(Category, CategoryStats, Attraction, Feedback, Favorite)
+
+    def _seed(self, model, count, rows):
+        """
+        bulk_create `rows` one batch per transaction; returns the new primary
+        keys (read back afterwards, as MySQL does not return them).
+        """
+        if not count:
+            return array('q')
+        last_pk = model.objects.aggregate(last=Max('pk'))['last'] or 0
+        name = model._meta.verbose_name_plural
+        started = time.perf_counter()
+        created = 0
+        while batch := list(islice(rows, self.batch_size)):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            created += len(batch)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"\r{name}: {created:,}/{count:,} ({created / elapsed:,.0f} rows/s)", ending='')
+            self.stdout.flush()
+        self.stdout.write('')
+        return array('q', model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True))
+
+    def _step(self, label, fn):
+        started = time.perf_counter()
+        self.stdout.write(f"{label}...", ending='')
+        self.stdout.flush()
+        fn()
+        self.stdout.write(f" {time.perf_counter() - started:.1f}s")
+
+    def _created_at(self, index, count):
+        # Increasing with the index, as if the rows had been written over time
+        return self.start + HISTORY * (index / count) + timedelta(seconds=self.rng.random())
+
+    def _popular(self, ids):
+        # Low ids are far more popular than high ones (a long tail)
+        return ids[int(len(ids) * self.rng.random() ** 3)]
+
+    def _attractions(self, count, categories):
+        rng = self.rng
+        for i in range(count):
+            city, lat, lng = rng.choice(CITIES)
+            kind = CATEGORIES[i % len(CATEGORIES)]
+            yield Attraction(
+                category_id=categories[i % len(categories)],
+                name=f"{rng.choice(ADJECTIVES)} {city} {kind} {i}",
+                # Most within ~10 km of the centre, some further out
+                latitude=Decimal(f"{max(-90, min(90, rng.gauss(lat, 0.1))):.6f}"),
+                longitude=Decimal(f"{(rng.gauss(lng, 0.1) + 180) % 360 - 180:.6f}"),
+                address=f"{rng.randint(1, 300)} {rng.choice(STREETS)}, {city}",
+                description=' '.join(rng.choices(WORDS, k=rng.randint(8, 30))).capitalize() + '.',
+                price=Decimal(rng.choice((0, 0, 5, 10, 12.5, 15, 20, 30, 45))).quantize(Decimal('0.01')),
+                created_at=self._created_at(i, count),
+            )
+
+    def _users(self, count, prefix, password):
+        for i in range(count):
+            yield User(
+                username=f"{prefix}{i}", password=password,
+                created_at=self._created_at(i, count),
+            )
+
+    def _feedback(self, count, user_ids, attraction_ids):
+        rng = self.rng
+        for i in range(count):
+            yield Feedback(
+                user_id=rng.choice(user_ids),
+                attraction_id=self._popular(attraction_ids),
+                rating=rng.choices(range(1, 6), RATING_WEIGHTS)[0],
+                comment=rng.choice(COMMENTS) if rng.random() < 0.4 else None,
+                created_at=self._created_at(i, count),
+            )
+
+    def _favorites(self, count, user_ids, attraction_ids):
+        seen = set()
+        i = 0
+        while i < count:
+            pair = (self.rng.choice(user_ids), self._popular(attraction_ids))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            yield Favorite(user_id=pair[0], attraction_id=pair[1], created_at=self._created_at(i, count))
+            i += 1
+
+    def _notifications(self, count, user_ids):
+        rng = self.rng
+        for i in range(count):
+            yield Notification(
+                user_id=rng.choice(user_ids) if user_ids else None,
+                title=f"{rng.choice(ADJECTIVES)} {rng.choice(CATEGORIES).lower()} news",
+                message=' '.join(rng.choices(WORDS, k=20)).capitalize() + '.',
+                is_read=bool(user_ids) and rng.random() < 0.5,
+                created_at=self._created_at(i, count),
+            )
+
+    def _index(self, attraction_ids):
+        fields = Attraction.objects.only('id', 'name', 'address', 'description')
+        for offset in range(0, len(attraction_ids), self.batch_size):
+            chunk = attraction_ids[offset:offset + self.batch_size]
+            index_attractions(fields.filter(pk__gte=chunk[0], pk__lte=chunk[-1]), batch_size=self.batch_size)
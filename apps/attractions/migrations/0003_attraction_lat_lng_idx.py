@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0002_attraction_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(fields=['latitude', 'longitude'], name='attraction_lat_lng_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:47
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rating_totals(apps, schema_editor):
+    Attraction = apps.get_model('attractions', 'Attraction')
+    Feedback = apps.get_model('attractions', 'Feedback')
+    totals = (
+        Feedback.objects.values('attraction')
+        .annotate(total=Sum('rating'), count=Count('id'))
+        .order_by()
+    )
+    for row in totals.iterator():
+        Attraction.objects.filter(pk=row['attraction']).update(
+            rating_sum=row['total'],
+            rating_count=row['count'],
+            average_rating=row['total'] / row['count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0003_attraction_lat_lng_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attraction',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='attraction',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0004_attraction_rating_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttractionSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('attraction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='attractions.attraction')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('term', 'attraction'), name='unique_attraction_search_term')],
+            },
+        ),
+    ]
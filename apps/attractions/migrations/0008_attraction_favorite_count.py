@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:32
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_favorite_counts(apps, schema_editor):
+    Attraction = apps.get_model('attractions', 'Attraction')
+    Favorite = apps.get_model('attractions', 'Favorite')
+    counts = Favorite.objects.values('attraction').annotate(count=Count('id')).order_by()
+    for row in counts.iterator():
+        Attraction.objects.filter(pk=row['attraction']).update(favorite_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0007_image_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attraction',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_favorite_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(fields=['-favorite_count', '-id'], name='attraction_favorites_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(fields=['-rating_count', '-id'], name='attraction_feedback_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(fields=['-average_rating', '-id'], name='attraction_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(fields=['price', 'id'], name='attraction_price_idx'),
+        ),
+    ]
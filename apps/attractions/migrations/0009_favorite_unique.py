@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:33
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_favorites(apps, schema_editor):
+    Attraction = apps.get_model('attractions', 'Attraction')
+    Favorite = apps.get_model('attractions', 'Favorite')
+    duplicates = (
+        Favorite.objects.values('user', 'attraction')
+        .annotate(keep=Min('id'), count=Count('id'))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    touched = set()
+    for row in duplicates.iterator():
+        Favorite.objects.filter(user=row['user'], attraction=row['attraction']).exclude(pk=row['keep']).delete()
+        touched.add(row['attraction'])
+    # Historical models send no signals: recount the attractions affected
+    for attraction_id in touched:
+        Attraction.objects.filter(pk=attraction_id).update(
+            favorite_count=Favorite.objects.filter(attraction=attraction_id).count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0008_attraction_favorite_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_favorites, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('user', 'attraction'), name='favorite_user_attraction_uniq'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:42
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Max
+
+BATCH_SIZE = 10000
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing reviews were last changed when created, as far as we know
+    Feedback = apps.get_model('attractions', 'Feedback')
+    last_pk = Feedback.objects.aggregate(last=Max('pk'))['last'] or 0
+    for start in range(0, last_pk, BATCH_SIZE):
+        Feedback.objects.filter(pk__gt=start, pk__lte=start + BATCH_SIZE).update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0009_favorite_unique'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(fields=['updated_at', 'id'], name='attraction_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['updated_at', 'id'], name='feedback_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:50
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_category_stats(apps, schema_editor):
+    Attraction = apps.get_model('attractions', 'Attraction')
+    Category = apps.get_model('attractions', 'Category')
+    CategoryStats = apps.get_model('attractions', 'CategoryStats')
+    totals = {
+        row['category']: row
+        for row in Attraction.objects.values('category').annotate(
+            count=Count('id'), price=Sum('price'), rating=Sum('average_rating'), reviews=Sum('rating_count'),
+        ).order_by()
+    }
+    CategoryStats.objects.bulk_create([
+        CategoryStats(
+            category_id=category_id,
+            attraction_count=totals.get(category_id, {}).get('count', 0),
+            price_sum=totals.get(category_id, {}).get('price') or Decimal('0.00'),
+            average_rating_sum=totals.get(category_id, {}).get('rating') or 0.0,
+            review_count=totals.get(category_id, {}).get('reviews') or 0,
+        )
+        for category_id in Category.objects.values_list('pk', flat=True).iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0011_catalogue_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='attractions.category')),
+                ('attraction_count', models.IntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('average_rating_sum', models.FloatField(default=0.0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_category_stats, migrations.RunPython.noop),
+    ]
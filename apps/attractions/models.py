@@ -11,10 +11,18 @@ class Category(models.Model):
     """
     name = models.CharField(max_length=100, unique=True)
     image = models.ImageField(upload_to='categories/', null=True, blank=True)
+    # WebP thumbnail of image, generated in the background (tourism_backend/images.py)
+    image_thumb = models.ImageField(upload_to='categories/', max_length=255, editable=False, null=True, blank=True)
 
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Catalogue delta sync (see sync.py)
+            models.Index(fields=['updated_at', 'id'], name='category_updated_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -30,6 +38,7 @@ class Attraction(models.Model):
     address = models.CharField(max_length=255, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to='attractions/', blank=True, null=True)
+    image_thumb = models.ImageField(upload_to='attractions/', max_length=255, editable=False, blank=True, null=True)
     price = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -37,18 +46,105 @@ class Attraction(models.Model):
     )
 
     average_rating = models.FloatField(default=0.0)
+    # Running totals kept in sync by signals, so average_rating never needs
+    # a full AVG() over the feedback table (see ratings.py).
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    # Number of users who favorited the attraction, kept in sync by signals
+    # (see popularity.py)
+    favorite_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Bounding-box prefilter for "near me" queries (see geo.py)
+            models.Index(fields=['latitude', 'longitude'], name='attraction_lat_lng_idx'),
+            # ?ordering= on the list (see AttractionOrderingFilter); id breaks ties
+            models.Index(fields=['-favorite_count', '-id'], name='attraction_favorites_idx'),
+            models.Index(fields=['-rating_count', '-id'], name='attraction_feedback_idx'),
+            models.Index(fields=['-average_rating', '-id'], name='attraction_rating_idx'),
+            models.Index(fields=['price', 'id'], name='attraction_price_idx'),
+            # Incremental exports and catalogue delta sync (see export.py, sync.py)
+            models.Index(fields=['updated_at', 'id'], name='attraction_updated_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values the category stats are built from, so
+        # signals can apply deltas on update (see category_stats.py)
+        instance._stats_snapshot = instance.stats_snapshot()
+        return instance
+
+    def stats_snapshot(self):
+        values = tuple(
+            self.__dict__.get(name) for name in ('category_id', 'price', 'average_rating', 'rating_count')
+        )
+        return None if None in values else values
+
     def __str__(self):
         return f"{self.name} ({self.category.name})"
 
 
+class CategoryStats(models.Model):
+    """
+    Aggregates of a category's attractions for dashboards, kept up to date
+    incrementally by signals and rating updates so that reading them never
+    groups over the attraction table (see category_stats.py).
+    """
+    category = models.OneToOneField(Category, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    # Signed: a delta applied to a drifted row must not fail the write that
+    # triggered it; reconcile_attraction_stats repairs the drift.
+    attraction_count = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal('0.00'))
+    average_rating_sum = models.FloatField(default=0.0)
+    # Sum of the attractions' rating_count
+    review_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def average_price(self):
+        if not self.attraction_count:
+            return None
+        return (self.price_sum / self.attraction_count).quantize(Decimal('0.01'))
+
+    @property
+    def average_rating(self):
+        # Mean of the attractions' average_rating, unrated ones included
+        if not self.attraction_count:
+            return None
+        return self.average_rating_sum / self.attraction_count
+
+    def __str__(self):
+        return f"Stats of category {self.category_id}"
+
+
+class AttractionSearchTerm(models.Model):
+    """
+    Inverted index for attraction search: one row per (term, attraction),
+    weighted by where and how often the term occurs. Kept in sync by signals;
+    see search.py.
+    """
+    term = models.CharField(max_length=64)
+    attraction = models.ForeignKey(Attraction, on_delete=models.CASCADE, related_name='search_terms')
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            # Leading 'term' column serves prefix lookups (term LIKE 'abc%')
+            models.UniqueConstraint(fields=['term', 'attraction'], name='unique_attraction_search_term'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.attraction_id} ({self.weight})"
+
+
 class Feedback(models.Model):
     """
     Stores user feedback (rating + comment) for an Attraction.
-    The average rating is stored in Attraction.average_rating and recalculated
-    via signals whenever Feedback changes.
+    The average rating is stored in Attraction.average_rating and recomputed
+    by background tasks queued from signals whenever Feedback changes.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feedbacks')
     attraction = models.ForeignKey(Attraction, on_delete=models.CASCADE, related_name='feedbacks')
@@ -56,6 +152,30 @@ class Feedback(models.Model):
     comment = models.TextField(blank=True, null=True)
 
     created_at = models.DateTimeField(default=timezone.now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the feed, newest first (see FeedPagination)
+            models.Index(fields=['-created_at', '-id'], name='feedback_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='feedback_user_created_idx'),
+            # Incremental exports (?since=, see export.py)
+            models.Index(fields=['updated_at', 'id'], name='feedback_updated_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored (attraction, rating) so signals can apply deltas on update
+        instance._rating_snapshot = instance.rating_snapshot()
+        return instance
+
+    def rating_snapshot(self):
+        attraction_id = self.__dict__.get('attraction_id')
+        rating = self.__dict__.get('rating')
+        if attraction_id is None or rating is None:
+            return None
+        return (attraction_id, rating)
 
     def __str__(self):
         return f"Feedback {self.pk} by {self.user.username} -> {self.attraction.name}"
@@ -64,11 +184,48 @@ class Feedback(models.Model):
 class Favorite(models.Model):
     """
     Many-to-many relationship between User and Attraction.
-    A user can 'favorite' multiple attractions.
+    A user can 'favorite' multiple attractions, each at most once.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorites')
     attraction = models.ForeignKey(Attraction, on_delete=models.CASCADE, related_name='favorited_by')
     created_at = models.DateTimeField(default=timezone.now, editable=False)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the feed, newest first (see FeedPagination)
+            models.Index(fields=['-created_at', '-id'], name='favorite_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='favorite_user_created_idx'),
+        ]
+        constraints = [
+            # Also serves the is_favorited lookups of the attraction list
+            models.UniqueConstraint(fields=['user', 'attraction'], name='favorite_user_attraction_uniq'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored attraction so signals can move the count on update
+        instance._attraction_snapshot = instance.__dict__.get('attraction_id')
+        return instance
+
     def __str__(self):
         return f"{self.user.username} favorited {self.attraction.name}"
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted category or attraction, so that offline clients
+    syncing the catalogue learn about the deletion (see sync.py). Pruned
+    after SYNC_TOMBSTONE_RETENTION by the prune_tombstones command.
+    """
+    kind = models.CharField(max_length=20)  # model name: 'category' or 'attraction'
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted at {self.deleted_at}"
@@ -9,4 +9,4 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         # Safe methods = GET, HEAD, OPTIONS
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
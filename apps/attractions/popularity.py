@@ -0,0 +1,57 @@
+# apps/attractions/popularity.py
+
+from django.db.models import Count, F
+from django.utils import timezone
+from tourism_backend import response_cache
+from .models import Attraction, Favorite
+
+
+def apply_favorite_delta(attraction_id, delta):
+    """
+    Adjust an attraction's favorite_count with a single atomic UPDATE.
+    """
+    rows = Attraction.objects.filter(pk=attraction_id)
+    if delta < 0:
+        # The column is unsigned: never go below zero, even after drift
+        rows = rows.filter(favorite_count__gte=-delta)
+    rows.update(favorite_count=F('favorite_count') + delta, updated_at=timezone.now())
+
+
+def reconcile_favorite_counts(attraction_ids=None, batch_size=1000, dry_run=False):
+    """
+    Recompute favorite_count from the Favorite table, in primary-key batches
+    of attractions with one grouped count each. Returns the number of
+    attractions that had drifted.
+    """
+    attractions = Attraction.objects.only('id', 'favorite_count').order_by('pk')
+    if attraction_ids is not None:
+        attractions = attractions.filter(pk__in=list(attraction_ids))
+
+    drifted_total = 0
+    last_pk = 0
+    while True:
+        batch = list(attractions.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return drifted_total
+        last_pk = batch[-1].pk
+
+        counts = dict(
+            Favorite.objects.filter(attraction__in=[a.pk for a in batch])
+            .values_list('attraction')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        now = timezone.now()
+        drifted = []
+        for attraction in batch:
+            count = counts.get(attraction.pk, 0)
+            if attraction.favorite_count != count:
+                attraction.favorite_count = count
+                attraction.updated_at = now
+                drifted.append(attraction)
+
+        if drifted and not dry_run:
+            Attraction.objects.bulk_update(drifted, ['favorite_count', 'updated_at'])
+            # bulk_update sends no post_save
+            response_cache.invalidate(Attraction)
+        drifted_total += len(drifted)
@@ -0,0 +1,116 @@
+# apps/attractions/ratings.py
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from tourism_backend import response_cache
+from .category_stats import apply_category_delta, apply_rating_drift
+from .models import Attraction, Feedback
+
+
+def average(rating_sum, rating_count):
+    return rating_sum / rating_count if rating_count else 0.0
+
+
+def apply_rating_delta(attraction_id, rating_delta, count_delta):
+    """
+    Adjust an attraction's running rating totals and refresh average_rating.
+    Constant work per call, whatever the number of reviews: the totals are
+    bumped atomically with F() and only average_rating/updated_at are written back.
+    """
+    with transaction.atomic():
+        updated = Attraction.objects.filter(pk=attraction_id).update(
+            rating_sum=F('rating_sum') + rating_delta,
+            rating_count=F('rating_count') + count_delta,
+        )
+        if not updated:
+            return
+        attraction = Attraction.objects.only(
+            'category', 'rating_sum', 'rating_count', 'average_rating'
+        ).get(pk=attraction_id)
+        old_average = attraction.average_rating
+        attraction.average_rating = average(attraction.rating_sum, attraction.rating_count)
+        attraction.save(update_fields=['average_rating', 'updated_at'])
+        # Signals leave rating updates to us (see category_stats.py)
+        apply_category_delta(
+            attraction.category_id,
+            average_rating=attraction.average_rating - old_average,
+            reviews=count_delta,
+        )
+
+
+def reconcile_ratings(attraction_ids=None, batch_size=1000, dry_run=False):
+    """
+    Recompute rating totals from the Feedback table and fix any drift.
+    Works through attractions in primary-key batches: one grouped aggregate
+    query per batch, and one bulk_update for the rows that differ.
+    Returns the number of attractions that had drifted.
+    """
+    attractions = Attraction.objects.only(
+        'id', 'category', 'rating_sum', 'rating_count', 'average_rating'
+    ).order_by('pk')
+    if attraction_ids is not None:
+        attractions = attractions.filter(pk__in=list(attraction_ids))
+
+    drifted_total = 0
+    last_pk = 0
+    while True:
+        batch = list(attractions.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return drifted_total
+        last_pk = batch[-1].pk
+
+        totals = {
+            row['attraction']: (row['total'], row['count'])
+            for row in Feedback.objects.filter(attraction__in=[a.pk for a in batch])
+            .values('attraction')
+            .annotate(total=Sum('rating'), count=Count('id'))
+            .order_by()
+        }
+        now = timezone.now()
+        drifted = []
+        stats_changes = []
+        for attraction in batch:
+            rating_sum, rating_count = totals.get(attraction.pk, (0, 0))
+            avg = average(rating_sum, rating_count)
+            if (
+                attraction.rating_sum != rating_sum
+                or attraction.rating_count != rating_count
+                or abs(attraction.average_rating - avg) > 1e-9
+            ):
+                stats_changes.append((
+                    attraction.category_id, avg - attraction.average_rating,
+                    rating_count - attraction.rating_count,
+                ))
+                attraction.rating_sum = rating_sum
+                attraction.rating_count = rating_count
+                attraction.average_rating = avg
+                attraction.updated_at = now
+                drifted.append(attraction)
+
+        if drifted and not dry_run:
+            Attraction.objects.bulk_update(
+                drifted, ['rating_sum', 'rating_count', 'average_rating', 'updated_at']
+            )
+            # bulk_update sends no post_save
+            response_cache.invalidate(Attraction)
+            apply_rating_drift(stats_changes)
+        drifted_total += len(drifted)
+
+
+def recompute_ratings(attraction_ids):
+    """
+    Bring the rating totals of these attractions up to date after Feedback
+    rows were written without signals (bulk_create). The attraction rows are
+    locked first, so a concurrent apply_rating_delta waits instead of being
+    overwritten by the recomputed totals.
+    """
+    attraction_ids = sorted(attraction_ids)
+    if not attraction_ids:
+        return 0
+    with transaction.atomic():
+        list(
+            Attraction.objects.select_for_update()
+            .filter(pk__in=attraction_ids).order_by('pk').values_list('pk', flat=True)
+        )
+        return reconcile_ratings(attraction_ids)
@@ -0,0 +1,132 @@
+# apps/attractions/search.py
+
+import re
+import unicodedata
+from collections import Counter
+from django.db import transaction
+from django.db.models import Case, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value, When
+from .models import Attraction, AttractionSearchTerm
+
+# Relevance of a term depending on the field it was found in
+FIELD_WEIGHTS = {
+    'name': 5,
+    'address': 2,
+    'description': 1,
+}
+# Repeating a word over and over should not push an attraction to the top
+MAX_OCCURRENCES_PER_FIELD = 3
+
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+
+INDEXED_FIELDS = frozenset(FIELD_WEIGHTS)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text, min_length=MIN_TERM_LENGTH):
+    """
+    Split text into normalized terms: accents stripped, case folded,
+    words shorter than min_length dropped.
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return [
+        word[:MAX_TERM_LENGTH]
+        for word in _WORD_RE.findall(text)
+        if len(word) >= min_length
+    ]
+
+
+def build_terms(attraction):
+    """
+    {term: weight} for an attraction (any object with name/address/description).
+    """
+    weights = Counter()
+    for field, field_weight in FIELD_WEIGHTS.items():
+        occurrences = Counter(tokenize(getattr(attraction, field)))
+        for term, count in occurrences.items():
+            weights[term] += field_weight * min(count, MAX_OCCURRENCES_PER_FIELD)
+    return weights
+
+
+def index_attractions(attractions, batch_size=1000):
+    """
+    (Re)build the index rows of the given attractions.
+    """
+    attractions = list(attractions)
+    if not attractions:
+        return
+    rows = [
+        AttractionSearchTerm(term=term, attraction_id=attraction.pk, weight=weight)
+        for attraction in attractions
+        for term, weight in build_terms(attraction).items()
+    ]
+    with transaction.atomic():
+        AttractionSearchTerm.objects.filter(attraction__in=[a.pk for a in attractions]).delete()
+        AttractionSearchTerm.objects.bulk_create(rows, batch_size=batch_size)
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Reindex every attraction, batch by batch. Returns the number indexed.
+    """
+    indexed = 0
+    last_pk = 0
+    fields = Attraction.objects.only('id', *INDEXED_FIELDS).order_by('pk')
+    while True:
+        batch = list(fields.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return indexed
+        index_attractions(batch, batch_size=batch_size)
+        indexed += len(batch)
+        last_pk = batch[-1].pk
+
+
+def _prefix_range(word):
+    # term >= 'mus' AND term < 'mut': a plain range, so every database can use
+    # the term index (LIKE 'mus%' cannot on SQLite and depends on collation elsewhere).
+    upper = word[:-1] + chr(ord(word[-1]) + 1)
+    return Q(term__gte=word, term__lt=upper)
+
+
+def search(queryset, text):
+    """
+    Filter an Attraction queryset down to rows where every query word is a
+    prefix of some indexed term, annotated with search_rank and ordered by it.
+    Matching is done on the index table alone (range scans on term), never by
+    scanning the attraction text columns.
+    """
+    # A single typed letter is still a usable prefix
+    words = list(dict.fromkeys(tokenize(text, min_length=1)))[:MAX_QUERY_TERMS]
+    if not words:
+        return queryset
+
+    any_word = Q()
+    words_matched = Value(0)
+    for word in words:
+        is_prefix = _prefix_range(word)
+        any_word |= is_prefix
+        words_matched = words_matched + Max(Case(
+            When(is_prefix, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+
+    matches = (
+        AttractionSearchTerm.objects.filter(any_word)
+        .values('attraction')
+        .annotate(rank=Sum('weight'), words_matched=words_matched)
+        .filter(words_matched=len(words))
+        .order_by()
+    )
+    return (
+        queryset.filter(pk__in=matches.values('attraction'))
+        .annotate(search_rank=Subquery(
+            matches.filter(attraction=OuterRef('pk')).values('rank')[:1]
+        ))
+        .order_by('-search_rank', '-created_at')
+    )
@@ -1,23 +1,56 @@
 # apps/attractions/serializers.py
 
 from rest_framework import serializers
-from .models import Category, Attraction, Feedback, Favorite
+from tourism_backend.images import ThumbnailField
+from .models import Category, CategoryStats, Attraction, Feedback, Favorite
 
 class CategorySerializer(serializers.ModelSerializer):
+    # Small WebP version of image for list pages; null until generated
+    image_thumb = ThumbnailField()
+    # Precomputed aggregates of the category's attractions, read from the
+    # joined stats row (see category_stats.py); null if it has none yet
+    attraction_count = serializers.ReadOnlyField(source='stats.attraction_count')
+    average_price = serializers.DecimalField(
+        source='stats.average_price', max_digits=10, decimal_places=2, read_only=True
+    )
+    average_rating = serializers.FloatField(source='stats.average_rating', read_only=True)
+    review_count = serializers.ReadOnlyField(source='stats.review_count')
+
     class Meta:
         model = Category
         fields = [
             'id',
             'name',
             'image',
+            'image_thumb',
+            'attraction_count',
+            'average_price',
+            'average_rating',
+            'review_count',
             'created_at',
             'updated_at'
         ]
         read_only_fields = ('created_at', 'updated_at')
 
 
+class CategoryStatsSerializer(serializers.ModelSerializer):
+    average_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    average_rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = CategoryStats
+        fields = ['attraction_count', 'average_price', 'average_rating', 'review_count']
+
+
 class AttractionSerializer(serializers.ModelSerializer):
     category_name = serializers.ReadOnlyField(source='category.name')
+    # Only present for "near me" queries (?lat=..&lng=..), otherwise null
+    distance_km = serializers.SerializerMethodField()
+    image_thumb = ThumbnailField()
+    # Same count as rating_count: every feedback carries a rating
+    feedback_count = serializers.IntegerField(source='rating_count', read_only=True)
+    # Whether the current user favorited it (annotated by AttractionViewSet)
+    is_favorited = serializers.SerializerMethodField()
 
     class Meta:
         model = Attraction
@@ -31,12 +64,24 @@ class AttractionSerializer(serializers.ModelSerializer):
             'address',
             'description',
             'image',
+            'image_thumb',
             'price',
             'average_rating',
+            'favorite_count',
+            'feedback_count',
+            'is_favorited',
+            'distance_km',
             'created_at',
             'updated_at'
         ]
-        read_only_fields = ('average_rating', 'created_at', 'updated_at')
+        read_only_fields = ('average_rating', 'favorite_count', 'created_at', 'updated_at')
+
+    def get_is_favorited(self, obj):
+        return getattr(obj, 'is_favorited', None)
+
+    def get_distance_km(self, obj):
+        distance = getattr(obj, 'distance_km', None)
+        return round(distance, 3) if distance is not None else None
 
 
 class FeedbackSerializer(serializers.ModelSerializer):
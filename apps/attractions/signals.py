@@ -2,15 +2,127 @@
 
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.db.models import Avg
-from .models import Feedback, Attraction
+from tourism_backend import images, response_cache
+from .models import Attraction, Category, Favorite, Feedback
+from .category_stats import apply_attraction_change, create_category_stats, reconcile_category_stats
+from .popularity import apply_favorite_delta
+from .tasks import reconcile_ratings
+from .search import INDEXED_FIELDS, index_attractions
+from .sync import record_deletion
 
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Attraction)
 @receiver([post_save, post_delete], sender=Feedback)
-def update_attraction_average_rating(sender, instance, **kwargs):
-    attraction = instance.attraction
-    qs = attraction.feedbacks.all()
-    if qs.exists():
-        attraction.average_rating = qs.aggregate(Avg('rating'))['rating__avg']
+@receiver([post_save, post_delete], sender=Favorite)
+def invalidate_cached_responses(sender, **kwargs):
+    response_cache.invalidate(sender)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Attraction)
+def record_catalogue_deletion(sender, instance, **kwargs):
+    # Offline clients learn about it with their next delta sync
+    record_deletion(instance)
+
+
+@receiver(post_save, sender=Attraction)
+def update_attraction_search_index(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        # e.g. rating updates: the indexed text did not change
+        return
+    index_attractions([instance])
+
+
+@receiver(post_save, sender=Category)
+def create_category_stats_row(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        create_category_stats([instance.pk])
+
+
+@receiver(post_save, sender=Attraction)
+def update_category_stats_on_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {'category', 'price'}.intersection(update_fields):
+        # e.g. rating updates, which ratings.py applies to the stats itself
+        return
+    old = None if created else getattr(instance, '_stats_snapshot', None)
+    new = instance.stats_snapshot()
+    if not created and (old is None or new is None):
+        # Saved without having been (fully) loaded: the previous values are
+        # unknown, so recompute its category from scratch
+        reconcile_category_stats([instance.category_id])
     else:
-        attraction.average_rating = 0.0
-    attraction.save()
+        apply_attraction_change(old, new)
+    instance._stats_snapshot = instance.stats_snapshot()
+
+
+@receiver(post_delete, sender=Attraction)
+def update_category_stats_on_delete(sender, instance, **kwargs):
+    apply_attraction_change(getattr(instance, '_stats_snapshot', None) or instance.stats_snapshot(), None)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Attraction)
+def update_image_thumbnail(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and 'image' not in update_fields:
+        # e.g. rating updates, saved from an instance without the image loaded
+        return
+    images.schedule_thumbnail(instance)
+
+
+# Ratings are updated by background tasks (tasks.py), so saving feedback
+# does not wait for the attraction row. The tasks recompute the attraction's
+# totals instead of applying deltas: a delta still queued when a bulk write
+# recomputes them (recompute_ratings) would be counted twice. The
+# idempotency key folds a burst of reviews into one recompute.
+def _refresh_ratings(attraction_id):
+    reconcile_ratings.enqueue(
+        attraction_ids=[attraction_id], idempotency_key=f'ratings:reconcile:{attraction_id}'
+    )
+
+
+@receiver(post_save, sender=Feedback)
+def update_attraction_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # Fixtures carry the attractions' totals already
+        return
+    # Without a snapshot (e.g. Feedback(pk=..).save()) the previous rating is
+    # unknown, so the attraction is recomputed as if it had changed.
+    old = None if created else getattr(instance, '_rating_snapshot', None)
+    new = instance.rating_snapshot()
+    if created or old != new:
+        for snapshot in {old, new} - {None}:
+            _refresh_ratings(snapshot[0])
+    instance._rating_snapshot = new
+
+
+@receiver(post_delete, sender=Feedback)
+def update_attraction_rating_on_delete(sender, instance, **kwargs):
+    snapshot = getattr(instance, '_rating_snapshot', None) or instance.rating_snapshot()
+    if snapshot is not None:
+        _refresh_ratings(snapshot[0])
+
+
+@receiver(post_save, sender=Favorite)
+def update_favorite_count_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else getattr(instance, '_attraction_snapshot', None)
+    if old != instance.attraction_id:
+        if old is not None:
+            apply_favorite_delta(old, -1)
+        if created or old is not None:
+            apply_favorite_delta(instance.attraction_id, 1)
+    instance._attraction_snapshot = instance.attraction_id
+
+
+@receiver(post_delete, sender=Favorite)
+def update_favorite_count_on_delete(sender, instance, **kwargs):
+    attraction_id = getattr(instance, '_attraction_snapshot', None) or instance.attraction_id
+    apply_favorite_delta(attraction_id, -1)
@@ -0,0 +1,178 @@
+# apps/attractions/sync.py
+
+import base64
+import binascii
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from tourism_backend.images import thumbnail_name
+from .models import Attraction, Category, Tombstone
+
+# Delta sync of the catalogue (categories and attractions) for offline
+# clients; see CatalogueSyncView.
+#
+# A sync covers the rows changed in a window [since, until): until is fixed
+# when the sync starts, and the next sync starts from it. Rows come out in
+# (updated_at, id) order per kind, then the tombstones of deleted rows, a
+# page of SYNC_PAGE_SIZE rows at a time; the token carries the window and
+# the position reached. Rows changed while a client pages through a sync
+# fall after `until` and come with the next one.
+
+CATEGORY_FIELDS = ('id', 'name', 'image', 'image_thumb', 'updated_at')
+ATTRACTION_FIELDS = (
+    'id', 'category_id', 'name', 'latitude', 'longitude', 'address', 'description',
+    'image', 'image_thumb', 'price', 'average_rating', 'rating_count', 'favorite_count', 'updated_at',
+)
+
+# Taken off the next window's start: transactions in flight when a sync
+# starts can commit rows dated a little earlier, and a replica serving the
+# sync may lag behind the primary
+SINCE_OVERLAP = timedelta(seconds=60)
+
+# In paging order: (response key, model, fields)
+KINDS = (
+    ('categories', Category, CATEGORY_FIELDS),
+    ('attractions', Attraction, ATTRACTION_FIELDS),
+)
+DELETED = len(KINDS)
+
+
+def record_deletion(instance):
+    Tombstone.objects.create(kind=instance._meta.model_name, object_id=instance.pk)
+
+
+def encode_token(since, until, kind=0, position=None):
+    # position: (timestamp, pk) of the last row sent of `kind`
+    parts = [
+        since.isoformat() if since else '',
+        until.isoformat() if until else '',
+        str(kind),
+        position[0].isoformat() if position else '',
+        str(position[1]) if position else '',
+    ]
+    return base64.urlsafe_b64encode('|'.join(parts).encode()).decode().rstrip('=')
+
+
+def decode_token(value):
+    """
+    (since, until, kind, position) of a token; all None/0 for no token.
+    """
+    if not value:
+        return None, None, 0, None
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        since, until, kind, position_at, position_pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        since = parse_datetime(since) if since else None
+        until = parse_datetime(until) if until else None
+        kind = int(kind)
+        position = (parse_datetime(position_at), int(position_pk)) if position_at else None
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError({'token': ["Invalid sync token."]})
+    if (
+        any(value is not None and value.tzinfo is None for value in (since, until))
+        or not 0 <= kind <= DELETED
+        or (position is not None and position[0] is None)
+    ):
+        raise ValidationError({'token': ["Invalid sync token."]})
+    return since, until, kind, position
+
+
+def _after(queryset, field, position):
+    if position is None:
+        return queryset
+    at, pk = position
+    # Written as a range on `field` (rather than an OR) so the index scan
+    # starts right after the position
+    return queryset.filter(**{f'{field}__gte': at}).exclude(**{field: at, 'pk__lte': pk})
+
+
+def _changed_rows(model, fields, since, until, position, limit):
+    rows = model.objects.filter(updated_at__lt=until)
+    if since is not None:
+        rows = rows.filter(updated_at__gte=since)
+    rows = _after(rows, 'updated_at', position)
+    return list(rows.order_by('updated_at', 'pk').values_list(*fields)[:limit])
+
+
+def _tombstones(since, until, position, limit):
+    rows = Tombstone.objects.filter(deleted_at__gte=since, deleted_at__lt=until)
+    rows = _after(rows, 'deleted_at', position)
+    return list(rows.order_by('deleted_at', 'pk').values_list('deleted_at', 'pk', 'kind', 'object_id')[:limit])
+
+
+def _compact(fields, rows, url):
+    """
+    Rows as lists, with image names turned into URLs (the thumbnail only if
+    it is current).
+    """
+    image_index, thumb_index = fields.index('image'), fields.index('image_thumb')
+    result = []
+    for row in rows:
+        row = list(row)
+        image, thumb = row[image_index], row[thumb_index]
+        row[image_index] = url(image) if image else None
+        row[thumb_index] = url(thumb) if image and thumb == thumbnail_name(image) else None
+        result.append(row)
+    return result
+
+
+def sync_page(token, url, page_size=None):
+    """
+    The page of changes after `token` (None for a full sync). url(name)
+    makes a storage name absolute.
+    """
+    page_size = page_size or settings.SYNC_PAGE_SIZE
+    since, until, kind, position = decode_token(token)
+    now = timezone.now()
+    reset = since is not None and since < now - timedelta(seconds=settings.SYNC_TOMBSTONE_RETENTION)
+    if reset:
+        # Deletions this old may have been pruned: start over with a full sync
+        since = until = position = None
+        kind = 0
+    if until is None:
+        until = now
+    # The client should drop what it has before applying the page
+    full_sync_start = since is None and kind == 0 and position is None
+
+    page = {
+        'fields': {name: list(fields) for name, _, fields in KINDS},
+        **{name: [] for name, _, _ in KINDS},
+        'deleted': {name: [] for name, _, _ in KINDS},
+    }
+    remaining = page_size
+    next_position = None
+    # A full sync has nothing to delete
+    last_kind = DELETED if since is not None else DELETED - 1
+    for index in range(kind, last_kind + 1):
+        start = position if index == kind else None
+        if not remaining:
+            next_position = (index, start)
+            break
+        if index < DELETED:
+            name, model, fields = KINDS[index]
+            rows = _changed_rows(model, fields, since, until, start, remaining + 1)
+            page[name] = _compact(fields, rows[:remaining], url)
+            if len(rows) > remaining:
+                last = rows[remaining - 1]
+                next_position = (index, (last[fields.index('updated_at')], last[0]))
+                break
+        else:
+            rows = _tombstones(since, until, start, remaining + 1)
+            models = {model._meta.model_name: name for name, model, _ in KINDS}
+            for _, _, model_name, object_id in rows[:remaining]:
+                page['deleted'][models[model_name]].append(object_id)
+            if len(rows) > remaining:
+                next_position = (index, rows[remaining - 1][:2])
+                break
+        remaining -= len(rows)
+
+    if next_position is None:
+        page['next'] = encode_token(until - SINCE_OVERLAP, None)
+        page['more'] = False
+    else:
+        page['next'] = encode_token(since, until, *next_position)
+        page['more'] = True
+    page['reset'] = full_sync_start
+    return page
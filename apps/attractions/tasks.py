@@ -0,0 +1,11 @@
+# apps/attractions/tasks.py
+
+from tasks.registry import task
+from . import ratings
+
+
+# Recomputes the totals from the Feedback table rather than applying a
+# delta, so running it twice, or alongside a bulk recompute, is harmless.
+@task(name='attractions.reconcile_ratings')
+def reconcile_ratings(attraction_ids):
+    ratings.recompute_ratings(attraction_ids)
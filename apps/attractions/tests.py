@@ -1,3 +1,572 @@
-from django.test import TestCase
+import gzip
+import json
+from datetime import timedelta
+from decimal import Decimal
+from django.core import serializers
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from tourism_backend.instrumentation import QueryBudgetExceeded
+from .category_stats import reconcile_category_stats
+from .feedback_import import create_feedback
+from .models import Category, CategoryStats, Attraction, Feedback, Favorite
+from .popularity import reconcile_favorite_counts
+from .ratings import apply_rating_delta
 
-# Create your tests here.
+
+@override_settings(QUERY_BUDGETS_ENFORCED=True)
+class ListQueryCountTests(TestCase):
+    """
+    List endpoints must cost the same number of queries for a page of 1 item
+    as for a full page, within settings.QUERY_BUDGETS: any per-item lazy
+    load (N+1) makes these fail.
+    """
+    page_size = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pass')
+        cls.admin = User.objects.create_superuser(username='admin', password='pass')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.counter = 0
+
+    def make_attraction(self):
+        self.counter += 1
+        category = Category.objects.create(name=f"Category {self.counter}")
+        return Attraction.objects.create(
+            category=category,
+            name=f"Attraction {self.counter}",
+            latitude=Decimal('48.858400'),
+            longitude=Decimal('2.294500'),
+        )
+
+    def make_user(self):
+        self.counter += 1
+        return User.objects.create(username=f"user{self.counter}")
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), len(response.data['results'])
+
+    def assertConstantQueries(self, url, make_item):
+        make_item()
+        single, rows = self.count_queries(url)
+        self.assertEqual(rows, 1)
+        for _ in range(self.page_size):
+            make_item()
+        full, rows = self.count_queries(url)
+        self.assertEqual(rows, self.page_size)
+        self.assertEqual(single, full, f"{url} issues more queries as the page grows")
+
+    def test_categories(self):
+        self.assertConstantQueries('/api/attractions/categories/', self.make_attraction)
+
+    def test_attractions(self):
+        self.assertConstantQueries('/api/attractions/attractions/', self.make_attraction)
+
+    def test_feedback(self):
+        def make_feedback():
+            Feedback.objects.create(user=self.user, attraction=self.make_attraction(), rating=4)
+        self.assertConstantQueries('/api/attractions/feedback/', make_feedback)
+
+    def test_feedback_as_superuser(self):
+        self.client.force_authenticate(self.admin)
+
+        def make_feedback():
+            Feedback.objects.create(user=self.make_user(), attraction=self.make_attraction(), rating=4)
+        self.assertConstantQueries('/api/attractions/feedback/', make_feedback)
+
+    def test_favorites(self):
+        def make_favorite():
+            Favorite.objects.create(user=self.user, attraction=self.make_attraction())
+        self.assertConstantQueries('/api/attractions/favorites/', make_favorite)
+
+    def test_favorites_as_superuser(self):
+        self.client.force_authenticate(self.admin)
+
+        def make_favorite():
+            Favorite.objects.create(user=self.make_user(), attraction=self.make_attraction())
+        self.assertConstantQueries('/api/attractions/favorites/', make_favorite)
+
+
+@override_settings(QUERY_BUDGETS_ENFORCED=True)
+class NearbyTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='reader', password='pass'))
+        category = Category.objects.create(name="Category")
+        # Sparse data: the closest attraction is ~300 km away
+        for latitude in ('51.507400', '52.520000'):
+            Attraction.objects.create(category=category, name=f"Attraction {latitude}",
+                                      latitude=Decimal(latitude), longitude=Decimal('0.000000'))
+
+    def test_nearest_fetches_once_per_step(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/attractions/attractions/',
+                                       {'lat': '48.8584', 'lng': '0', 'nearest': '2'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.data['results']],
+                         ["Attraction 51.507400", "Attraction 52.520000"])
+        self.assertEqual(response.data['count'], 2)
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql'].upper()])
+        # Within the ?nearest= budget rather than the list's
+        self.assertIn('desc="8 queries"', response.headers['Server-Timing'])
+        with override_settings(DEBUG=True):
+            metrics = self.client.get('/metrics').content.decode()
+        self.assertIn('view="AttractionViewSet.list[nearest]"', metrics)
+
+    def test_nearest_with_ordering_rejected_before_geo_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/attractions/attractions/',
+                                       {'lat': '48.8584', 'lng': '0', 'nearest': '2', 'ordering': 'price'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+        self.assertFalse([q for q in queries if 'attractions_attraction' in q['sql']])
+
+
+class FeedPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pass')
+        attraction = Attraction.objects.create(
+            category=Category.objects.create(name="Category"), name="Attraction",
+            latitude=Decimal('48.858400'), longitude=Decimal('2.294500'),
+        )
+        now = timezone.now()
+        # Groups of 4 reviews sharing a created_at, so pages split ties
+        Feedback.objects.bulk_create([
+            Feedback(user=cls.user, attraction=attraction, rating=4,
+                     created_at=now - timedelta(minutes=i // 4))
+            for i in range(23)
+        ])
+        cls.expected = list(
+            Feedback.objects.order_by('-created_at', '-id').values_list('pk', flat=True)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_round_trip_with_ties(self):
+        seen = []
+        response = self.client.get('/api/attractions/feedback/', {'cursor': ''})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(set(response.data), {'next', 'results'})
+            seen += [row['id'] for row in response.data['results']]
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, self.expected)
+
+    def test_malformed_cursor(self):
+        for cursor in ('not a cursor', 'MjAyNnxhYmM'):
+            response = self.client.get('/api/attractions/feedback/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404)
+
+    def test_page_numbers_without_cursor(self):
+        response = self.client.get('/api/attractions/feedback/', {'page': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 23)
+        self.assertIsNone(response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], self.expected[20:])
+
+
+class PopularityTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name="Category")
+        self.attractions = [
+            Attraction.objects.create(category=category, name=f"Attraction {i}", price=Decimal(price),
+                                      latitude=Decimal('48.858400'), longitude=Decimal('2.294500'))
+            for i, price in enumerate(['0.00', '10.00', '20.00', '30.00'])
+        ]
+
+    def ids(self, params):
+        response = self.client.get('/api/attractions/attractions/', params)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_favorite_count_deltas(self):
+        attraction = self.attractions[0]
+        favorites = [Favorite.objects.create(user=User.objects.create(username=f"user{i}"), attraction=attraction)
+                     for i in range(3)]
+        attraction.refresh_from_db()
+        self.assertEqual(attraction.favorite_count, 3)
+
+        favorites[0].delete()
+        attraction.refresh_from_db()
+        self.assertEqual(attraction.favorite_count, 2)
+
+        # Drift never takes the counter below zero, and is fixed by the check
+        Attraction.objects.filter(pk=attraction.pk).update(favorite_count=0)
+        favorites[1].delete()
+        attraction.refresh_from_db()
+        self.assertEqual(attraction.favorite_count, 0)
+        self.assertEqual(reconcile_favorite_counts(), 1)
+        attraction.refresh_from_db()
+        self.assertEqual(attraction.favorite_count, 1)
+
+    def test_ordering_by_feedback_count(self):
+        a, b, c, d = self.attractions
+        for attraction, count in ((a, 2), (b, 5), (c, 2), (d, 0)):
+            Attraction.objects.filter(pk=attraction.pk).update(rating_count=count)
+        # Ties are broken by id, in the same direction
+        self.assertEqual(self.ids({'ordering': '-feedback_count'}), [b.pk, c.pk, a.pk, d.pk])
+        self.assertEqual(self.ids({'ordering': 'feedback_count'}), [d.pk, a.pk, c.pk, b.pk])
+
+    def test_range_filters(self):
+        a, b, c, d = self.attractions
+        Attraction.objects.filter(pk__in=[b.pk, c.pk]).update(rating_count=3, favorite_count=1)
+        self.assertEqual(self.ids({'feedback_count__gte': 3, 'ordering': 'price'}), [b.pk, c.pk])
+        self.assertEqual(self.ids({'favorite_count__gte': 1, 'price__lte': 10, 'ordering': 'price'}), [b.pk])
+        self.assertEqual(self.ids({'price__gte': 20, 'ordering': '-price'}), [d.pk, c.pk])
+
+
+class FavoriteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.attraction = Attraction.objects.create(
+            category=Category.objects.create(name="Category"), name="Attraction",
+            latitude=Decimal('48.858400'), longitude=Decimal('2.294500'),
+        )
+        self.url = f'/api/attractions/attractions/{self.attraction.pk}/'
+
+    def test_put_and_delete_are_idempotent(self):
+        self.assertEqual(self.client.put(self.url + 'favorite/').status_code, 201)
+        response = self.client.put(self.url + 'favorite/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'attraction': self.attraction.pk, 'is_favorited': True})
+        self.assertEqual(Favorite.objects.filter(user=self.user).count(), 1)
+        self.assertTrue(self.client.get(self.url).data['is_favorited'])
+
+        self.assertEqual(self.client.delete(self.url + 'favorite/').status_code, 204)
+        self.assertEqual(self.client.delete(self.url + 'favorite/').status_code, 204)
+        self.assertFalse(Favorite.objects.exists())
+        self.assertFalse(self.client.get(self.url).data['is_favorited'])
+
+    def test_cached_responses_vary_by_user(self):
+        self.client.put(self.url + 'favorite/')
+        self.assertTrue(self.client.get(self.url).data['is_favorited'])
+        self.client.force_authenticate(User.objects.create_user(username='other', password='pass'))
+        self.assertFalse(self.client.get(self.url).data['is_favorited'])
+        self.assertFalse(self.client.get('/api/attractions/attractions/').data['results'][0]['is_favorited'])
+
+    def test_duplicate_post_returns_the_existing_favorite(self):
+        first = self.client.post('/api/attractions/favorites/', {'attraction': self.attraction.pk}, format='json')
+        self.assertEqual(first.status_code, 201)
+        second = self.client.post('/api/attractions/favorites/', {'attraction': self.attraction.pk}, format='json')
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.attraction.refresh_from_db()
+        self.assertEqual(self.attraction.favorite_count, 1)
+
+
+class InstrumentationTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='reader', password='pass')
+        attraction = Attraction.objects.create(
+            category=Category.objects.create(name="Category"),
+            name="Attraction",
+            latitude=Decimal('48.858400'),
+            longitude=Decimal('2.294500'),
+        )
+        Favorite.objects.create(user=user, attraction=attraction)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_server_timing_and_metrics(self):
+        response = self.client.get('/api/attractions/favorites/')
+        self.assertIn('desc="2 queries"', response.headers['Server-Timing'])
+
+        with override_settings(METRICS_TOKEN='secret'):
+            metrics = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').content.decode()
+        self.assertIn('http_request_db_queries_count{view="FavoriteViewSet.list"}', metrics)
+
+    def test_metrics_require_a_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+    @override_settings(QUERY_BUDGETS={'FavoriteViewSet.list': 1}, QUERY_BUDGETS_ENFORCED=True)
+    def test_query_budget_enforced(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/api/attractions/favorites/')
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pass')
+        category = Category.objects.create(name="Category")
+        cls.attractions = Attraction.objects.bulk_create([
+            Attraction(category=category, name=f"Attraction {i}",
+                       latitude=Decimal('48.858400'), longitude=Decimal('2.294500'))
+            for i in range(5)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, url, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson_in_batches(self):
+        # Same updated_at everywhere: batches must continue on the id
+        Attraction.objects.update(updated_at=timezone.now())
+        response, content = self.export('/api/attractions/attractions/export/')
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], sorted(a.pk for a in self.attractions))
+        self.assertIn('X-Next-Since', response.headers)
+
+    def test_csv_since_and_gzip(self):
+        Feedback.objects.create(user=self.user, attraction=self.attractions[0], rating=4)
+        since = (timezone.now() + timedelta(hours=1)).isoformat()
+        _, content = self.export('/api/attractions/feedback/export/', data={'format': 'csv'})
+        self.assertEqual(len(content.decode().splitlines()), 2)
+
+        response, content = self.export(
+            '/api/attractions/feedback/export/', data={'format': 'csv', 'since': since},
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(content).decode().splitlines(), [
+            'id,user_id,attraction_id,rating,comment,created_at,updated_at'
+        ])
+
+
+    def test_edited_feedback_is_exported_again(self):
+        feedback = Feedback.objects.create(user=self.user, attraction=self.attractions[0], rating=2)
+        Feedback.objects.filter(pk=feedback.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        since = (timezone.now() - timedelta(minutes=1)).isoformat()
+        _, content = self.export('/api/attractions/feedback/export/', data={'since': since})
+        self.assertEqual(content, b'')
+
+        response = self.client.patch(f'/api/attractions/feedback/{feedback.pk}/', {'rating': 5}, format='json')
+        self.assertEqual(response.status_code, 200)
+        _, content = self.export('/api/attractions/feedback/export/', data={'since': since})
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([(row['id'], row['rating']) for row in rows], [(feedback.pk, 5)])
+
+
+@override_settings(SYNC_PAGE_SIZE=2)
+class CatalogueSyncTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='reader', password='pass'))
+        category = Category.objects.create(name="Category")
+        self.attractions = [
+            Attraction.objects.create(category=category, name=f"Attraction {i}",
+                                      latitude=Decimal('48.858400'), longitude=Decimal('2.294500'))
+            for i in range(3)
+        ]
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Category.objects.update(updated_at=an_hour_ago)
+        Attraction.objects.update(updated_at=an_hour_ago)
+
+    def sync(self, token=None):
+        pages = []
+        while True:
+            response = self.client.get('/api/attractions/sync/', {'token': token} if token else {})
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            token = response.data['next']
+            if not response.data['more']:
+                return pages, token
+
+    def test_full_then_delta_sync(self):
+        pages, token = self.sync()
+        self.assertEqual([page['reset'] for page in pages], [True, False])
+        attraction_ids = [row[0] for page in pages for row in page['attractions']]
+        self.assertEqual(attraction_ids, [a.pk for a in self.attractions])
+
+        updated, deleted = self.attractions[0], self.attractions[1]
+        updated.name = "Renamed"
+        updated.save()
+        deleted_pk = deleted.pk
+        deleted.delete()
+
+        pages, _ = self.sync(token)
+        self.assertEqual(len(pages), 1)
+        name_index = pages[0]['fields']['attractions'].index('name')
+        self.assertEqual([row[name_index] for row in pages[0]['attractions']], ["Renamed"])
+        self.assertEqual(pages[0]['categories'], [])
+        self.assertEqual(pages[0]['deleted'], {'categories': [], 'attractions': [deleted_pk]})
+        self.assertFalse(pages[0]['reset'])
+
+    def test_invalid_token(self):
+        response = self.client.get('/api/attractions/sync/', {'token': 'not a token'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(TASKS_BACKEND='tasks.backends.ImmediateBackend')
+class FeedbackRatingTests(TestCase):
+    """
+    Feedback changes reach the attraction's rating through the task queue,
+    run here as soon as each request's transaction commits.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='reader', password='pass'))
+        self.attraction = Attraction.objects.create(
+            category=Category.objects.create(name="Museums"), name="Louvre",
+            latitude=Decimal('48.860600'), longitude=Decimal('2.337600'),
+        )
+
+    def request(self, method, url, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(url, data, format='json')
+        return response
+
+    def assertRating(self, rating_sum, rating_count, average_rating):
+        self.attraction.refresh_from_db()
+        self.assertEqual((self.attraction.rating_sum, self.attraction.rating_count), (rating_sum, rating_count))
+        self.assertAlmostEqual(self.attraction.average_rating, average_rating)
+
+    def test_create_update_delete(self):
+        first = self.request('post', '/api/attractions/feedback/', {'attraction': self.attraction.pk, 'rating': 4})
+        self.assertEqual(first.status_code, 201)
+        self.assertRating(4, 1, 4.0)
+        second = self.request('post', '/api/attractions/feedback/', {'attraction': self.attraction.pk, 'rating': 1})
+        self.assertRating(5, 2, 2.5)
+
+        response = self.request('patch', f"/api/attractions/feedback/{first.data['id']}/", {'rating': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertRating(6, 2, 3.0)
+
+        response = self.request('delete', f"/api/attractions/feedback/{second.data['id']}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertRating(5, 1, 5.0)
+
+    def test_pending_update_and_bulk_recompute(self):
+        user = User.objects.get(username='reader')
+        with self.captureOnCommitCallbacks() as pending:
+            Feedback.objects.create(user=user, attraction=self.attraction, rating=4)
+        # A bulk write recomputes the totals before the queued task runs
+        create_feedback([{'attraction': self.attraction, 'rating': 2}], user_id=user.pk)
+        self.assertRating(6, 2, 3.0)
+        for callback in pending:
+            callback()
+        self.assertRating(6, 2, 3.0)
+        self.assertEqual(CategoryStats.objects.get(pk=self.attraction.category_id).review_count, 2)
+
+
+    def test_fixtures_are_not_counted_again(self):
+        # Totals as dumped, with more reviews than the fixture loads
+        Attraction.objects.filter(pk=self.attraction.pk).update(rating_sum=9, rating_count=2, average_rating=4.5)
+        user = User.objects.get(username='reader')
+        with self.captureOnCommitCallbacks(execute=True):
+            for obj in serializers.deserialize('json', json.dumps([{
+                'model': 'attractions.feedback', 'pk': 1,
+                'fields': {'user': user.pk, 'attraction': self.attraction.pk, 'rating': 4,
+                           'created_at': '2026-01-01T00:00:00Z', 'updated_at': '2026-01-01T00:00:00Z'},
+            }])):
+                obj.save()
+        self.assertRating(9, 2, 4.5)
+
+
+class CategoryStatsTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='reader', password='pass'))
+        self.museums = Category.objects.create(name="Museums")
+        self.parks = Category.objects.create(name="Parks")
+
+    def make_attraction(self, category, price):
+        return Attraction.objects.create(category=category, name="Attraction", price=Decimal(price),
+                                         latitude=Decimal('48.858400'), longitude=Decimal('2.294500'))
+
+    def test_incremental_updates_match_recompute(self):
+        louvre = self.make_attraction(self.museums, '20.00')
+        orsay = self.make_attraction(self.museums, '15.00')
+        garden = self.make_attraction(self.museums, '0.00')
+        apply_rating_delta(louvre.pk, rating_delta=5, count_delta=1)
+        apply_rating_delta(louvre.pk, rating_delta=2, count_delta=1)
+        apply_rating_delta(garden.pk, rating_delta=4, count_delta=1)
+
+        orsay.price = Decimal('17.00')
+        orsay.save()
+        garden = Attraction.objects.get(pk=garden.pk)
+        garden.category = self.parks
+        garden.save()
+        Attraction.objects.get(pk=louvre.pk).delete()
+        self.make_attraction(self.parks, '5.00')
+
+        museums = CategoryStats.objects.get(pk=self.museums.pk)
+        self.assertEqual((museums.attraction_count, museums.price_sum, museums.review_count),
+                         (1, Decimal('17.00'), 0))
+        parks = CategoryStats.objects.get(pk=self.parks.pk)
+        self.assertEqual((parks.attraction_count, parks.price_sum, parks.review_count),
+                         (2, Decimal('5.00'), 1))
+        self.assertAlmostEqual(parks.average_rating, 2.0)
+        self.assertEqual(reconcile_category_stats(dry_run=True), 0)
+
+        # Writes that bypass signals leave drift for the consistency check
+        Attraction.objects.filter(category=self.parks).update(price=Decimal('1.00'))
+        CategoryStats.objects.filter(pk=self.museums.pk).delete()
+        self.assertEqual(reconcile_category_stats(), 2)
+        self.assertEqual(CategoryStats.objects.get(pk=self.parks.pk).price_sum, Decimal('2.00'))
+        self.assertEqual(CategoryStats.objects.get(pk=self.museums.pk).attraction_count, 1)
+        self.assertEqual(reconcile_category_stats(dry_run=True), 0)
+
+    def test_rating_delta_leaves_the_image_alone(self):
+        louvre = self.make_attraction(self.museums, '20.00')
+        with CaptureQueriesContext(connection) as queries:
+            apply_rating_delta(louvre.pk, rating_delta=5, count_delta=1)
+        # The deferred image fields are not loaded for the thumbnail signal
+        self.assertEqual([query['sql'] for query in queries if 'image' in query['sql']], [])
+        self.assertEqual(len(queries), 6)
+
+    def test_serializer_fields_and_stats_action(self):
+        self.make_attraction(self.museums, '20.00')
+        self.make_attraction(self.museums, '15.00')
+
+        response = self.client.get(f'/api/attractions/categories/{self.museums.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['attraction_count'], 2)
+        self.assertEqual(response.data['average_price'], '17.50')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/attractions/categories/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([row['name'] for row in response.data['categories']], ["Museums", "Parks"])
+        self.assertEqual(response.data['categories'][1]['average_price'], None)
+        self.assertEqual(response.data['total']['attraction_count'], 2)
+        self.assertEqual(response.data['total']['average_price'], '17.50')
+
+        # Cached until the stats change
+        self.make_attraction(self.parks, '5.00')
+        response = self.client.get('/api/attractions/categories/stats/')
+        self.assertEqual(response.data['total']['attraction_count'], 3)
@@ -2,9 +2,10 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from tourism_backend.async_views import AsyncReadView
 from .views import (
     CategoryViewSet, AttractionViewSet,
-    FeedbackViewSet, FavoriteViewSet
+    FeedbackViewSet, FavoriteViewSet, CatalogueSyncView
 )
 
 router = DefaultRouter()
@@ -13,6 +14,19 @@ router.register(r'attractions', AttractionViewSet, basename='attractions')
 router.register(r'feedback', FeedbackViewSet, basename='feedback')
 router.register(r'favorites', FavoriteViewSet, basename='favorites')
 
+# ASGI-native variants of the read endpoints (see tourism_backend/async_views.py);
+# same responses, served without a thread per request.
+async_urlpatterns = [
+    path('categories/', AsyncReadView.as_view(viewset_class=CategoryViewSet), name='categories-async-list'),
+    path('categories/<pk>/', AsyncReadView.as_view(viewset_class=CategoryViewSet, action='retrieve'),
+         name='categories-async-detail'),
+    path('attractions/', AsyncReadView.as_view(viewset_class=AttractionViewSet), name='attractions-async-list'),
+    path('attractions/<pk>/', AsyncReadView.as_view(viewset_class=AttractionViewSet, action='retrieve'),
+         name='attractions-async-detail'),
+]
+
 urlpatterns = [
+    path('async/', include(async_urlpatterns)),
+    path('sync/', CatalogueSyncView.as_view(), name='catalogue-sync'),
     path('', include(router.urls)),
 ]
@@ -1,78 +1,251 @@
 # apps/attractions/views.py
 
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter
-from .models import Category, Attraction, Feedback, Favorite
+from .models import Category, CategoryStats, Attraction, Feedback, Favorite
 from .serializers import (
-    CategorySerializer, AttractionSerializer,
+    CategorySerializer, CategoryStatsSerializer, AttractionSerializer,
     FeedbackSerializer, FavoriteSerializer
 )
 from .permissions import IsOwnerOrReadOnly
+from tourism_backend.pagination import FeedPagination
+from tourism_backend.response_cache import CachedResponseMixin
+from tourism_backend.streaming import CSVRenderer, NDJSONRenderer
+from .filters import AttractionFilterSet, AttractionOrderingFilter, AttractionSearchFilter, NearbyFilter
+from .feedback_import import create_feedback, validate_feedback
+from .export import ATTRACTION_FIELDS, FEEDBACK_FIELDS, export_response
+from .sync import sync_page
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """
     Normal user can only list/retrieve categories.
+    Categories carry the precomputed stats of their attractions, and
+    categories/stats/ has those of every category plus the totals.
+    Responses are cached until a category or its stats change.
     """
-    queryset = Category.objects.all().order_by('-created_at')
+    # The stats fields are read from the joined stats row
+    queryset = Category.objects.select_related('stats').order_by('-created_at')
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_dependencies = (Category, CategoryStats)
 
     # Optional filters/search
     filter_backends = [DjangoFilterBackend, SearchFilter]
     search_fields = ['name']
 
+    @action(detail=False)
+    def stats(self, request):
+        """
+        Stats of every category (honouring ?search=), unpaginated, and the
+        totals over them: one query on the stats table, never a scan of
+        the attractions.
+        """
+        return self.cached_response(self._stats, request)
+
+    def _stats(self, request):
+        categories = self.filter_queryset(self.get_queryset()).order_by('name')
+        total = CategoryStats()
+        rows = []
+        for category in categories:
+            stats = getattr(category, 'stats', None) or CategoryStats(category=category)
+            total.attraction_count += stats.attraction_count
+            total.price_sum += stats.price_sum
+            total.average_rating_sum += stats.average_rating_sum
+            total.review_count += stats.review_count
+            rows.append({'id': category.pk, 'name': category.name, **CategoryStatsSerializer(stats).data})
+        return Response({'categories': rows, 'total': CategoryStatsSerializer(total).data})
+
 
-class AttractionViewSet(viewsets.ReadOnlyModelViewSet):
+class AttractionViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """
     Normal user can only list/retrieve attractions.
+    Supports "near me" queries via ?lat=&lng=[&radius=][&nearest=] (see NearbyFilter)
+    and ranked full-text ?search= over the attraction search index.
+    Sort with ?ordering=-favorite_count (see AttractionOrderingFilter) and
+    filter with e.g. ?favorite_count__gte=10 or ?price__lte=20.
+    PUT/DELETE attractions/<id>/favorite/ adds it to/removes it from the
+    user's favorites. attractions/export/ streams them all (see export()).
+    Responses are cached per user (they carry is_favorited) until an
+    attraction, category, feedback or favorite changes.
     """
-    queryset = Attraction.objects.all().order_by('-created_at')
+    # category_name is read from the joined category row
+    queryset = Attraction.objects.select_related('category').order_by('-created_at')
     serializer_class = AttractionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_dependencies = (Attraction, Category, Feedback, Favorite)
 
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-    filterset_fields = ['category']
+    filter_backends = [DjangoFilterBackend, AttractionSearchFilter, NearbyFilter, AttractionOrderingFilter]
+    filterset_class = AttractionFilterSet
+    ordering_fields = ['favorite_count', 'feedback_count', 'average_rating', 'price', 'created_at']
     search_fields = ['name', 'address', 'description']
 
+    def get_queryset(self):
+        # One EXISTS per row of the page query, on the (user, attraction) unique index
+        return super().get_queryset().annotate(is_favorited=Exists(
+            Favorite.objects.filter(user_id=self.request.user.pk, attraction=OuterRef('pk'))
+        ))
+
+    def get_cache_vary(self, request):
+        return str(request.user.pk)
+
+    @action(detail=True, methods=['put', 'delete'])
+    def favorite(self, request, pk=None):
+        """
+        PUT favorites the attraction, DELETE unfavorites it. Both are
+        idempotent, so clients can retry them and need no favorite id.
+        """
+        attraction = self.get_object()
+        if request.method == 'DELETE':
+            if attraction.is_favorited:
+                Favorite.objects.filter(user_id=request.user.pk, attraction=attraction).delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        created = False
+        if not attraction.is_favorited:
+            _, created = Favorite.objects.get_or_create(user_id=request.user.pk, attraction=attraction)
+        return Response(
+            {'attraction': attraction.pk, 'is_favorited': True},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Stream every attraction as NDJSON, or CSV with ?format=csv (or
+        Accept: text/csv), gzipped when the client accepts it. ?since=<ISO
+        datetime> limits it to the rows updated since then; the X-Next-Since
+        header is the since of the next incremental export.
+        """
+        return export_response(request, Attraction.objects.all(), ATTRACTION_FIELDS, 'attractions')
+
+
+class CatalogueSyncView(APIView):
+    """
+    Delta sync of categories and attractions for offline clients.
+    GET sync/ returns the whole catalogue; every response carries `next`,
+    the token to send as ?token= next time, and pages continue while `more`
+    is true. After that, GET sync/?token=<next> returns only what changed
+    since: rows created or updated (compact lists following `fields`) and
+    the ids of deleted rows. `reset` asks the client to drop its copy first.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(sync_page(
+            request.query_params.get('token'),
+            lambda name: request.build_absolute_uri(default_storage.url(name)),
+        ))
+
 
 class FeedbackViewSet(viewsets.ModelViewSet):
     """
     Normal user can create, view, update, or delete their own feedback.
+    Send ?cursor= to page through the feed with keyset pagination.
+    POST a list of reviews to feedback/bulk/ to create many at once.
+    feedback/export/ streams them all, like attractions/export/.
     """
-    queryset = Feedback.objects.all().order_by('-created_at')
+    # user_username / attraction_name come from the joined rows; only() keeps
+    # the wide user row (password hash, etc.) out of the SELECT. updated_at
+    # must stay loaded: saving a deferred instance writes only the loaded
+    # fields, and incremental exports (?since=) rely on it.
+    queryset = (
+        Feedback.objects.select_related('user', 'attraction')
+        .only('id', 'rating', 'comment', 'created_at', 'updated_at', 'user__username', 'attraction__name')
+        .order_by('-created_at')
+    )
     serializer_class = FeedbackSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    pagination_class = FeedPagination
 
     def perform_create(self, serializer):
         # Assign the feedback to the current user
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create up to FEEDBACK_BULK_MAX_ITEMS reviews in one go:
+        [{"attraction": 1, "rating": 5, "comment": "..."}, ...]
+        Nothing is created unless every item is valid; errors come back as a
+        list aligned with the items, {} for the valid ones.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            raise ValidationError({'non_field_errors': ["Expected a list of items."]})
+        if len(rows) > settings.FEEDBACK_BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                f"At most {settings.FEEDBACK_BULK_MAX_ITEMS} items per request."
+            ]})
+
+        validated, errors = validate_feedback(rows)
+        if errors:
+            raise ValidationError([errors.get(index, {}) for index in range(len(rows))])
+        created = create_feedback(validated.values(), user_id=request.user.pk)
+        return Response({'created': created}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        queryset = Feedback.objects.all()
+        if not request.user.is_superuser:
+            queryset = queryset.filter(user=request.user)
+        return export_response(request, queryset, FEEDBACK_FIELDS, 'feedback')
+
     def get_queryset(self):
         """
         If you want each user only to see their own feedback, do:
         """
+        queryset = super().get_queryset()
         if self.request.user.is_superuser:
-            return Feedback.objects.all().order_by('-created_at')
-        return Feedback.objects.filter(user=self.request.user).order_by('-created_at')
+            return queryset
+        return queryset.filter(user=self.request.user)
 
 
 class FavoriteViewSet(viewsets.ModelViewSet):
     """
     Normal user can create, view, update, or delete their own favorite attractions.
+    Send ?cursor= to page through the feed with keyset pagination.
+    Posting an attraction that is already a favorite returns the existing row.
     """
-    queryset = Favorite.objects.all().order_by('-created_at')
+    queryset = (
+        Favorite.objects.select_related('user', 'attraction')
+        .only('id', 'created_at', 'user__username', 'attraction__name')
+        .order_by('-created_at')
+    )
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    pagination_class = FeedPagination
 
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.instance, created = Favorite.objects.get_or_create(
+            user=request.user, attraction=serializer.validated_data['attraction']
+        )
+        return Response(
+            serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    def perform_update(self, serializer):
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise ValidationError({'attraction': ["This attraction is already in your favorites."]})
 
     def get_queryset(self):
         """
         If you want each user only to see their own favorites.
         """
+        queryset = super().get_queryset()
         if self.request.user.is_superuser:
-            return Favorite.objects.all().order_by('-created_at')
-        return Favorite.objects.filter(user=self.request.user).order_by('-created_at')
+            return queryset
+        return queryset.filter(user=self.request.user)
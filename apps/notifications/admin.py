@@ -1,7 +1,7 @@
 # apps/notifications/admin.py
 
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, NotificationRead
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
@@ -11,3 +11,10 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ('is_read', 'created_at')
     search_fields = ('title', 'message', 'user__username', 'created_by__username')
     readonly_fields = ('created_at',)
+
+
+@admin.register(NotificationRead)
+class NotificationReadAdmin(admin.ModelAdmin):
+    list_display = ('id', 'notification', 'user', 'read_at')
+    search_fields = ('notification__title', 'user__username')
+    readonly_fields = ('read_at',)
@@ -0,0 +1,96 @@
+# apps/notifications/counters.py
+
+import time
+from django.core.cache import cache
+from .models import Notification
+
+# Cached unread counters, so the unread badge does not touch notification rows.
+#
+# Each user has an "offset" entry such that
+#     unread = offset + number of broadcasts ever created
+# New broadcasts bump the shared broadcast total once, which raises every
+# user's count without touching per-user entries. Direct notifications and
+# read marks adjust the recipient's offset. Anything that cannot be applied
+# as a delta (deletes, admin edits) bumps the generation, which is part of
+# every per-user key, so all counters are recomputed lazily on next use.
+
+GENERATION_KEY = 'notifications:unread:generation'
+BROADCAST_TOTAL_KEY = 'notifications:unread:broadcast-total'
+# Entries expire so that drift (e.g. from a rolled back transaction) heals
+USER_TIMEOUT = 60 * 60
+BROADCAST_TOTAL_TIMEOUT = 24 * 60 * 60
+
+
+def _new_generation():
+    # Time based, so a generation that was evicted never reuses an old value
+    return int(time.time() * 1000)
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, _new_generation(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def _user_key(user_id, generation=None):
+    return f"notifications:unread:{generation or _generation()}:{user_id}"
+
+
+def _broadcast_total():
+    total = cache.get(BROADCAST_TOTAL_KEY)
+    if total is None:
+        cache.add(
+            BROADCAST_TOTAL_KEY,
+            Notification.objects.filter(user__isnull=True).count(),
+            timeout=BROADCAST_TOTAL_TIMEOUT,
+        )
+        total = cache.get(BROADCAST_TOTAL_KEY)
+    return total
+
+
+def _incr(key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Not cached (yet): it will be computed from the database on next use
+        pass
+
+
+def get_unread_count(user, compute):
+    """
+    The user's unread count; compute(user) is only called on a cache miss.
+    """
+    generation = _generation()
+    total = _broadcast_total()
+    key = _user_key(user.pk, generation)
+    offset = cache.get(key)
+    if offset is None:
+        offset = compute(user) - total
+        cache.set(key, offset, USER_TIMEOUT)
+    return offset + total
+
+
+def notification_created(notification):
+    if notification.user_id is None:
+        _incr(BROADCAST_TOTAL_KEY, 1)
+    elif not notification.is_read:
+        _incr(_user_key(notification.user_id), 1)
+
+
+def notifications_read(user_id, count):
+    if count:
+        _incr(_user_key(user_id), -count)
+
+
+def reset_user(user_id):
+    cache.delete(_user_key(user_id))
+
+
+def reset_all():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, _new_generation(), timeout=None)
+    cache.delete(BROADCAST_TOTAL_KEY)
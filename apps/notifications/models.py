@@ -9,6 +9,8 @@ class Notification(models.Model):
     Stores notifications in the system. A notification can be directed
     to a specific user (user_id) or be broadcast (user = null).
     'created_by' is the user who generated the notification, or null if system-generated.
+    'is_read' is the read state of direct notifications only; broadcasts are
+    read per user through NotificationRead.
     """
     user = models.ForeignKey(
         User,
@@ -29,7 +31,50 @@ class Notification(models.Model):
     )
     created_at = models.DateTimeField(default=timezone.now, editable=False)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the feed, newest first (see FeedPagination)
+            models.Index(fields=['-created_at', '-id'], name='notification_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_idx'),
+            # Unread count of direct notifications
+            models.Index(fields=['user', 'is_read'], name='notification_user_read_idx'),
+        ]
+
     def __str__(self):
         if self.user:
             return f"Notification to {self.user.username} - {self.title}"
         return f"Broadcast Notification - {self.title}"
+
+
+class NotificationRead(models.Model):
+    """
+    Read receipt of one user for one broadcast notification. A broadcast stays
+    a single Notification row while each user keeps their own read state;
+    receipts only exist for broadcasts a user has opened after their
+    NotificationReadWatermark.
+    """
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='reads')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_reads')
+    read_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'notification'], name='unique_notification_read'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} read {self.notification_id}"
+
+
+class NotificationReadWatermark(models.Model):
+    """
+    Every broadcast created at or before read_until counts as read by the
+    user ("mark all read"), without one receipt per broadcast.
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='notification_watermark'
+    )
+    read_until = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user_id} read broadcasts until {self.read_until}"
@@ -0,0 +1,179 @@
+# apps/notifications/pubsub.py
+
+import asyncio
+import json
+import threading
+from functools import lru_cache
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+# Publish/subscribe for pushing notifications to connected clients (see
+# stream.py). Every connection subscribes to the broadcast channel and to
+# its user's channel, so a broadcast is published once and fanned out to
+# all connections in memory, without any per-user query.
+
+BROADCAST_CHANNEL = 'broadcast'
+# Messages a slow client may fall behind by before its stream is closed;
+# it reconnects with Last-Event-ID and catches up from the database.
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """
+    Messages published to a set of channels, in order, for one connection.
+    get() returns None once the subscription has overflowed.
+    """
+
+    def __init__(self, channels):
+        self.channels = list(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(SUBSCRIPTION_QUEUE_SIZE)
+        self.overflowed = False
+
+    def put(self, message):
+        # Runs on the subscriber's event loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InMemoryBroker:
+    """
+    Delivers messages to subscribers in the current process. publish() may
+    be called from any thread, e.g. from a post_save in a sync view.
+    """
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # Its event loop is closed; unsubscribe() is on its way
+                pass
+
+    def subscribe(self, channels):
+        return _InMemorySubscribe(self, channels)
+
+    def _add(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+
+class _InMemorySubscribe:
+
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = channels
+
+    async def __aenter__(self):
+        self.subscription = Subscription(self.channels)
+        self.broker._add(self.subscription)
+        return self.subscription
+
+    async def __aexit__(self, *exc_info):
+        self.broker._remove(self.subscription)
+
+
+class RedisBroker:
+    """
+    Delivers messages through Redis pub/sub, so clients connected to any
+    worker receive them. Requires the redis package (redis-py >= 4.2).
+    """
+
+    def __init__(self, url=None, prefix='notifications:', **options):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                "RedisBroker requires the redis package (pip install redis)."
+            ) from exc
+        url = url or settings.NOTIFICATIONS_PUBSUB_URL
+        if not url:
+            raise ImproperlyConfigured("RedisBroker requires NOTIFICATIONS_PUBSUB_URL.")
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._async_redis = redis.asyncio
+
+    def publish(self, channel, message):
+        self._client.publish(self.prefix + channel, json.dumps(message))
+
+    def subscribe(self, channels):
+        return _RedisSubscribe(self, channels)
+
+
+class _RedisSubscribe:
+
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = channels
+
+    async def __aenter__(self):
+        self.subscription = Subscription(self.channels)
+        self.client = self.broker._async_redis.Redis.from_url(self.broker.url)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.subscribe(*[self.broker.prefix + channel for channel in self.channels])
+        self.reader = asyncio.create_task(self._read())
+        return self.subscription
+
+    async def _read(self):
+        async for item in self.pubsub.listen():
+            if item['type'] == 'message':
+                self.subscription.put(json.loads(item['data']))
+
+    async def __aexit__(self, *exc_info):
+        self.reader.cancel()
+        try:
+            await self.reader
+        except asyncio.CancelledError:
+            pass
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.NOTIFICATIONS_PUBSUB_BACKEND)()
+
+
+def publish_notification(notification):
+    """
+    Push a newly created notification to its recipient, or to everyone for
+    a broadcast. The payload is serialized once, whatever the audience.
+    """
+    from rest_framework.renderers import JSONRenderer
+    from .serializers import NotificationSerializer
+
+    payload = json.loads(JSONRenderer().render(NotificationSerializer(notification).data))
+    channel = BROADCAST_CHANNEL if notification.user_id is None else user_channel(notification.user_id)
+    get_broker().publish(channel, {'event': 'notification', 'id': notification.pk, 'data': payload})
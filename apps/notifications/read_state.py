@@ -0,0 +1,168 @@
+# apps/notifications/read_state.py
+
+import logging
+import threading
+from django.db.models import BooleanField, Case, Exists, F, OuterRef, Q, Value, When
+from django.utils import timezone
+from .models import Notification, NotificationRead, NotificationReadWatermark
+from . import counters
+
+logger = logging.getLogger(__name__)
+
+# Per-user read state:
+#   - direct notifications: Notification.is_read
+#   - broadcasts: read if created at or before the user's watermark
+#     ("mark all read"), or if the user has a NotificationRead receipt.
+
+
+def get_watermark(user):
+    return (
+        NotificationReadWatermark.objects.filter(user=user)
+        .values_list('read_until', flat=True)
+        .first()
+    )
+
+
+def _receipt(user):
+    return NotificationRead.objects.filter(notification=OuterRef('pk'), user=user)
+
+
+def _broadcast_read(user, watermark):
+    read = Exists(_receipt(user))
+    if watermark is not None:
+        read = Q(created_at__lte=watermark) | read
+    return read
+
+
+def with_read_state(queryset, user, watermark):
+    """
+    Annotate read_by_user: Notification.is_read for direct notifications,
+    watermark or receipt for broadcasts.
+    """
+    return queryset.annotate(read_by_user=Case(
+        When(Q(user__isnull=True) & _broadcast_read(user, watermark), then=Value(True)),
+        When(user__isnull=True, then=Value(False)),
+        default=F('is_read'),
+        output_field=BooleanField(),
+    ))
+
+
+def unread_partitions(user, watermark):
+    """
+    The user's unread notifications as two branches, each served by an index:
+    direct ones on (user, is_read), broadcasts newer than the watermark on
+    (user, created_at, id), probed against the (user, notification) receipt index.
+    """
+    broadcast = Q(user__isnull=True) & ~Exists(_receipt(user))
+    if watermark is not None:
+        broadcast &= Q(created_at__gt=watermark)
+    return [Q(user=user, is_read=False), broadcast]
+
+
+def unread_filter(user, watermark):
+    direct, broadcast = unread_partitions(user, watermark)
+    return direct | broadcast
+
+
+def unread_count(user):
+    """
+    Number of unread notifications of a user, from the database. Only
+    broadcasts newer than the watermark are counted, each count being an
+    index range. The API serves this through counters.get_unread_count.
+    """
+    watermark = get_watermark(user)
+    broadcasts = Notification.objects.filter(user__isnull=True)
+    receipts = NotificationRead.objects.filter(user=user)
+    if watermark is not None:
+        broadcasts = broadcasts.filter(created_at__gt=watermark)
+        receipts = receipts.filter(notification__created_at__gt=watermark)
+    direct = Notification.objects.filter(user=user, is_read=False).count()
+    return direct + broadcasts.count() - receipts.count()
+
+
+def mark_read_many(user, ids):
+    """
+    Mark the given notifications read for a user (instance or id): one
+    UPDATE for direct ones, one INSERT of receipts for broadcasts. Other
+    users' direct notifications are left alone.
+    """
+    user_id = getattr(user, 'pk', user)
+    ids = list(ids)
+    newly_read = Notification.objects.filter(
+        pk__in=ids, user_id=user_id, is_read=False
+    ).update(is_read=True)
+
+    # Only new receipts count towards the cached unread counter
+    broadcasts = Notification.objects.filter(pk__in=ids, user__isnull=True).exclude(
+        Exists(_receipt(user_id))
+    )
+    watermark = get_watermark(user_id)
+    if watermark is not None:
+        broadcasts = broadcasts.filter(created_at__gt=watermark)
+    receipts = NotificationRead.objects.bulk_create(
+        [
+            NotificationRead(notification_id=pk, user_id=user_id)
+            for pk in broadcasts.values_list('pk', flat=True)
+        ],
+        ignore_conflicts=True,
+    )
+    counters.notifications_read(user_id, newly_read + len(receipts))
+
+
+def mark_all_read(user, until=None):
+    """
+    Mark everything created up to `until` (default and at most: now) read
+    for this user: one UPDATE for direct notifications and a watermark move
+    for broadcasts. Receipts made redundant by the watermark are dropped.
+    """
+    now = timezone.now()
+    until = min(until, now) if until else now
+    Notification.objects.filter(user=user, is_read=False, created_at__lte=until).update(is_read=True)
+    # The watermark only ever moves forward
+    moved = NotificationReadWatermark.objects.filter(user=user, read_until__lt=until).update(read_until=until)
+    if not moved:
+        NotificationReadWatermark.objects.get_or_create(user=user, defaults={'read_until': until})
+    NotificationRead.objects.filter(user=user, notification__created_at__lte=until).delete()
+    counters.reset_user(user.pk)
+
+
+class ReadBuffer:
+    """
+    Marks made while serving GET requests. Instead of writing inside the
+    GET, they are collected here and flushed once the response has been
+    sent (request_finished, see signals.py), coalesced per user into
+    mark_read_many calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def add(self, user_id, notification_id):
+        with self._lock:
+            self._pending.setdefault(user_id, set()).add(notification_id)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for user_id, ids in pending.items():
+            try:
+                mark_read_many(user_id, ids)
+            except Exception:
+                # The response is already sent; losing a read mark is not fatal
+                logger.exception("Could not mark notifications %s read for user %s", sorted(ids), user_id)
+
+
+read_buffer = ReadBuffer()
+
+
+def defer_mark_read(notification, user):
+    """
+    Schedule marking a notification read for this user. Returns False if it
+    is somebody else's direct notification (e.g. opened by a superuser).
+    """
+    if notification.user_id is not None and notification.user_id != user.pk:
+        return False
+    read_buffer.add(user.pk, notification.pk)
+    return True
+
@@ -6,6 +6,8 @@ from .models import Notification
 class NotificationSerializer(serializers.ModelSerializer):
     user_username = serializers.ReadOnlyField(source='user.username')
     created_by_username = serializers.ReadOnlyField(source='created_by.username')
+    # Read state of the requesting user (see read_state.with_read_state)
+    is_read = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
@@ -21,3 +23,17 @@ class NotificationSerializer(serializers.ModelSerializer):
             'created_by_username'
         ]
         read_only_fields = ('created_at',)
+
+    def get_is_read(self, obj):
+        return getattr(obj, 'read_by_user', obj.is_read)
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
+
+
+class MarkAllReadSerializer(serializers.Serializer):
+    # Defaults to now; notifications created later stay unread
+    until = serializers.DateTimeField(required=False)
@@ -0,0 +1,39 @@
+# apps/notifications/signals.py
+
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Notification
+from .read_state import read_buffer
+from .pubsub import publish_notification
+from . import counters
+
+
+@receiver(request_finished)
+def flush_deferred_reads(sender, **kwargs):
+    # Read marks collected while serving GET requests (see ReadBuffer)
+    read_buffer.flush()
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.notification_created(instance)
+    else:
+        # e.g. an admin edit of is_read or of the recipient: not a simple delta
+        counters.reset_all()
+
+
+@receiver(post_delete, sender=Notification)
+def reset_unread_counters(sender, instance, **kwargs):
+    counters.reset_all()
+
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, raw=False, **kwargs):
+    # Connected clients get it once it is committed (see stream.py)
+    if created and not raw:
+        transaction.on_commit(lambda: publish_notification(instance))
@@ -0,0 +1,115 @@
+# apps/notifications/stream.py
+
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.renderers import JSONRenderer
+from accounts.authentication import StatelessJWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from .models import Notification
+from .pubsub import BROADCAST_CHANNEL, get_broker, user_channel
+from .serializers import NotificationSerializer
+from . import read_state
+
+# Server-Sent Events stream of new notifications, replacing list polling.
+# Must be served by an ASGI server (tourism_backend/asgi.py): each open
+# stream is a coroutine waiting on its subscription, not a worker thread.
+
+# Notifications replayed on reconnect (Last-Event-ID); anything older is
+# fetched from the list endpoint.
+MAX_REPLAY = 100
+RETRY_MS = 5000
+
+
+def _authenticate(request):
+    """
+    The user of the access token from the Authorization header, or from
+    ?token= since EventSource cannot send headers.
+    """
+    authentication = StatelessJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        return None
+    return authentication.get_user(authentication.get_validated_token(raw_token))
+
+
+def _missed_notifications(user, last_id):
+    """
+    This user's notifications created after the last event the client
+    received, oldest first.
+    """
+    queryset = read_state.with_read_state(
+        Notification.objects.select_related('user', 'created_by')
+        .filter(Q(user=user) | Q(user__isnull=True), pk__gt=last_id)
+        .order_by('pk'),
+        user,
+        read_state.get_watermark(user),
+    )[:MAX_REPLAY]
+    return [
+        {'event': 'notification', 'id': data['id'], 'data': data}
+        for data in json.loads(JSONRenderer().render(NotificationSerializer(queryset, many=True).data))
+    ]
+
+
+def _format_event(message):
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+
+async def _events(user, last_id):
+    async with get_broker().subscribe([BROADCAST_CHANNEL, user_channel(user.pk)]) as subscription:
+        yield f"retry: {RETRY_MS}\n\n"
+        # Subscribed first, so nothing created meanwhile falls in between;
+        # notifications both replayed and published are sent once.
+        replayed = set()
+        if last_id is not None:
+            for message in await sync_to_async(_missed_notifications)(user, last_id):
+                replayed.add(message['id'])
+                yield _format_event(message)
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.get(), settings.NOTIFICATIONS_STREAM_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": heartbeat\n\n"
+                continue
+            if message is None:
+                # Fell too far behind: the client reconnects and replays
+                return
+            if message['id'] in replayed:
+                continue
+            yield _format_event(message)
+
+
+@require_GET
+async def notification_stream(request):
+    """
+    text/event-stream of the current user's new notifications, direct and
+    broadcast. Each event is a serialized notification with its id as the
+    event id, so a reconnecting EventSource resumes where it left off.
+    """
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except (AuthenticationFailed, InvalidToken) as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        return JsonResponse(detail, status=401)
+    if user is None:
+        return JsonResponse({'detail': "Authentication credentials were not provided."}, status=401)
+
+    last_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return JsonResponse({'detail': "Invalid Last-Event-ID."}, status=400)
+
+    response = StreamingHttpResponse(_events(user, last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stops nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
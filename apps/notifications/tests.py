@@ -1,3 +1,270 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from accounts.tokens import RefreshToken
+from .models import Notification, NotificationRead, NotificationReadWatermark
+from .pubsub import BROADCAST_CHANNEL, InMemoryBroker, get_broker, publish_notification, user_channel
+from .read_state import defer_mark_read, mark_all_read, read_buffer
 
-# Create your tests here.
+
+@override_settings(QUERY_BUDGETS_ENFORCED=True)
+class ListQueryCountTests(TestCase):
+    """
+    The notification list must cost the same number of queries for a page
+    of 1 item as for a full page, within settings.QUERY_BUDGETS: any
+    per-item lazy load (N+1) fails this.
+    """
+    page_size = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pass')
+        cls.admin = User.objects.create_superuser(username='admin', password='pass')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.counter = 0
+
+    def make_notification(self, user):
+        self.counter += 1
+        sender = User.objects.create(username=f"sender{self.counter}")
+        return Notification.objects.create(
+            user=user, created_by=sender, title=f"Title {self.counter}", message="Hello"
+        )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/notifications/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), len(response.data['results'])
+
+    def assertConstantQueries(self, make_item):
+        make_item()
+        single, rows = self.count_queries()
+        self.assertEqual(rows, 1)
+        for _ in range(self.page_size):
+            make_item()
+        full, rows = self.count_queries()
+        self.assertEqual(rows, self.page_size)
+        self.assertEqual(single, full, "notification list issues more queries as the page grows")
+
+    def test_direct_notifications(self):
+        self.assertConstantQueries(lambda: self.make_notification(self.user))
+
+    def test_broadcast_notifications(self):
+        self.assertConstantQueries(lambda: self.make_notification(None))
+
+    def test_superuser_sees_everyone(self):
+        self.client.force_authenticate(self.admin)
+        self.assertConstantQueries(lambda: self.make_notification(self.user))
+
+
+class ReadStateTests(TestCase):
+    """
+    Read state is per user: is_read on direct notifications, receipts (and
+    the watermark) for broadcasts.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pass')
+        cls.other = User.objects.create_user(username='other', password='pass')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def read_state(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/notifications/')
+        self.assertEqual(response.status_code, 200)
+        return {row['id']: row['is_read'] for row in response.data['results']}
+
+    def mark_read(self, *ids):
+        response = self.client.post('/api/notifications/mark-read/', {'ids': list(ids)}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_mark_direct_notification_read(self):
+        mine = Notification.objects.create(user=self.user, title="Direct", message="Hello")
+        theirs = Notification.objects.create(user=self.other, title="Direct", message="Hello")
+
+        self.mark_read(mine.pk, theirs.pk)
+        self.assertEqual(self.read_state(self.user), {mine.pk: True})
+        # Somebody else's direct notification is left alone
+        self.assertEqual(self.read_state(self.other), {theirs.pk: False})
+        self.assertFalse(NotificationRead.objects.exists())
+
+    def test_mark_broadcast_read(self):
+        broadcast = Notification.objects.create(user=None, title="Broadcast", message="Hello")
+
+        self.mark_read(broadcast.pk)
+        self.mark_read(broadcast.pk)
+        self.assertEqual(self.read_state(self.user), {broadcast.pk: True})
+        self.assertEqual(self.read_state(self.other), {broadcast.pk: False})
+        # One receipt for the reader; the shared row is not touched
+        self.assertEqual(NotificationRead.objects.filter(user=self.user).count(), 1)
+        broadcast.refresh_from_db()
+        self.assertFalse(broadcast.is_read)
+
+    def mark_all_read(self, until=None):
+        response = self.client.post('/api/notifications/mark-all-read/',
+                                    {'until': until.isoformat()} if until else {}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_mark_all_read_moves_the_watermark(self):
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        old = Notification.objects.create(user=None, title="Old", message="Hello", created_at=an_hour_ago)
+        direct = Notification.objects.create(user=self.user, title="Direct", message="Hello",
+                                             created_at=an_hour_ago)
+        self.mark_read(old.pk)
+
+        self.mark_all_read()
+        watermark = NotificationReadWatermark.objects.get(user=self.user).read_until
+        # Receipts below the watermark are redundant
+        self.assertFalse(NotificationRead.objects.filter(user=self.user).exists())
+
+        later = Notification.objects.create(user=None, title="Later", message="Hello",
+                                            created_at=watermark + timedelta(seconds=1))
+        self.assertEqual(self.read_state(self.user), {later.pk: False, direct.pk: True, old.pk: True})
+        unread = self.client.get('/api/notifications/unread/')
+        self.assertEqual([row['id'] for row in unread.data['results']], [later.pk])
+
+        # The watermark never moves back
+        self.mark_all_read(an_hour_ago - timedelta(hours=1))
+        self.assertEqual(NotificationReadWatermark.objects.get(user=self.user).read_until, watermark)
+        self.assertEqual(self.read_state(self.user)[old.pk], True)
+
+
+class UnreadCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pass')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def unread_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/notifications/unread-count/')
+        self.assertEqual(response.status_code, 200)
+        self.notification_queries = [q for q in queries if 'notifications_notification' in q['sql']]
+        return response.data['unread_count']
+
+    def test_counter_follows_deltas(self):
+        direct = [Notification.objects.create(user=self.user, title="Direct", message="Hi") for _ in range(2)]
+        broadcast = Notification.objects.create(user=None, title="Broadcast", message="Hi")
+        self.assertEqual(self.unread_count(), 3)
+        self.assertTrue(self.notification_queries)
+
+        # Served from the cache, new notifications applied as deltas
+        Notification.objects.create(user=None, title="Broadcast", message="Hi")
+        Notification.objects.create(user=self.user, title="Direct", message="Hi")
+        self.assertEqual(self.unread_count(), 5)
+        self.assertEqual(self.notification_queries, [])
+
+        self.client.post('/api/notifications/mark-read/', {'ids': [direct[0].pk, broadcast.pk]}, format='json')
+        self.assertEqual(self.unread_count(), 3)
+        self.assertEqual(self.notification_queries, [])
+
+        # Deletes cannot be applied as deltas: recomputed
+        direct[1].delete()
+        self.assertEqual(self.unread_count(), 2)
+        self.assertTrue(self.notification_queries)
+
+        self.client.post('/api/notifications/mark-all-read/', {}, format='json')
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_read_marks_flushed_after_the_response(self):
+        broadcast = Notification.objects.create(user=None, title="Broadcast", message="Hi")
+        self.assertEqual(self.unread_count(), 1)
+
+        defer_mark_read(broadcast, self.user)
+        self.assertFalse(NotificationRead.objects.exists())
+        read_buffer.flush()
+        self.assertTrue(NotificationRead.objects.filter(user=self.user, notification=broadcast).exists())
+        self.assertEqual(self.unread_count(), 0)
+
+        # Retrieving marks it read once the request has finished
+        direct = Notification.objects.create(user=self.user, title="Direct", message="Hi")
+        self.assertEqual(self.unread_count(), 1)
+        response = self.client.get(f'/api/notifications/{direct.pk}/')
+        self.assertEqual(response.status_code, 200)
+        direct.refresh_from_db()
+        self.assertTrue(direct.is_read)
+        self.assertEqual(self.unread_count(), 0)
+
+    def test_mark_all_read_is_clamped_to_now(self):
+        before = timezone.now()
+        mark_all_read(self.user, until=before + timedelta(days=1))
+        watermark = NotificationReadWatermark.objects.get(user=self.user).read_until
+        self.assertLessEqual(watermark, timezone.now())
+        self.assertGreaterEqual(watermark, before)
+
+        # Created after the call, so unread even though before the requested until
+        Notification.objects.create(user=None, title="Broadcast", message="Hi",
+                                    created_at=watermark + timedelta(seconds=1))
+        self.assertEqual(self.unread_count(), 1)
+
+
+class NotificationStreamTests(TestCase):
+
+    async def test_in_memory_broker_fan_out(self):
+        broker = InMemoryBroker()
+        async with broker.subscribe([BROADCAST_CHANNEL, user_channel(1)]) as first, \
+                broker.subscribe([BROADCAST_CHANNEL, user_channel(2)]) as second:
+            broker.publish(BROADCAST_CHANNEL, {'id': 1})
+            # publish() may be called from any thread, e.g. a sync view
+            await sync_to_async(broker.publish, thread_sensitive=False)(user_channel(2), {'id': 2})
+            self.assertEqual(await asyncio.wait_for(first.get(), 1), {'id': 1})
+            self.assertEqual(await asyncio.wait_for(second.get(), 1), {'id': 1})
+            self.assertEqual(await asyncio.wait_for(second.get(), 1), {'id': 2})
+            self.assertTrue(first.queue.empty())
+        self.assertEqual(broker._subscriptions, {})
+
+    def test_broadcast_published_once_without_per_user_queries(self):
+        users = [User.objects.create_user(username=f'reader{i}', password='pass') for i in range(3)]
+        broadcast = Notification.objects.create(user=None, title="Broadcast", message="Hi")
+        broker = get_broker()
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscribes = [broker.subscribe([BROADCAST_CHANNEL, user_channel(user.pk)]) for user in users]
+        subscriptions = [loop.run_until_complete(subscribe.__aenter__()) for subscribe in subscribes]
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                publish_notification(broadcast)
+            # Serialized once, whatever the number of subscribers
+            self.assertEqual(len(queries), 0)
+            for subscription in subscriptions:
+                message = loop.run_until_complete(asyncio.wait_for(subscription.get(), 1))
+                self.assertEqual((message['id'], message['data']['title']), (broadcast.pk, "Broadcast"))
+        finally:
+            for subscribe in subscribes:
+                loop.run_until_complete(subscribe.__aexit__(None, None, None))
+
+    async def test_stream_requires_a_valid_token(self):
+        client = AsyncClient()
+        response = await client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 401)
+        response = await client.get('/api/notifications/stream/', {'token': 'not-a-token'})
+        self.assertEqual(response.status_code, 401)
+
+        user = await User.objects.acreate(username='reader')
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(user).access_token))()
+        response = await client.get('/api/notifications/stream/', {'token': token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        self.assertEqual(await anext(events), b'retry: 5000\n\n')
+        await events.aclose()
@@ -3,10 +3,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import NotificationViewSet
+from .stream import notification_stream
 
 router = DefaultRouter()
 router.register(r'', NotificationViewSet, basename='notifications')
 
 urlpatterns = [
+    # Before the router, whose detail route would otherwise match "stream"
+    path('stream/', notification_stream, name='notification-stream'),
     path('', include(router.urls)),
 ]
@@ -1,33 +1,99 @@
 # apps/notifications/views.py
 
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Q
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import NotificationSerializer, MarkReadSerializer, MarkAllReadSerializer
+from . import counters, read_state
+from tourism_backend.pagination import FeedPagination
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Provides read-only access to notifications.
     Normal users see only notifications addressed to them or broadcast.
-    When a user retrieves a single notification, it is automatically marked as read.
+    Send ?cursor= to page through the feed with keyset pagination.
+    Read state is per user, including for broadcasts (see read_state.py).
+    When a user retrieves a single notification, it is marked as read once the
+    response has been sent, so the GET itself does not write.
     """
-    queryset = Notification.objects.all().order_by('-created_at')
+    # user_username / created_by_username come from the joined rows; only()
+    # keeps the wide user rows (password hash, etc.) out of the SELECT.
+    queryset = (
+        Notification.objects.select_related('user', 'created_by')
+        .only('id', 'title', 'message', 'is_read', 'created_at', 'user__username', 'created_by__username')
+        .order_by('-created_at')
+    )
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
+
+    @property
+    def watermark(self):
+        if not hasattr(self, '_watermark'):
+            self._watermark = read_state.get_watermark(self.request.user)
+        return self._watermark
 
     def get_queryset(self):
+        user = self.request.user
+        queryset = read_state.with_read_state(super().get_queryset(), user, self.watermark)
+        if self.action == 'unread':
+            return queryset.filter(read_state.unread_filter(user, self.watermark))
+        if user.is_superuser:
+            return queryset
+        return queryset.filter(
+            Q(user=user) | Q(user__isnull=True)
+        )
+
+    def get_keyset_partitions(self):
+        # Direct and broadcast notifications are each an index range scan
+        # on (user, created_at, id); see FeedPagination.
+        if self.action == 'unread':
+            return read_state.unread_partitions(self.request.user, self.watermark)
         if self.request.user.is_superuser:
-            return Notification.objects.all().order_by('-created_at')
-        return Notification.objects.filter(
-            Q(user=self.request.user) | Q(user__isnull=True)
-        ).order_by('-created_at')
+            return None
+        return [Q(user=self.request.user), Q(user__isnull=True)]
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Automatically mark as read if not already
-        if not instance.is_read:
-            instance.is_read = True
-            instance.save(update_fields=['is_read'])
+        # Automatically mark as read (for this user) if not already
+        if not instance.read_by_user:
+            instance.read_by_user = read_state.defer_mark_read(instance, request.user)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
+
+    @action(detail=False)
+    def unread(self, request):
+        """
+        The current user's unread notifications, newest first.
+        """
+        return self.list(request)
+
+    @action(detail=False, url_path='unread-count')
+    def unread_count(self, request):
+        """
+        Unread badge count, served from a cached per-user counter.
+        """
+        count = counters.get_unread_count(request.user, read_state.unread_count)
+        return Response({'unread_count': count})
+
+    @action(detail=False, methods=['post'], url_path='mark-read', serializer_class=MarkReadSerializer)
+    def mark_read(self, request):
+        """
+        Mark a list of notifications read: {"ids": [1, 2, 3]}
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        read_state.mark_read_many(request.user, serializer.validated_data['ids'])
+        return Response({"detail": "Notifications marked as read."})
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read', serializer_class=MarkAllReadSerializer)
+    def mark_all_read(self, request):
+        """
+        Mark everything up to "until" (default: now) read: {"until": "2025-03-01T00:00:00Z"}
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        read_state.mark_all_read(request.user, serializer.validated_data.get('until'))
+        return Response({"detail": "All notifications marked as read."})
@@ -0,0 +1,21 @@
+# apps/tasks/admin.py
+
+from django.contrib import admin
+from django.utils import timezone
+from .models import Task
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'idempotency_key')
+    ordering = ('-id',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'worker')
+    actions = ['retry']
+
+    @admin.action(description="Run selected tasks again")
+    def retry(self, request, queryset):
+        count = queryset.exclude(status=Task.RUNNING).update(
+            status=Task.QUEUED, run_after=timezone.now(), attempts=0, finished_at=None
+        )
+        self.message_user(request, f"{count} task(s) queued again.")
@@ -0,0 +1,142 @@
+# apps/tasks/backends.py
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import IntegrityError, close_old_connections, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from tourism_backend.benchmark import percentile
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# Where enqueued tasks run, chosen with settings.TASKS_BACKEND:
+#
+# - LocalBackend: a thread pool inside the web process. Nothing to deploy,
+#   but tasks waiting when the process exits are lost (the denormalized
+#   counters can be fixed with reconcile_attraction_stats).
+# - DatabaseBackend: Task rows written in the caller's transaction and run
+#   by `manage.py run_workers`; survives restarts and retries across them.
+# - ImmediateBackend: runs tasks right after the commit, in the caller's
+#   thread; for tests and debugging.
+
+
+class ImmediateBackend:
+
+    def enqueue(self, task, kwargs, idempotency_key=None, delay=0):
+        transaction.on_commit(lambda: task.fn(**kwargs), robust=True)
+
+    def stats(self):
+        return {'backend': 'immediate'}
+
+
+class LocalBackend:
+
+    # Wait times kept for stats()
+    SAMPLES = 1000
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.TASKS_LOCAL_WORKERS, thread_name_prefix='tasks'
+        )
+        self._lock = threading.Lock()
+        self._waiting_keys = set()
+        self._wait_ms = deque(maxlen=self.SAMPLES)
+        self._counters = dict.fromkeys(('queued', 'running', 'done', 'retried', 'failed'), 0)
+
+    def enqueue(self, task, kwargs, idempotency_key=None, delay=0):
+        transaction.on_commit(lambda: self._submit(task, kwargs, idempotency_key, delay))
+
+    def stats(self):
+        with self._lock:
+            samples = list(self._wait_ms)
+            stats = {'backend': 'local', **self._counters}
+        stats['wait_ms_p50'] = percentile(samples, 50)
+        stats['wait_ms_p99'] = percentile(samples, 99)
+        return stats
+
+    def _submit(self, task, kwargs, idempotency_key=None, delay=0, attempt=1):
+        with self._lock:
+            if idempotency_key is not None:
+                if idempotency_key in self._waiting_keys:
+                    return
+                self._waiting_keys.add(idempotency_key)
+            self._counters['queued'] += 1
+        due = time.monotonic() + delay
+        args = (self._run, task, kwargs, idempotency_key, attempt, due)
+        if delay:
+            timer = threading.Timer(delay, self.executor.submit, args)
+            timer.daemon = True
+            timer.start()
+        else:
+            self.executor.submit(*args)
+
+    def _run(self, task, kwargs, idempotency_key, attempt, due):
+        with self._lock:
+            self._waiting_keys.discard(idempotency_key)
+            self._counters['queued'] -= 1
+            self._counters['running'] += 1
+            self._wait_ms.append(max(0.0, (time.monotonic() - due) * 1000))
+        outcome = 'done'
+        try:
+            close_old_connections()
+            task.fn(**kwargs)
+        except Exception:
+            if attempt < task.max_attempts:
+                outcome = 'retried'
+                logger.warning("Task %s failed (attempt %d), retrying", task.name, attempt, exc_info=True)
+                self._submit(task, kwargs, delay=task.backoff(attempt), attempt=attempt + 1)
+            else:
+                outcome = 'failed'
+                logger.exception("Task %s failed after %d attempts", task.name, attempt)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._counters['running'] -= 1
+                self._counters[outcome] += 1
+
+
+class DatabaseBackend:
+
+    def enqueue(self, task, kwargs, idempotency_key=None, delay=0):
+        row = Task(
+            name=task.name,
+            payload=kwargs,
+            idempotency_key=idempotency_key,
+            max_attempts=task.max_attempts,
+            run_after=timezone.now() + timedelta(seconds=delay),
+        )
+        if idempotency_key is None:
+            row.save()
+            return
+        try:
+            # Savepoint: a duplicate key must not break the caller's transaction
+            with transaction.atomic():
+                row.save()
+        except IntegrityError:
+            pass
+
+    def stats(self):
+        from .worker import queue_stats
+        return {'backend': 'database', **queue_stats()}
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.TASKS_BACKEND)()
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    if setting.startswith('TASKS_'):
+        get_backend.cache_clear()
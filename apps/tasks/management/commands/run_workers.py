@@ -0,0 +1,68 @@
+# apps/tasks/management/commands/run_workers.py
+
+import json
+import multiprocessing
+import signal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from tasks.worker import Worker, queue_stats
+
+
+def _run_worker(concurrency, poll_interval, burst):
+    worker = Worker(concurrency=concurrency, poll_interval=poll_interval)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: worker.stop())
+    worker.run(burst=burst)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the workers of the database task queue (TASKS_BACKEND = "
+        "'tasks.backends.DatabaseBackend'). Each process runs --concurrency threads; "
+        "SIGTERM/SIGINT stop claiming tasks and let the running ones finish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help="Worker processes to fork.")
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help="Tasks run at the same time by each process.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to sleep when no task is due.")
+        parser.add_argument('--burst', action='store_true',
+                            help="Exit once no task is due.")
+        parser.add_argument('--stats', action='store_true',
+                            help="Print queue depth and latency, then exit.")
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(queue_stats(), indent=2))
+            return
+        if options['processes'] < 1 or options['concurrency'] < 1:
+            raise CommandError("--processes and --concurrency must be positive.")
+
+        worker_args = (options['concurrency'], options['poll_interval'], options['burst'])
+        if options['processes'] == 1:
+            _run_worker(*worker_args)
+            return
+
+        # Children must not inherit the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        children = [
+            context.Process(target=_run_worker, args=worker_args, name=f'task-worker-{i}')
+            for i in range(options['processes'])
+        ]
+        for child in children:
+            child.start()
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, forward)
+        # Ctrl-C already reaches every process of the group
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for child in children:
+            child.join()
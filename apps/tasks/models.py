@@ -0,0 +1,52 @@
+# apps/tasks/models.py
+
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    A queued call of a registered task (see registry.py), for the database
+    backend. Rows are inserted in the transaction of the change that
+    enqueued them, so a task exists exactly when that change committed;
+    `manage.py run_workers` claims and runs them.
+
+    idempotency_key, when set, makes enqueueing the same key again a no-op
+    while the first task is still waiting; the key is released when a
+    worker picks the task up.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    idempotency_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        indexes = [
+            # Claiming: the due tasks of a status, oldest first
+            models.Index(fields=['status', 'run_after', 'id'], name='task_status_run_after_idx'),
+            # Pruning finished tasks
+            models.Index(fields=['status', 'finished_at'], name='task_status_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f"Task {self.pk} {self.name} ({self.status})"
@@ -0,0 +1,68 @@
+# apps/tasks/registry.py
+
+import random
+
+# Functions that can be enqueued, by name. Filled by @task as the apps'
+# tasks.py modules are imported (TasksConfig.ready).
+_registry = {}
+
+
+class RegisteredTask:
+    """
+    A function run in the background through the configured backend
+    (settings.TASKS_BACKEND). Arguments are passed by keyword and must be
+    JSON-serializable, as they may be stored in the database.
+    """
+
+    def __init__(self, fn, name, max_attempts, retry_delay):
+        self.fn = fn
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def __call__(self, **kwargs):
+        return self.fn(**kwargs)
+
+    def __repr__(self):
+        return f"<task {self.name}>"
+
+    def enqueue(self, idempotency_key=None, delay=0, **kwargs):
+        """
+        Run the task with these arguments once the current transaction
+        commits, at least delay seconds from now. Dropped if a task with the
+        same idempotency_key is still waiting to run.
+        """
+        from .backends import get_backend
+        get_backend().enqueue(self, kwargs, idempotency_key=idempotency_key, delay=delay)
+
+    def backoff(self, attempts):
+        """
+        Seconds to wait before retrying after the given number of attempts:
+        exponential, with jitter so failed tasks do not retry in lockstep.
+        """
+        return self.retry_delay * 2 ** (attempts - 1) * random.uniform(0.5, 1.5)
+
+
+def task(name=None, max_attempts=5, retry_delay=10):
+    """
+    Register a function as a task:
+
+        @task(max_attempts=3)
+        def send_welcome_email(user_id): ...
+
+        send_welcome_email.enqueue(user_id=user.pk)
+    """
+    def decorator(fn):
+        registered = RegisteredTask(
+            fn, name or f'{fn.__module__}.{fn.__name__}', max_attempts, retry_delay
+        )
+        _registry[registered.name] = registered
+        return registered
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"No task registered as {name!r}.") from None
@@ -0,0 +1,79 @@
+from django.test import TestCase, override_settings
+from .models import Task
+from .registry import task
+from .worker import Worker, requeue_stale_tasks
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.mark')
+def mark():
+    Task.objects.create(name='tests.marker', status=Task.DONE)
+
+
+@task(name='tests.explode', max_attempts=2, retry_delay=0)
+def explode():
+    raise RuntimeError("boom")
+
+
+@override_settings(TASKS_BACKEND='tasks.backends.DatabaseBackend')
+class DatabaseQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker(concurrency=1)
+
+    def run_due_tasks(self):
+        while claimed := self.worker.claim(10):
+            for row in claimed:
+                self.worker.execute(row)
+
+    def test_enqueued_task_runs_once(self):
+        record.enqueue(value=1)
+        self.run_due_tasks()
+        self.run_due_tasks()
+        self.assertEqual(calls, [1])
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    def test_idempotency_key_dedupes_waiting_tasks(self):
+        record.enqueue(value=1, idempotency_key='k')
+        record.enqueue(value=2, idempotency_key='k')
+        self.assertEqual(Task.objects.count(), 1)
+
+        self.run_due_tasks()
+        # Released once picked up
+        record.enqueue(value=3, idempotency_key='k')
+        self.run_due_tasks()
+        self.assertEqual(calls, [1, 3])
+
+    def test_delayed_task_waits(self):
+        record.enqueue(value=1, delay=60)
+        self.run_due_tasks()
+        self.assertEqual(calls, [])
+
+    def test_failing_task_is_retried_then_failed(self):
+        explode.enqueue()
+        self.run_due_tasks()
+        row = Task.objects.get()
+        self.assertEqual(row.status, Task.FAILED)
+        self.assertEqual(row.attempts, 2)
+        self.assertIn("boom", row.last_error)
+
+    @override_settings(TASKS_VISIBILITY_TIMEOUT=0)
+    def test_run_outliving_the_visibility_timeout_is_rolled_back(self):
+        mark.enqueue()
+        [slow] = self.worker.claim(10)
+        requeue_stale_tasks()
+        [again] = self.worker.claim(10)
+
+        # The first run finishes after all: only one of them may count
+        self.worker.execute(slow)
+        self.worker.execute(again)
+        self.assertEqual(Task.objects.filter(name='tests.marker').count(), 1)
+        row = Task.objects.get(name='tests.mark')
+        self.assertEqual((row.status, row.attempts), (Task.DONE, 2))
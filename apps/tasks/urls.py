@@ -0,0 +1,8 @@
+# apps/tasks/urls.py
+
+from django.urls import path
+from .views import TaskStatsView
+
+urlpatterns = [
+    path('stats/', TaskStatsView.as_view(), name='task-stats'),
+]
@@ -0,0 +1,16 @@
+# apps/tasks/views.py
+
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .backends import get_backend
+
+
+class TaskStatsView(APIView):
+    """
+    Queue depth and latency of the configured task backend (admins only).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(get_backend().stats())
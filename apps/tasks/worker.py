@@ -0,0 +1,237 @@
+# apps/tasks/worker.py
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from tourism_backend.benchmark import percentile
+from .models import Task
+from .registry import get_task
+
+logger = logging.getLogger(__name__)
+
+# Seconds between housekeeping passes (stale task recovery, pruning)
+MAINTENANCE_INTERVAL = 30
+PRUNE_BATCH_SIZE = 1000
+# Tracebacks are cut to their last characters
+MAX_ERROR_LENGTH = 5000
+
+
+class Superseded(Exception):
+    """
+    The task was claimed again while this run was in progress.
+    """
+
+
+class Worker:
+    """
+    Runs database-backed tasks with a pool of `concurrency` threads.
+
+    Due tasks are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any
+    number of worker processes can share the table. Each task runs in a
+    transaction that also marks it done: its database changes and its
+    completion commit together, and a failed attempt leaves nothing behind
+    before being retried with exponential backoff. Tasks still running after
+    TASKS_VISIBILITY_TIMEOUT (e.g. their worker was killed) are queued again;
+    should the first run still finish, it is rolled back (see execute()).
+    """
+
+    def __init__(self, concurrency=4, poll_interval=1.0, name=None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._maintenance_at = 0
+
+    def run(self, burst=False):
+        """
+        Process tasks until stop() is called, or, with burst, until no task
+        is due.
+        """
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix='task-worker') as pool:
+            while not self.stopping.is_set():
+                with self._condition:
+                    while self._in_flight >= self.concurrency:
+                        self._condition.wait()
+                    free = self.concurrency - self._in_flight
+                try:
+                    self._maintenance()
+                    claimed = self.claim(free)
+                except DatabaseError:
+                    # e.g. the database restarting: keep the worker alive
+                    logger.exception("Could not claim tasks")
+                    connection.close()
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                if claimed:
+                    with self._condition:
+                        self._in_flight += len(claimed)
+                    for row in claimed:
+                        pool.submit(self._execute_and_release, row)
+                    continue
+                if burst:
+                    with self._condition:
+                        idle = self._in_flight == 0
+                    if idle:
+                        break
+                self.stopping.wait(self.poll_interval)
+        close_old_connections()
+
+    def stop(self):
+        self.stopping.set()
+
+    def claim(self, limit):
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(status=Task.QUEUED, run_after__lte=now)
+                .order_by('run_after', 'id')
+                .values_list('pk', flat=True)[:limit]
+            )
+            if not ids:
+                return []
+            Task.objects.filter(pk__in=ids).update(
+                status=Task.RUNNING, started_at=now, worker=self.name,
+                attempts=F('attempts') + 1,
+                # Enqueueing the key again now queues a new run
+                idempotency_key=None,
+            )
+        return list(Task.objects.filter(pk__in=ids).order_by('run_after', 'id'))
+
+    def execute(self, row):
+        close_old_connections()
+        try:
+            registered = get_task(row.name)
+            with transaction.atomic():
+                registered.fn(**row.payload)
+                # Only the latest claim completes the task: a run that outlived
+                # TASKS_VISIBILITY_TIMEOUT and was claimed again is rolled back,
+                # so tasks that are not idempotent (e.g. counter deltas) are not
+                # applied twice.
+                if not self._claimed(row).update(status=Task.DONE, finished_at=timezone.now(), last_error=''):
+                    raise Superseded
+        except Superseded:
+            logger.warning("Task %s (%s) was claimed again, discarding this run", row.pk, row.name)
+        except Exception:
+            self._failed(row, traceback.format_exc())
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def _claimed(row):
+        return Task.objects.filter(pk=row.pk, status=Task.RUNNING, attempts=row.attempts)
+
+    def _failed(self, row, error):
+        now = timezone.now()
+        update = {'last_error': error[-MAX_ERROR_LENGTH:], 'worker': ''}
+        try:
+            registered = get_task(row.name)
+        except LookupError:
+            registered = None
+        if registered is None or row.attempts >= row.max_attempts:
+            logger.error("Task %s (%s) failed after %d attempts", row.pk, row.name, row.attempts)
+            update.update(status=Task.FAILED, finished_at=now)
+        else:
+            logger.warning("Task %s (%s) failed (attempt %d), retrying", row.pk, row.name, row.attempts)
+            update.update(
+                status=Task.QUEUED,
+                run_after=now + timedelta(seconds=registered.backoff(row.attempts)),
+            )
+        self._claimed(row).update(**update)
+
+    def _execute_and_release(self, row):
+        try:
+            self.execute(row)
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+
+    def _maintenance(self):
+        if time.monotonic() < self._maintenance_at:
+            return
+        self._maintenance_at = time.monotonic() + MAINTENANCE_INTERVAL
+        requeue_stale_tasks()
+        prune_finished_tasks()
+
+
+def requeue_stale_tasks():
+    """
+    Queue again the tasks that have been running for longer than
+    TASKS_VISIBILITY_TIMEOUT, or fail those out of attempts.
+    """
+    now = timezone.now()
+    stale = Task.objects.filter(
+        status=Task.RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.TASKS_VISIBILITY_TIMEOUT),
+    )
+    error = "Worker did not finish the task within TASKS_VISIBILITY_TIMEOUT."
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished_at=now, last_error=error, worker=''
+    )
+    requeued = stale.update(status=Task.QUEUED, run_after=now, last_error=error, worker='')
+    if failed or requeued:
+        logger.warning("Stale tasks: %d queued again, %d failed", requeued, failed)
+    return requeued, failed
+
+
+def prune_finished_tasks():
+    """
+    Delete tasks that succeeded more than TASKS_RETENTION seconds ago, in
+    small batches. Failed tasks are kept for inspection in the admin.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.TASKS_RETENTION)
+    deleted = 0
+    while True:
+        ids = list(
+            Task.objects.filter(status=Task.DONE, finished_at__lt=cutoff)
+            .values_list('pk', flat=True)[:PRUNE_BATCH_SIZE]
+        )
+        if not ids:
+            return deleted
+        deleted += Task.objects.filter(pk__in=ids).delete()[0]
+
+
+def queue_stats(window=300):
+    """
+    Queue depth by status, how long the oldest due task has been waiting,
+    and wait/run time percentiles (ms) of the tasks finished in the last
+    `window` seconds.
+    """
+    now = timezone.now()
+    depth = dict.fromkeys((Task.QUEUED, Task.RUNNING, Task.DONE, Task.FAILED), 0)
+    depth.update(Task.objects.values_list('status').annotate(count=Count('id')).order_by())
+
+    oldest_due = (
+        Task.objects.filter(status=Task.QUEUED, run_after__lte=now)
+        .aggregate(oldest=Min('run_after'))['oldest']
+    )
+    recent = list(
+        Task.objects.filter(status=Task.DONE, finished_at__gte=now - timedelta(seconds=window))
+        .order_by('-finished_at')
+        .values_list('run_after', 'started_at', 'finished_at')[:1000]
+    )
+    wait_ms = [(started - due).total_seconds() * 1000 for due, started, _ in recent]
+    run_ms = [(finished - started).total_seconds() * 1000 for _, started, finished in recent]
+    return {
+        **depth,
+        'oldest_due_seconds': (now - oldest_due).total_seconds() if oldest_due else 0.0,
+        'finished_recently': len(recent),
+        'wait_ms_p50': percentile(wait_ms, 50),
+        'wait_ms_p99': percentile(wait_ms, 99),
+        'run_ms_p50': percentile(run_ms, 50),
+        'run_ms_p99': percentile(run_ms, 99),
+    }
@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+The notification stream (/api/notifications/stream/) holds a connection open
+per client and must be served through this application, e.g.
+``uvicorn tourism_backend.asgi:application``.
 """
 
 import os
@@ -0,0 +1,139 @@
+"""
+ASGI-native read path for DRF viewsets.
+
+DRF views are synchronous, so under ASGI each request runs in a thread via
+sync_to_async and blocks it on the database. AsyncReadView serves the
+list/retrieve actions of an existing viewset from a coroutine instead:
+authentication, permissions, filtering and the response cache lookup run
+in one short sync hop (they build querysets but, except for the user
+lookup, rarely query), then the page is counted and fetched with the async
+ORM (acount, aiterator, aget) and serialized on the event loop. A
+serializer that lazily queries the database raises SynchronousOnlyOperation
+rather than silently blocking the loop, so the viewset's queryset must
+select everything the serializer reads.
+
+Responses match the viewset's JSON responses, pagination and errors
+included, and go through its response cache.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import response_cache
+
+
+class AsyncReadView(View):
+    """
+    Async list or retrieve of viewset_class, e.g.
+    AsyncReadView.as_view(viewset_class=AttractionViewSet, action='retrieve').
+    """
+    viewset_class = None
+    action = 'list'
+
+    async def get(self, request, *args, **kwargs):
+        view = self.viewset_class(
+            action_map={'get': self.action}, args=args, kwargs=kwargs,
+            renderer_classes=[JSONRenderer],
+        )
+        view.request = drf_request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        try:
+            queryset, cache_key, cached = await sync_to_async(self._prepare)(view, drf_request)
+            headers = {}
+            if cache_key is not None:
+                headers = view.get_response_cache_headers(cache_key)
+                if headers['ETag'] in request.headers.get('If-None-Match', ''):
+                    return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            data = cached
+            if data is None:
+                if self.action == 'list':
+                    data = await self._list(view, drf_request, queryset)
+                else:
+                    data = await self._retrieve(view, drf_request, queryset)
+                if cache_key is not None and view.may_cache_response():
+                    await sync_to_async(response_cache._cache().set)(
+                        cache_key, data, settings.RESPONSE_CACHE_TIMEOUT
+                    )
+        except Exception as exc:
+            return self._error_response(view, exc)
+        return HttpResponse(JSONRenderer().render(data), content_type='application/json', headers=headers)
+
+    @staticmethod
+    def _prepare(view, drf_request):
+        """
+        The synchronous part: authentication, permissions, throttling,
+        filter backends and the response cache lookup.
+        """
+        view.initial(drf_request)
+        queryset = view.filter_queryset(view.get_queryset())
+        if not isinstance(view, response_cache.CachedResponseMixin):
+            return queryset, None, None
+        key = view.get_response_cache_key(drf_request)
+        return queryset, key, response_cache._cache().get(key)
+
+    async def _list(self, view, drf_request, queryset):
+        paginator = view.paginator
+        page_size = paginator.get_page_size(drf_request) if paginator is not None else None
+        # A filter backend may have fetched the rows already (?nearest=)
+        fetched = isinstance(queryset, list)
+        if page_size is None:
+            objects = queryset if fetched else [obj async for obj in queryset.aiterator()]
+            return view.get_serializer(objects, many=True).data
+
+        # Same responses as PageNumberPagination
+        count = len(queryset) if fetched else await queryset.acount()
+        num_pages = max(1, -(-count // page_size))
+        page_param = paginator.page_query_param
+        try:
+            page = int(drf_request.query_params.get(page_param, 1))
+        except ValueError:
+            page = 0
+        if page < 1 or page > num_pages:
+            raise NotFound(paginator.invalid_page_message.format(page_number=page, message=''))
+
+        start = (page - 1) * page_size
+        if fetched:
+            objects = queryset[start:start + page_size]
+        else:
+            objects = [obj async for obj in queryset[start:start + page_size].aiterator()]
+        url = drf_request.build_absolute_uri()
+        previous = None
+        if page > 1:
+            previous = remove_query_param(url, page_param) if page == 2 else replace_query_param(url, page_param, page - 1)
+        return {
+            'count': count,
+            'next': replace_query_param(url, page_param, page + 1) if page < num_pages else None,
+            'previous': previous,
+            'results': view.get_serializer(objects, many=True).data,
+        }
+
+    async def _retrieve(self, view, drf_request, queryset):
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        try:
+            obj = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+        except ObjectDoesNotExist:
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        view.check_object_permissions(drf_request, obj)
+        return view.get_serializer(obj).data
+
+    @staticmethod
+    def _error_response(view, exc):
+        # DRF's exception handling, rendered without the sync response cycle
+        response = view.handle_exception(exc)
+        headers = {
+            name: value for name, value in response.items()
+            if name in ('WWW-Authenticate', 'Retry-After')
+        }
+        return HttpResponse(
+            JSONRenderer().render(response.data), status=response.status_code,
+            content_type='application/json', headers=headers,
+        )
@@ -0,0 +1,65 @@
+"""
+Small helpers shared by the benchmark management commands.
+
+Benchmarks generate their own synthetic data inside a transaction that is
+rolled back at the end, so they can be pointed at any database without
+leaving rows behind.
+"""
+
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def measure(fn, repeat=20, warmup=2):
+    """
+    Call fn() repeatedly and return timing stats in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'mean': sum(samples) / len(samples),
+        'p50': percentile(samples, 50),
+        'p99': percentile(samples, 99),
+    }
+
+
+def format_stats(label, stats):
+    return (
+        f"{label:<40} mean {stats['mean']:9.2f} ms"
+        f"   p50 {stats['p50']:9.2f} ms   p99 {stats['p99']:9.2f} ms"
+    )
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back(using=None):
+    """
+    Run the block in a transaction that is always rolled back.
+    """
+    try:
+        with transaction.atomic(using=using):
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
@@ -0,0 +1,74 @@
+"""
+MySQL backend whose connections come from a per-process ConnectionPool
+(tourism_backend/db/pool.py) instead of being opened for every request.
+
+Django still "closes" the connection at the end of each request (keep
+CONN_MAX_AGE at 0); closing hands it back to the pool, rolled back to a
+clean autocommit state, and the next request on any thread of the worker
+picks it up without a handshake. Pool settings come from the POOL key of
+the database settings:
+
+    'POOL': {'SIZE': 10, 'MAX_LIFETIME': 1800, 'TIMEOUT': 10,
+             'HEALTH_CHECK': True, 'CHECK_AFTER': 30}
+"""
+
+from django.db.backends.mysql.base import Database
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+
+from tourism_backend.db.pool import ConnectionPool, pool_for
+
+
+def _ping(connection):
+    connection.ping()
+    return True
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+    reused_connection = False
+
+    @property
+    def pool(self):
+        settings_dict = self.settings_dict
+        # The test runner switches NAME to the test database under the same alias
+        key = (self.alias, settings_dict['NAME'], settings_dict['HOST'], settings_dict['PORT'])
+        return pool_for(key, self._create_pool)
+
+    def _create_pool(self):
+        options = self.settings_dict.get('POOL', {})
+        conn_params = self.get_connection_params()
+        return ConnectionPool(
+            lambda: MySQLDatabaseWrapper.get_new_connection(self, conn_params),
+            max_size=options.get('SIZE', 10),
+            max_lifetime=options.get('MAX_LIFETIME', 1800),
+            timeout=options.get('TIMEOUT', 10),
+            health_check=_ping if options.get('HEALTH_CHECK', True) else None,
+            check_after=options.get('CHECK_AFTER', 30),
+        )
+
+    def get_new_connection(self, conn_params):
+        connection, fresh = self.pool.acquire()
+        self.reused_connection = not fresh
+        return connection
+
+    def init_connection_state(self):
+        # Session settings were applied when the connection was opened
+        if not self.reused_connection:
+            super().init_connection_state()
+
+    def _set_autocommit(self, autocommit):
+        # Pooled connections come back in autocommit mode: skip the round trip
+        if self.connection.get_autocommit() != autocommit:
+            super()._set_autocommit(autocommit)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        discard = self.errors_occurred and not self.is_usable()
+        if not discard and not self.connection.get_autocommit():
+            # Closed inside a transaction: don't hand its state to the next user
+            try:
+                self.connection.rollback()
+                self.connection.autocommit(True)
+            except Database.Error:
+                discard = True
+        self.pool.release(self.connection, discard=discard)
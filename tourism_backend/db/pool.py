@@ -0,0 +1,217 @@
+"""
+A small thread-safe pool of DB-API connections.
+
+One pool exists per database alias and per process (see pool_for), shared
+by every thread of the worker: WSGI request threads as well as the threads
+sync_to_async runs ORM calls in under ASGI. Connections are handed back to
+the pool instead of being closed, so requests skip the connect handshake
+and init_command. Connections older than max_lifetime are replaced, and
+idle ones can be pinged before being handed out again.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from tourism_backend.benchmark import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Up to max_size connections made by connect(). acquire() returns
+    (connection, fresh); fresh is False for a connection reused from the pool.
+    health_check(connection), if given, is run on connections that have been
+    idle for at least check_after seconds; those failing it are replaced.
+    """
+
+    # Acquire times kept for stats()
+    SAMPLES = 1000
+
+    def __init__(self, connect, max_size=10, max_lifetime=3600, timeout=10,
+                 health_check=None, check_after=30, close=None, warn_after_ms=100):
+        self.connect = connect
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.health_check = health_check
+        self.check_after = check_after
+        self.close_connection = close or (lambda connection: connection.close())
+        self.warn_after_ms = warn_after_ms
+
+        self._condition = threading.Condition()
+        self._idle = []
+        # id(connection) -> time it was opened, for every open connection
+        self._opened_at = {}
+        # id(connection) -> time it was last released, for idle connections
+        self._released_at = {}
+        # Connections being opened, outside the lock
+        self._opening = 0
+        self._acquire_ms = deque(maxlen=self.SAMPLES)
+        self._counters = dict.fromkeys(
+            ('acquired', 'reused', 'created', 'discarded', 'expired', 'failed_checks', 'timeouts'), 0
+        )
+
+    def acquire(self):
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection, idle_seconds, expired = self._wait_for_slot(deadline)
+            for stale in expired:
+                self._close(stale)
+            if connection is None:
+                connection, fresh = self._open(), True
+                break
+            if self._check(connection, idle_seconds):
+                fresh = False
+                break
+            self._discard(connection, 'failed_checks')
+
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._condition:
+            self._counters['acquired'] += 1
+            self._counters['reused'] += not fresh
+            self._acquire_ms.append(elapsed)
+        if elapsed > self.warn_after_ms:
+            logger.warning("Waited %.1f ms for a database connection", elapsed)
+        return connection, fresh
+
+    def release(self, connection, discard=False):
+        """
+        Give a connection back; it is closed instead if broken or expired.
+        """
+        with self._condition:
+            known = id(connection) in self._opened_at
+            expired = known and self._expired(connection)
+            if known and not discard and not expired:
+                self._released_at[id(connection)] = time.monotonic()
+                self._idle.append(connection)
+                self._condition.notify()
+                return
+        self._discard(connection, 'expired' if expired else 'discarded')
+
+    def close_idle(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+            for connection in idle:
+                del self._opened_at[id(connection)]
+                del self._released_at[id(connection)]
+            self._condition.notify_all()
+        for connection in idle:
+            self._close(connection)
+
+    def stats(self):
+        with self._condition:
+            samples = list(self._acquire_ms)
+            stats = {
+                'size': len(self._opened_at),
+                'idle': len(self._idle),
+                'in_use': len(self._opened_at) - len(self._idle),
+                'max_size': self.max_size,
+                **self._counters,
+            }
+        stats['acquire_ms_p50'] = percentile(samples, 50)
+        stats['acquire_ms_p99'] = percentile(samples, 99)
+        return stats
+
+    def _wait_for_slot(self, deadline):
+        """
+        An idle connection and how long it was idle, or None once a slot for
+        a new one is reserved, plus the expired connections met on the way
+        (to be closed outside the lock).
+        """
+        expired = []
+        with self._condition:
+            while True:
+                # Most recently used first, so that the surplus of a burst
+                # ages out instead of being kept warm
+                while self._idle:
+                    connection = self._idle.pop()
+                    released_at = self._released_at.pop(id(connection))
+                    if not self._expired(connection):
+                        return connection, time.monotonic() - released_at, expired
+                    del self._opened_at[id(connection)]
+                    self._counters['expired'] += 1
+                    expired.append(connection)
+                if len(self._opened_at) + self._opening < self.max_size:
+                    self._opening += 1
+                    return None, 0, expired
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout}s "
+                        f"(pool size {self.max_size})."
+                    )
+                self._condition.wait(remaining)
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        finally:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+        with self._condition:
+            self._opened_at[id(connection)] = time.monotonic()
+            self._counters['created'] += 1
+        return connection
+
+    def _expired(self, connection):
+        return time.monotonic() - self._opened_at[id(connection)] > self.max_lifetime
+
+    def _check(self, connection, idle_seconds):
+        if self.health_check is None or idle_seconds < self.check_after:
+            return True
+        try:
+            return self.health_check(connection)
+        except Exception:
+            return False
+
+    def _discard(self, connection, counter):
+        with self._condition:
+            self._opened_at.pop(id(connection), None)
+            self._counters[counter] += 1
+            self._condition.notify()
+        self._close(connection)
+
+    def _close(self, connection):
+        try:
+            self.close_connection(connection)
+        except Exception:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_for(key, factory):
+    """
+    This process's pool for key (e.g. a database alias), created with
+    factory() on first use. Keyed by pid as well, so a worker forked from a
+    process that already had connections (gunicorn --preload) never shares them.
+    """
+    pid_key = (os.getpid(), key)
+    pool = _pools.get(pid_key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(pid_key)
+            if pool is None:
+                pool = _pools[pid_key] = factory()
+    return pool
+
+
+def all_pools():
+    """
+    This process's pools, by key.
+    """
+    pid = os.getpid()
+    return {key: pool for (pool_pid, key), pool in list(_pools.items()) if pool_pid == pid}
@@ -0,0 +1,126 @@
+"""
+Primary/replica routing.
+
+Reads go to a random replica (settings.DATABASE_REPLICAS) only while
+serving a safe-method API request, as decided per request by
+replica_routing_middleware. Everything else reads the primary:
+writes, management commands, signal handlers outside a request, and
+queries inside a transaction.
+
+Read-your-writes: a request that writes pins its client (the JWT user)
+to the primary for DB_REPLICA_PIN_SECONDS, so the GET that follows a
+POST to feedback, favorites or the profile sees the new rows even if
+the replicas lag behind. Requests carrying a session cookie (the admin)
+always use the primary.
+"""
+
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Routing state of the current request, or None outside requests
+_request_state = ContextVar('replica_routing', default=None)
+
+
+class _RequestState:
+    __slots__ = ('use_replicas', 'wrote')
+
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.wrote = False
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not reading_replicas() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+
+def reading_replicas():
+    """
+    Whether reads of the current request may be served by a replica.
+    """
+    state = _request_state.get()
+    return state is not None and state.use_replicas and not state.wrote
+
+
+def _pin_key(user_id):
+    return f"db-pin:{user_id}"
+
+
+def _token_user_id(request):
+    header = request.headers.get('Authorization', '').split()
+    if len(header) != 2 or header[0] not in jwt_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        return AccessToken(header[1])[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+
+
+def _start(request):
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return _RequestState(False), None
+    user_id = _token_user_id(request)
+    use_replicas = request.method in SAFE_METHODS and not (
+        user_id is not None and cache.get(_pin_key(user_id))
+    )
+    return _RequestState(use_replicas), user_id
+
+
+def _finish(state, user_id):
+    if state.wrote and user_id is not None:
+        cache.set(_pin_key(user_id), True, settings.DB_REPLICA_PIN_SECONDS)
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """
+    Lets safe-method requests read from the replicas, and pins clients that
+    wrote to the primary for a while.
+    """
+    if not settings.DATABASE_REPLICAS:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            state, user_id = _start(request)
+            token = _request_state.set(state)
+            try:
+                return await get_response(request)
+            finally:
+                _request_state.reset(token)
+                _finish(state, user_id)
+    else:
+        def middleware(request):
+            state, user_id = _start(request)
+            token = _request_state.set(state)
+            try:
+                return get_response(request)
+            finally:
+                _request_state.reset(token)
+                _finish(state, user_id)
+
+    return middleware
@@ -0,0 +1,145 @@
+"""
+Thumbnails of uploaded images.
+
+Models with an `image` field get an `image_thumb` field holding a WebP copy
+that fits in THUMBNAIL_SIZE, stored next to the original
+(attractions/photo.jpg -> attractions/photo.thumb.webp). It is generated
+by a background task after the upload commits, so saving a model never
+waits for Pillow. API list pages and the admin use the thumbnail instead of
+downloading full-size uploads.
+
+A thumbnail is current when its name is derived from the image's name;
+until the new one is written after a change, no thumbnail is shown rather
+than the previous image's.
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+from tasks.registry import task
+from tourism_backend import response_cache
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_SUFFIX = '.thumb.webp'
+
+
+def thumbnail_name(image_name):
+    return os.path.splitext(image_name)[0] + THUMBNAIL_SUFFIX
+
+
+def current_thumbnail(instance, field='image'):
+    """
+    The thumbnail file of instance's image, or None if not generated yet.
+    """
+    image = getattr(instance, field)
+    thumb = getattr(instance, f'{field}_thumb')
+    if image and thumb and thumb.name == thumbnail_name(image.name):
+        return thumb
+    return None
+
+
+def render_thumbnail(file):
+    """
+    WebP bytes of an image file scaled down to fit in THUMBNAIL_SIZE.
+    """
+    with Image.open(file) as image:
+        # Phones store the orientation in EXIF; thumbnails are saved upright
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(THUMBNAIL_SIZE)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+        output = BytesIO()
+        image.save(output, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY, method=4)
+    return output.getvalue()
+
+
+def generate_thumbnail(model, pk, image_name, field='image'):
+    """
+    Write the thumbnail of image_name and record it on the row, unless the
+    row has moved on to another image in the meantime.
+    """
+    thumb_field = f'{field}_thumb'
+    storage = model._meta.get_field(thumb_field).storage
+    try:
+        with storage.open(image_name) as file:
+            data = render_thumbnail(file)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        logger.warning("Could not generate a thumbnail of %s: %s", image_name, exc)
+        return None
+
+    name = thumbnail_name(image_name)
+    # Same name every time, so the row can tell whether its thumbnail is current
+    storage.delete(name)
+    name = storage.save(name, ContentFile(data))
+    changes = {thumb_field: name}
+    if any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+        # update() skips auto_now; delta syncs look for the rows changed since
+        changes['updated_at'] = timezone.now()
+    updated = model.objects.filter(pk=pk, **{field: image_name}).update(**changes)
+    if updated:
+        # update() sends no post_save
+        response_cache.invalidate(model)
+    return name
+
+
+@task(name='images.generate_thumbnail', max_attempts=3)
+def generate_thumbnail_task(model, pk, image_name, field='image'):
+    generate_thumbnail(apps.get_model(model), pk, image_name, field)
+
+
+def schedule_thumbnail(instance, field='image'):
+    """
+    Queue the thumbnail of instance's image if it does not have a current
+    one. Meant for post_save.
+    """
+    image = getattr(instance, field)
+    thumb_field = f'{field}_thumb'
+    if not image:
+        if getattr(instance, thumb_field):
+            type(instance).objects.filter(pk=instance.pk).update(**{thumb_field: ''})
+        return
+    if current_thumbnail(instance, field) is not None:
+        return
+
+    generate_thumbnail_task.enqueue(
+        model=instance._meta.label, pk=instance.pk, image_name=image.name, field=field,
+        idempotency_key=f'thumbnail:{image.name}',
+    )
+
+
+class ThumbnailField(serializers.Field):
+    """
+    Read-only absolute URL of an image's current thumbnail, or null.
+    """
+
+    def __init__(self, image_field='image', **kwargs):
+        self.image_field = image_field
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        thumb = current_thumbnail(instance, self.image_field)
+        if thumb is None:
+            return None
+        request = self.context.get('request')
+        return request.build_absolute_uri(thumb.url) if request is not None else thumb.url
+
+
+def admin_preview_url(instance, field='image'):
+    """
+    URL for small admin previews: the thumbnail, or the original until it exists.
+    """
+    thumb = current_thumbnail(instance, field)
+    return (thumb or getattr(instance, field)).url
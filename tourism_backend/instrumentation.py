@@ -0,0 +1,169 @@
+"""
+Request instrumentation.
+
+instrumentation_middleware times every request and counts the SQL queries
+it runs (and their time), per resolved view such as
+"AttractionViewSet.list", or a variant of it with a cost of its own such as
+"AttractionViewSet.list[nearest]" (set_view_variant). The measurements go to the histograms of
+tourism_backend/metrics.py and, with SERVER_TIMING, to a Server-Timing
+header that browser dev tools show next to the request.
+
+settings.QUERY_BUDGETS caps the queries a view may run per request. A
+request over budget is logged, or fails with QueryBudgetExceeded when
+QUERY_BUDGETS_ENFORCED is set, as the tests do, so that an N+1 query
+slipping into a view breaks the build instead of production.
+
+Queries are seen through an execute wrapper added to every database
+connection, so the counts do not depend on DEBUG (which makes Django keep
+every SQL string in connection.queries). Queries run after the
+response is returned, e.g. while streaming it, are not counted.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.decorators import sync_and_async_middleware
+
+from .metrics import QUERY_COUNT_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+# Measurements of the current request, or None outside requests
+_current = ContextVar('request_instrumentation', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class _RequestStats:
+    __slots__ = ('queries', 'db_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - start
+        stats.queries += 1
+
+
+@receiver(connection_created)
+def install_query_recorder(connection, **kwargs):
+    # Connection objects are per thread and keep their execute wrappers
+    # across reconnections
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def set_view_variant(request, variant):
+    """
+    Label the request "<view class>.<action>[<variant>]", for a path of a
+    view whose cost differs from its usual one (its own metrics and budget).
+    """
+    getattr(request, '_request', request).view_variant = variant
+
+
+def view_label(request):
+    """
+    "<view class>.<action>" of the view that served the request, e.g.
+    "AttractionViewSet.list" or "RegisterView.post", followed by the
+    variant set with set_view_variant(), if any.
+    """
+    label = _view_label(request)
+    variant = getattr(request, 'view_variant', None)
+    return f"{label}[{variant}]" if variant else label
+
+
+def _view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    func = match.func
+    method = request.method.lower()
+    # DRF viewsets map methods to actions, extra @actions included
+    if getattr(func, 'actions', None):
+        return f"{func.cls.__name__}.{func.actions.get(method, method)}"
+    view_class = getattr(func, 'cls', None) or getattr(func, 'view_class', None)
+    if view_class is None:
+        return func.__name__
+    initkwargs = getattr(func, 'view_initkwargs', None) or getattr(func, 'initkwargs', None) or {}
+    viewset_class = initkwargs.get('viewset_class')
+    if viewset_class is not None:
+        # AsyncReadView
+        return f"{viewset_class.__name__}.{initkwargs.get('action', view_class.action)}[async]"
+    return f"{view_class.__name__}.{method}"
+
+
+def _finish(request, response, stats, start):
+    duration = time.perf_counter() - start
+    label = view_label(request)
+    registry.observe('http_request_duration_seconds', "Request wall time by view.", duration, view=label)
+    registry.observe('http_request_db_queries', "SQL queries per request by view.", stats.queries,
+                     buckets=QUERY_COUNT_BUCKETS, view=label)
+    registry.observe('http_request_db_duration_seconds', "Time spent in SQL per request by view.",
+                     stats.db_time, view=label)
+    registry.inc('http_requests_total', "Requests by view, method and status.",
+                 view=label, method=request.method, status=str(response.status_code))
+
+    if settings.SERVER_TIMING:
+        response.headers['Server-Timing'] = (
+            f'app;dur={duration * 1000:.1f}, '
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"'
+        )
+
+    budget = settings.QUERY_BUDGETS.get(label)
+    if budget is not None and stats.queries > budget:
+        message = f"{label} ran {stats.queries} queries, over its budget of {budget}"
+        if settings.QUERY_BUDGETS_ENFORCED:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+@sync_and_async_middleware
+def instrumentation_middleware(get_response):
+    """
+    Records timing and query metrics of each request; see the module docstring.
+    """
+    # Connections opened before this module was loaded, e.g. by the test runner
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(connection)
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            stats = _RequestStats()
+            token = _current.set(stats)
+            start = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                _current.reset(token)
+            _finish(request, response, stats, start)
+            return response
+    else:
+        def middleware(request):
+            stats = _RequestStats()
+            token = _current.set(stats)
+            start = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                _current.reset(token)
+            _finish(request, response, stats, start)
+            return response
+
+    return middleware
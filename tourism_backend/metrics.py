@@ -0,0 +1,156 @@
+"""
+In-process metrics, exposed in the Prometheus text format at /metrics.
+
+Histograms and counters live in the memory of each worker process and cost
+one lock acquisition per observation; Prometheus scrapes and aggregates
+them. With several workers behind one address, scrape each worker (or run
+one metrics-only worker per host), as every process reports its own counts.
+"""
+
+import bisect
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Seconds
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        # Per bucket, plus +Inf; made cumulative when rendered
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket', {**labels, 'le': str(bound)}, cumulative
+        yield f'{name}_sum', labels, self.sum
+        yield f'{name}_count', labels, self.count
+
+
+class Counter:
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Registry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # name -> (type, help, {sorted label items: metric})
+        self._families = {}
+
+    def observe(self, name, help_text, value, buckets=DURATION_BUCKETS, **labels):
+        with self._lock:
+            self._get(name, 'histogram', help_text, labels, lambda: Histogram(buckets)).observe(value)
+
+    def inc(self, name, help_text, amount=1, **labels):
+        with self._lock:
+            self._get(name, 'counter', help_text, labels, Counter).inc(amount)
+
+    def _get(self, name, kind, help_text, labels, factory):
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = (kind, help_text, {})
+        key = tuple(sorted(labels.items()))
+        metric = family[2].get(key)
+        if metric is None:
+            metric = family[2][key] = factory()
+        return metric
+
+    def collect(self):
+        """
+        (name, type, help, [(sample name, labels, value)]) for every family.
+        """
+        with self._lock:
+            return [
+                (name, kind, help_text, [
+                    sample
+                    for key, metric in metrics.items()
+                    for sample in metric.samples(name, dict(key))
+                ])
+                for name, (kind, help_text, metrics) in sorted(self._families.items())
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._families.clear()
+
+
+registry = Registry()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format(families):
+    lines = []
+    for name, kind, help_text, samples in families:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for sample_name, labels, value in samples:
+            label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            lines.append(f'{sample_name}{{{label_text}}} {value}' if label_text else f'{sample_name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _gauges(name, help_text, samples):
+    return (name, 'gauge', help_text, [(name, labels, value) for labels, value in samples])
+
+
+def _pool_gauges():
+    from tourism_backend.db.pool import all_pools
+
+    return [_gauges(
+        'db_pool', "Database connection pool size and counters (see the pool's stats()).",
+        [({'alias': key[0], 'stat': stat}, value)
+         for key, pool in all_pools().items()
+         for stat, value in pool.stats().items()],
+    )]
+
+
+def _task_gauges():
+    from tasks.backends import get_backend
+
+    stats = get_backend().stats()
+    backend = stats.pop('backend')
+    return [_gauges(
+        'tasks_queue', "Background task queue depth and latency (see run_workers --stats).",
+        [({'backend': backend, 'stat': key}, value) for key, value in stats.items()],
+    )]
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires "Authorization: Bearer <METRICS_TOKEN>";
+    without a METRICS_TOKEN it is only served in DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponseForbidden()
+    families = registry.collect() + _pool_gauges() + _task_gauges()
+    return HttpResponse(_format(families), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,97 @@
+"""
+Pagination classes shared by the API apps.
+"""
+
+import base64
+import binascii
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class FeedPagination(PageNumberPagination):
+    """
+    Pagination for feeds ordered newest first (feedback, favorites, notifications).
+
+    By default it behaves like the global PageNumberPagination (?page=N, with
+    a count). Clients opt in to keyset pagination by sending ?cursor= (empty
+    for the first page): pages are then fetched with
+    WHERE (created_at, id) < (last_created_at, last_id) on a
+    (created_at, id) index, so page 10,000 costs the same as page 1 and no
+    COUNT(*) is issued. Keyset responses contain only `next` and `results`.
+
+    A view whose feed is an OR of conditions (e.g. "mine or broadcast") can
+    define get_keyset_partitions() returning one Q per branch: each branch is
+    then read with its own index range scan and the pages are merged, instead
+    of sorting every matching row.
+    """
+    cursor_query_param = 'cursor'
+    keyset_ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_keyset = self.cursor_query_param in request.query_params
+        if not self.use_keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.keyset_ordering)
+        position = self.decode_cursor(request.query_params[self.cursor_query_param])
+        if position is not None:
+            created_at, pk = position
+            # Written as a range on created_at (rather than an OR) so the
+            # index scan starts right at the cursor
+            queryset = queryset.filter(created_at__lte=created_at).exclude(
+                created_at=created_at, pk__gte=pk
+            )
+
+        # One extra row tells us whether there is a next page
+        partitions = getattr(view, 'get_keyset_partitions', lambda: None)()
+        if partitions:
+            rows = sorted(
+                (row for q in partitions for row in queryset.filter(q)[:page_size + 1]),
+                key=lambda row: (row.created_at, row.pk),
+                reverse=True,
+            )[:page_size + 1]
+        else:
+            rows = list(queryset[:page_size + 1])
+        self.next_position = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_position = (rows[-1].created_at, rows[-1].pk)
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_cursor_link(),
+            'results': data,
+        })
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def encode_cursor(self, position):
+        created_at, pk = position
+        raw = f"{created_at.isoformat()}|{pk}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, value):
+        if not value:
+            return None
+        try:
+            padded = value + '=' * (-len(value) % 4)
+            created_at, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            created_at = None
+        if created_at is None:
+            raise NotFound("Invalid cursor")
+        return created_at, pk
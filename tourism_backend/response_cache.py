@@ -0,0 +1,149 @@
+"""
+Versioned response cache for read-only API endpoints.
+
+Every cached model has a version counter in the cache. A response is stored
+under a key that includes the current versions of the models it was built
+from, so bumping a version (from post_save/post_delete) invalidates every
+dependent page at once without having to find and delete them. The same key
+doubles as the ETag, which lets unchanged pages be answered with 304 before
+any query or serialization happens.
+
+Versions are timestamps (in ms) of the last change, so a response read from
+a lagging replica shortly after a change is served but not cached.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from tourism_backend.db.routers import reading_replicas
+
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return f"response-cache:version:{model._meta.label_lower}"
+
+
+def _new_version():
+    # Time based, so a counter that was evicted restarts above any value it
+    # had before and old entries can never become valid again.
+    return int(time.time() * 1000)
+
+
+def get_versions(models):
+    """
+    Current version of each model, initializing missing counters.
+    """
+    cache = _cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _bump(models):
+    cache = _cache()
+    for model in models:
+        key = _version_key(model)
+        cache.set(key, max(_new_version(), (cache.get(key) or 0) + 1), timeout=None)
+
+
+def changed_since(versions, seconds):
+    """
+    Whether any of these versions was set in the last `seconds`.
+    """
+    return max(versions, default=0) > _new_version() - seconds * 1000
+
+
+def invalidate(*models):
+    """
+    Invalidate cached responses built from these models. The versions are
+    bumped again on commit, so a response cached by a concurrent request
+    while the transaction was still open does not survive it.
+    """
+    _bump(models)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(models))
+
+
+class CachedResponseMixin:
+    """
+    Caches list/retrieve responses of a viewset.
+
+    cache_dependencies lists the models the response is built from; any change
+    to one of them (see invalidate()) makes every cached page of the view stale.
+    Responses carry an ETag, and a matching If-None-Match is answered with 304.
+    """
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_vary(self, request):
+        """
+        Extra key material for responses that differ between users.
+        """
+        return ''
+
+    def get_response_cache_key(self, request):
+        self.response_cache_versions = get_versions(self.cache_dependencies)
+        query = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+        parts = [
+            type(self).__name__,
+            self.action,
+            repr(sorted(self.kwargs.items())),
+            request.get_host(),
+            # Pagination links embed the path, which differs for the async routes
+            request.path,
+            request.accepted_renderer.format,
+            repr(query),
+            self.get_cache_vary(request),
+            repr(self.response_cache_versions),
+        ]
+        digest = hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()[:32]
+        return f"response-cache:{digest}"
+
+    def may_cache_response(self):
+        # A replica may not have caught up with a recent change yet
+        return not (
+            reading_replicas()
+            and changed_since(self.response_cache_versions, settings.DB_REPLICA_PIN_SECONDS)
+        )
+
+    def get_response_cache_headers(self, key):
+        return {'ETag': f'"{key.rsplit(":", 1)[1]}"', 'Cache-Control': 'private, no-cache'}
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        headers = self.get_response_cache_headers(key)
+
+        if headers['ETag'] in request.headers.get('If-None-Match', ''):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cache = _cache()
+        data = cache.get(key)
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            if self.may_cache_response():
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+        for name, value in headers.items():
+            response[name] = value
+        return response
@@ -0,0 +1,115 @@
+"""
+Streaming NDJSON/CSV responses for bulk exports.
+
+Rows arrive in batches (lists of tuples) and are encoded one batch at a
+time, optionally gzipped on the fly, so the memory used does not depend on
+the size of the export. Under ASGI, Django would read a whole synchronous
+iterator into memory before sending it; streaming_response() hands it an
+asynchronous one that pulls a batch at a time instead.
+"""
+
+import csv
+import io
+import re
+import zlib
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+_accepts_gzip = re.compile(r'\bgzip\b')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Lets content negotiation pick NDJSON (Accept: application/x-ndjson or
+    ?format=ndjson). Exports stream their own response; this only renders
+    errors, as one JSON line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return (DjangoJSONEncoder().encode(data) + '\n').encode()
+
+
+class CSVRenderer(NDJSONRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+def ndjson_chunks(fields, batches):
+    encode = DjangoJSONEncoder(separators=(',', ':')).encode
+    for batch in batches:
+        yield ''.join(encode(dict(zip(fields, row))) + '\n' for row in batch)
+
+
+def csv_chunks(fields, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for batch in batches:
+        writer.writerows(
+            [value.isoformat() if isinstance(value, date) else value for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header of an empty export
+        yield buffer.getvalue()
+
+
+# output: (renderer, encoder)
+OUTPUTS = {
+    'ndjson': (NDJSONRenderer, ndjson_chunks),
+    'csv': (CSVRenderer, csv_chunks),
+}
+
+
+def gzip_chunks(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(request):
+    return bool(_accepts_gzip.search(request.headers.get('Accept-Encoding', '')))
+
+
+async def _async_chunks(chunks):
+    chunks = iter(chunks)
+    while (chunk := await sync_to_async(next)(chunks, None)) is not None:
+        yield chunk
+
+
+def streaming_response(request, fields, batches, output, filename, headers=None):
+    """
+    StreamingHttpResponse of `batches` of rows encoded as `output` (a key of
+    OUTPUTS), gzipped when the client accepts it.
+    """
+    renderer, encoder = OUTPUTS[output]
+    chunks = encoder(fields, batches)
+    headers = {
+        'Content-Disposition': f'attachment; filename="{filename}.{output}"',
+        'Vary': 'Accept-Encoding',
+        **(headers or {}),
+    }
+    if accepts_gzip(request):
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _async_chunks(chunks)
+    return StreamingHttpResponse(
+        chunks, content_type=f'{renderer.media_type}; charset=utf-8', headers=headers
+    )
@@ -0,0 +1,158 @@
+import threading
+import time
+from contextlib import ExitStack
+from decimal import Decimal
+from unittest import skipUnless
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from accounts.models import User
+from accounts.tokens import RefreshToken
+from attractions.models import Attraction, Category
+from tourism_backend.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def make_pool(self, **options):
+        return ConnectionPool(FakeConnection, **options)
+
+    def test_acquire_and_release_reuse_connections(self):
+        pool = self.make_pool(max_size=2)
+        first, fresh = pool.acquire()
+        self.assertTrue(fresh)
+        second, _ = pool.acquire()
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.stats()['in_use'], 2)
+
+        pool.release(first)
+        connection, fresh = pool.acquire()
+        self.assertIs(connection, first)
+        self.assertFalse(fresh)
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['created'], stats['reused']), (2, 2, 1))
+
+        pool.release(connection, discard=True)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_max_lifetime(self):
+        pool = self.make_pool(max_lifetime=0.05)
+        connection, _ = pool.acquire()
+        pool.release(connection)
+        time.sleep(0.1)
+        # Expired while idle: replaced on acquire
+        replacement, fresh = pool.acquire()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(fresh)
+        self.assertTrue(connection.closed)
+
+        time.sleep(0.1)
+        # Expired while in use: closed on release
+        pool.release(replacement)
+        self.assertTrue(replacement.closed)
+        stats = pool.stats()
+        self.assertEqual((stats['expired'], stats['size']), (2, 0))
+
+    def test_health_check_evicts_broken_connections(self):
+        pool = self.make_pool(health_check=lambda connection: not connection.broken, check_after=0)
+        connection, _ = pool.acquire()
+        pool.release(connection)
+        connection.broken = True
+
+        replacement, fresh = pool.acquire()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(fresh)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['failed_checks'], 1)
+
+    def test_exhaustion(self):
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        connection, _ = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+        # A waiter gets the connection as soon as it is released
+        pool.timeout = 5
+        threading.Timer(0.05, pool.release, [connection]).start()
+        reused, fresh = pool.acquire()
+        self.assertIs(reused, connection)
+        self.assertFalse(fresh)
+
+
+@skipUnless(settings.DATABASE_REPLICAS, "Set DB_REPLICA_URLS, e.g. sqlite:////tmp/replica.sqlite3")
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Replica aliases mirror the primary's test database, so both see the
+    same rows; the queries each connection ran tell where reads went.
+    Not a TestCase: reads inside a transaction always go to the primary.
+    """
+    databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.attraction = Attraction.objects.create(
+            category=Category.objects.create(name="Category"), name="Attraction",
+            latitude=Decimal('48.858400'), longitude=Decimal('2.294500'),
+        )
+        self.user = User.objects.create_user(username='reader', password='pass')
+        self.client = self.client_for(self.user)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        return client
+
+    def request(self, client, method, url, data=None):
+        """
+        The response, and the number of queries run on the primary and on
+        the replicas.
+        """
+        with ExitStack() as stack:
+            primary = stack.enter_context(CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]))
+            replicas = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in settings.DATABASE_REPLICAS
+            ]
+            response = getattr(client, method)(url, data, format='json')
+        return response, len(primary), sum(len(queries) for queries in replicas)
+
+    def test_safe_methods_read_from_replicas(self):
+        response, primary, replicas = self.request(self.client, 'get', '/api/attractions/favorites/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replicas, 0)
+
+    def test_writes_go_to_the_primary_and_pin_the_user(self):
+        response, primary, replicas = self.request(
+            self.client, 'post', '/api/attractions/favorites/', {'attraction': self.attraction.pk}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replicas, 0)
+
+        # Reads its own write from the primary
+        response, primary, replicas = self.request(self.client, 'get', '/api/attractions/favorites/')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replicas, 0)
+
+        # Other users are not pinned
+        other = self.client_for(User.objects.create_user(username='other', password='pass'))
+        _, primary, replicas = self.request(other, 'get', '/api/attractions/favorites/')
+        self.assertEqual(primary, 0)
+        self.assertGreater(replicas, 0)
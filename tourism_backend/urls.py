@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from tourism_backend.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -10,6 +11,10 @@ urlpatterns = [
     path('api/accounts/', include('accounts.urls')),
     path('api/attractions/', include('attractions.urls')),
     path('api/notifications/', include('notifications.urls')),
+    path('api/tasks/', include('tasks.urls')),
+
+    # Prometheus scrape target
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG: